@@ -3,14 +3,15 @@ from __future__ import annotations
 from typing import List, Optional
 from datetime import datetime
 import os
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
 from app.core.config import Settings, get_settings
 from app.models.quotes import QuoteRequest, QuoteResponse
 from app.models.database import QuotationDB, get_db
-from app.services.sicetac import SicetacClient
+from app.services.deadlines import Deadline, deadline_from_headers
+from app.services.sicetac import SicetacClient, get_sicetac_client
 import json
 
 # Use development auth if environment is local
@@ -60,7 +61,14 @@ class QuotationResponse(BaseModel):
 
 
 def _sicetac_client(settings: Settings = Depends(get_settings)) -> SicetacClient:
-    return SicetacClient(settings)
+    return get_sicetac_client(settings)
+
+
+def _request_deadline(request: Request, settings: Settings = Depends(get_settings)) -> Deadline:
+    """Time budget for the upstream lookup, optionally set by the X-Request-Timeout header."""
+    return deadline_from_headers(
+        request.headers, settings.sicetac_deadline_seconds, settings.sicetac_max_deadline_seconds
+    )
 
 
 @router.post("/", response_model=QuotationResponse)
@@ -69,11 +77,13 @@ async def create_quotation(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
     sicetac_client: SicetacClient = Depends(_sicetac_client),
+    deadline: Deadline = Depends(_request_deadline),
 ) -> QuotationResponse:
     """Create a new quotation by fetching data from Sicetac and storing it"""
 
     # Fetch quotes from Sicetac
-    quotes = await sicetac_client.fetch_quotes(quotation_data.request)
+    response = await sicetac_client.quote(quotation_data.request, deadline=deadline)
+    quotes = response.quotes
 
     # Calculate total cost (minimum of all quotes)
     total_cost = min(q.minimum_payable for q in quotes) if quotes else None
@@ -81,7 +91,10 @@ async def create_quotation(
     # Prepare quotes data for storage
     quotes_data = {
         "request": quotation_data.request.model_dump(),
-        "quotes": [q.model_dump() for q in quotes]
+        "quotes": [q.model_dump() for q in quotes],
+        # Last known tariffs served while SICETAC was unavailable
+        "stale": response.stale,
+        "data_as_of": response.data_as_of.isoformat() if response.data_as_of else None,
     }
 
     # Create database entry
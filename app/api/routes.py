@@ -1,11 +1,22 @@
 from __future__ import annotations
 import os
 import logging
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
 from app.core.config import Settings, get_settings
-from app.models.quotes import QuoteRequest, QuoteResponse
-from app.services.sicetac import SicetacClient
+from app.models.quotes import (
+    BatchQuoteRequest,
+    BatchQuoteResponse,
+    MatrixQuoteRequest,
+    MatrixQuoteResponse,
+    QuoteRequest,
+    QuoteResponse,
+)
+from app.services.batch import get_matrix_rate_limiter, iter_batch, iter_ndjson
+from app.services.deadlines import Deadline, deadline_from_headers
+from app.services.matrix import collect_columns, expand_matrix, iter_csv, matrix_size
+from app.services.sicetac import SicetacClient, get_sicetac_client
 from app.api import quotes_crud
 from app.api import auth_routes
 from app.api import auth_monitoring
@@ -20,6 +31,13 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_NDJSON_RESPONSES = {200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
 
 @router.get("/healthz", tags=["ops"])
 async def healthcheck() -> dict[str, str]:
@@ -28,8 +46,15 @@ async def healthcheck() -> dict[str, str]:
 
 
 def _sicetac_client(settings: Settings = Depends(get_settings)) -> SicetacClient:
-    logger.debug("Creating SICETAC client")
-    return SicetacClient(settings)
+    logger.debug("Creating SICETAC client on the shared transport")
+    return get_sicetac_client(settings)
+
+
+def _request_deadline(request: Request, settings: Settings = Depends(get_settings)) -> Deadline:
+    """Time budget for the upstream lookup, optionally set by the X-Request-Timeout header."""
+    return deadline_from_headers(
+        request.headers, settings.sicetac_deadline_seconds, settings.sicetac_max_deadline_seconds
+    )
 
 
 @router.post("/quote", response_model=QuoteResponse, tags=["quotes"])
@@ -37,6 +62,7 @@ async def create_quote(
     quote_request: QuoteRequest,
     _: dict = Depends(get_current_user),
     sicetac_client: SicetacClient = Depends(_sicetac_client),
+    deadline: Deadline = Depends(_request_deadline),
 ) -> QuoteResponse:
     """Create a quick quote without persistence (direct Sicetac query)"""
     logger.info("=" * 60)
@@ -52,14 +78,121 @@ async def create_quote(
 
     try:
         logger.debug("Fetching quotes from SICETAC...")
-        quotes = await sicetac_client.fetch_quotes(quote_request)
-        logger.info(f"Successfully fetched {len(quotes)} quotes from SICETAC")
-        return QuoteResponse(request=quote_request, quotes=quotes)
+        response = await sicetac_client.quote(quote_request, deadline=deadline)
+        logger.info(f"Successfully fetched {len(response.quotes)} quotes from SICETAC (stale={response.stale})")
+        return response
     except Exception as e:
         logger.error(f"Failed to fetch quotes: {str(e)}", exc_info=True)
         raise
 
 
+@router.post(
+    "/quote/batch",
+    response_model=BatchQuoteResponse,
+    responses=_NDJSON_RESPONSES,
+    tags=["quotes"],
+)
+async def create_quote_batch(
+    batch: BatchQuoteRequest,
+    request: Request,
+    _: dict = Depends(get_current_user),
+    settings: Settings = Depends(get_settings),
+    sicetac_client: SicetacClient = Depends(_sicetac_client),
+):
+    """Quote many lanes at once; failures are reported per item.
+
+    Send ``Accept: application/x-ndjson`` to stream one item per line as
+    each lane resolves instead of waiting for the whole batch.
+    """
+    if len(batch.items) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the maximum of {settings.batch_max_items} items",
+        )
+
+    logger.info(f"Batch quote request received with {len(batch.items)} items")
+    if _wants_ndjson(request):
+        items = iter_batch(
+            sicetac_client,
+            batch.items,
+            settings.batch_max_concurrency,
+            buffer_size=settings.batch_stream_buffer_items,
+        )
+        return StreamingResponse(iter_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
+
+    items = [
+        item async for item in iter_batch(
+            sicetac_client, batch.items, settings.batch_max_concurrency
+        )
+    ]
+    items.sort(key=lambda item: item.index)
+    failed = sum(1 for item in items if item.error is not None)
+    logger.info(f"Batch quote finished: {len(items) - failed} succeeded, {failed} failed")
+    return BatchQuoteResponse(
+        items=items,
+        total=len(items),
+        succeeded=len(items) - failed,
+        failed=failed,
+    )
+
+
+@router.post(
+    "/quote/matrix",
+    response_model=MatrixQuoteResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, "text/csv": {}}}},
+    tags=["quotes"],
+)
+async def create_quote_matrix(
+    matrix: MatrixQuoteRequest,
+    request: Request,
+    format: str = Query("json", pattern="^(json|csv|ndjson)$"),
+    _: dict = Depends(get_current_user),
+    settings: Settings = Depends(get_settings),
+    sicetac_client: SicetacClient = Depends(_sicetac_client),
+):
+    """Tariff sheet for every origin x destination x configuration combination.
+
+    The default JSON answer is columnar (one array per field). Use
+    ``format=csv`` for a CSV export, or ``format=ndjson`` /
+    ``Accept: application/x-ndjson`` to stream one cell per line.
+    """
+    cells = matrix_size(matrix)
+    if cells > settings.matrix_max_cells:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Matrix has {cells} cells, the maximum is {settings.matrix_max_cells}",
+        )
+
+    quote_requests = expand_matrix(matrix)
+    logger.info(f"Matrix quote request for period {matrix.period} with {len(quote_requests)} cells")
+    streaming = format != "json" or _wants_ndjson(request)
+    items = iter_batch(
+        sicetac_client,
+        quote_requests,
+        settings.batch_max_concurrency,
+        buffer_size=settings.batch_stream_buffer_items if streaming else 0,
+        rate_limiter=get_matrix_rate_limiter(settings),
+    )
+
+    if format == "csv":
+        return StreamingResponse(
+            iter_csv(items),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="sicetac_{matrix.period}.csv"'},
+        )
+    if streaming:
+        return StreamingResponse(iter_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
+
+    columns, errors = await collect_columns(items)
+    return MatrixQuoteResponse(
+        period=matrix.period,
+        logistics_hours=matrix.logistics_hours,
+        rows=len(columns["origin"]),
+        columns=columns,
+        errors=errors,
+    )
+
+
 # Include CRUD routes
 router.include_router(quotes_crud.router)
 
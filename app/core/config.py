@@ -1,5 +1,7 @@
 import os
 from functools import lru_cache
+from typing import Literal
+
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -59,13 +61,370 @@ class Settings(BaseSettings):
         validation_alias="SICETAC_ENDPOINT",
         description="Full endpoint that accepts the Sicetac XML payloads.",
     )
+    sicetac_endpoints: str = Field(
+        default="",
+        validation_alias="SICETAC_ENDPOINTS",
+        description=(
+            "Comma-separated list of equivalent SICETAC mirrors (rndcws, rndcws2). "
+            "Falls back to SICETAC_ENDPOINT when empty."
+        ),
+    )
     sicetac_timeout_seconds: float = Field(
         default=20.0,
         validation_alias="SICETAC_TIMEOUT_SECONDS",
     )
     sicetac_verify_ssl: bool = Field(default=False, validation_alias="SICETAC_VERIFY_SSL")
 
-    @field_validator("sicetac_verify_ssl", mode="before")
+    # Shared upstream connection pool
+    sicetac_connect_timeout_seconds: float = Field(
+        default=5.0,
+        validation_alias="SICETAC_CONNECT_TIMEOUT_SECONDS",
+        description="Time allowed to open a TCP connection to the SICETAC host.",
+    )
+    sicetac_read_timeout_seconds: float = Field(
+        default=20.0,
+        validation_alias="SICETAC_READ_TIMEOUT_SECONDS",
+        description="Time allowed between bytes while reading a SICETAC response.",
+    )
+    sicetac_pool_timeout_seconds: float = Field(
+        default=5.0,
+        validation_alias="SICETAC_POOL_TIMEOUT_SECONDS",
+        description="Maximum wait for a free pooled connection before failing.",
+    )
+    sicetac_pool_max_connections: int = Field(
+        default=20,
+        ge=1,
+        validation_alias="SICETAC_POOL_MAX_CONNECTIONS",
+    )
+    sicetac_pool_max_keepalive: int = Field(
+        default=10,
+        ge=0,
+        validation_alias="SICETAC_POOL_MAX_KEEPALIVE",
+    )
+    sicetac_pool_keepalive_expiry_seconds: float = Field(
+        default=30.0,
+        validation_alias="SICETAC_POOL_KEEPALIVE_EXPIRY_SECONDS",
+    )
+
+    # Hedged requests across mirrors
+    sicetac_hedging_enabled: bool = Field(default=True, validation_alias="SICETAC_HEDGING_ENABLED")
+    sicetac_hedge_delay_seconds: float | None = Field(
+        default=None,
+        validation_alias="SICETAC_HEDGE_DELAY_SECONDS",
+        description="Fixed delay before hedging to the next mirror. Uses the observed percentile when unset.",
+    )
+    sicetac_hedge_percentile: float = Field(
+        default=0.9,
+        gt=0,
+        lt=1,
+        validation_alias="SICETAC_HEDGE_PERCENTILE",
+    )
+    sicetac_hedge_min_delay_seconds: float = Field(
+        default=0.5,
+        validation_alias="SICETAC_HEDGE_MIN_DELAY_SECONDS",
+    )
+
+    # Circuit breaker around the SOAP upstream
+    sicetac_breaker_window_seconds: float = Field(
+        default=60.0,
+        validation_alias="SICETAC_BREAKER_WINDOW_SECONDS",
+        description="Sliding window over which upstream error and timeout rates are measured.",
+    )
+    sicetac_breaker_min_calls: int = Field(
+        default=10,
+        ge=1,
+        validation_alias="SICETAC_BREAKER_MIN_CALLS",
+        description="Calls needed in the window before the breaker may open.",
+    )
+    sicetac_breaker_error_rate: float = Field(
+        default=0.5,
+        gt=0,
+        le=1,
+        validation_alias="SICETAC_BREAKER_ERROR_RATE",
+    )
+    sicetac_breaker_timeout_rate: float = Field(
+        default=0.3,
+        gt=0,
+        le=1,
+        validation_alias="SICETAC_BREAKER_TIMEOUT_RATE",
+    )
+    sicetac_breaker_open_seconds: float = Field(
+        default=30.0,
+        validation_alias="SICETAC_BREAKER_OPEN_SECONDS",
+        description="How long the breaker fails fast before letting a probe through.",
+    )
+    sicetac_breaker_half_open_calls: int = Field(
+        default=1,
+        ge=1,
+        validation_alias="SICETAC_BREAKER_HALF_OPEN_CALLS",
+    )
+
+    # Deadlines and retries
+    sicetac_deadline_seconds: float = Field(
+        default=25.0,
+        gt=0,
+        validation_alias="SICETAC_DEADLINE_SECONDS",
+        description="Default end-to-end time budget for one quote lookup, retries included.",
+    )
+    sicetac_max_deadline_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        validation_alias="SICETAC_MAX_DEADLINE_SECONDS",
+        description="Upper bound for a budget requested with the X-Request-Timeout header.",
+    )
+    sicetac_max_attempts: int = Field(
+        default=3,
+        ge=1,
+        validation_alias="SICETAC_MAX_ATTEMPTS",
+    )
+    sicetac_retry_base_delay_seconds: float = Field(
+        default=0.2,
+        ge=0,
+        validation_alias="SICETAC_RETRY_BASE_DELAY_SECONDS",
+    )
+    sicetac_retry_max_delay_seconds: float = Field(
+        default=2.0,
+        ge=0,
+        validation_alias="SICETAC_RETRY_MAX_DELAY_SECONDS",
+    )
+    sicetac_retry_budget_ratio: float = Field(
+        default=0.1,
+        ge=0,
+        validation_alias="SICETAC_RETRY_BUDGET_RATIO",
+        description="Retries allowed as a fraction of recent upstream calls.",
+    )
+    sicetac_retry_budget_min_retries: int = Field(
+        default=3,
+        ge=0,
+        validation_alias="SICETAC_RETRY_BUDGET_MIN_RETRIES",
+    )
+    sicetac_retry_budget_window_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        validation_alias="SICETAC_RETRY_BUDGET_WINDOW_SECONDS",
+    )
+
+    # Adaptive limit on in-flight SOAP calls (per worker process)
+    sicetac_limit_initial: int = Field(
+        default=8,
+        ge=1,
+        validation_alias="SICETAC_LIMIT_INITIAL",
+    )
+    sicetac_limit_min: int = Field(
+        default=1,
+        ge=1,
+        validation_alias="SICETAC_LIMIT_MIN",
+    )
+    sicetac_limit_max: int = Field(
+        default=20,
+        ge=1,
+        validation_alias="SICETAC_LIMIT_MAX",
+        description="Upper bound for the adaptive limit; keep at or below the connection pool size.",
+    )
+    sicetac_limit_latency_tolerance: float = Field(
+        default=2.0,
+        gt=1,
+        validation_alias="SICETAC_LIMIT_LATENCY_TOLERANCE",
+        description="Smoothed latency over this multiple of the baseline lowers the limit.",
+    )
+    sicetac_limit_backoff: float = Field(
+        default=0.5,
+        gt=0,
+        lt=1,
+        validation_alias="SICETAC_LIMIT_BACKOFF",
+        description="Factor applied to the limit on timeouts, overload responses or rising latency.",
+    )
+
+    # In-process cache tier (per worker)
+    cache_memory_max_entries: int = Field(
+        default=10000,
+        ge=1,
+        validation_alias="CACHE_MEMORY_MAX_ENTRIES",
+        description="Entries kept in each worker's memory cache before the least recently used are evicted.",
+    )
+    cache_memory_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=1024,
+        validation_alias="CACHE_MEMORY_MAX_BYTES",
+        description="Estimated bytes (serialized size) each worker's memory cache may hold.",
+    )
+    cache_invalidation_channel: str = Field(
+        default="cache:invalidate",
+        validation_alias="CACHE_INVALIDATION_CHANNEL",
+        description="Redis pub/sub channel on which workers share cache deletes.",
+    )
+    cache_serializer: Literal["auto", "msgpack", "orjson", "json"] = Field(
+        default="auto",
+        validation_alias="CACHE_SERIALIZER",
+        description="Encoding of values stored in Redis; auto picks msgpack, then orjson, then json.",
+    )
+    cache_compression: Literal["auto", "zstd", "lz4", "zlib", "none"] = Field(
+        default="auto",
+        validation_alias="CACHE_COMPRESSION",
+        description="Compression of large Redis values; auto picks zstd, then lz4, else none.",
+    )
+    cache_compress_min_bytes: int = Field(
+        default=1024,
+        ge=0,
+        validation_alias="CACHE_COMPRESS_MIN_BYTES",
+        description="Encoded values smaller than this are stored uncompressed.",
+    )
+
+    # Tariff cache (SICETAC values are fixed for each monthly period)
+    tariff_cache_current_ttl_seconds: int = Field(
+        default=43200,
+        ge=1,
+        validation_alias="TARIFF_CACHE_CURRENT_TTL_SECONDS",
+        description="TTL for tariffs of the current or future periods. Closed periods never expire.",
+    )
+    tariff_cache_negative_ttl_seconds: int = Field(
+        default=120,
+        ge=1,
+        validation_alias="TARIFF_CACHE_NEGATIVE_TTL_SECONDS",
+        description="TTL for lookups SICETAC answered without tariffs.",
+    )
+    tariff_cache_stale_ttl_seconds: int = Field(
+        default=2592000,
+        ge=1,
+        validation_alias="TARIFF_CACHE_STALE_TTL_SECONDS",
+        description="How long last known tariffs are kept to answer while SICETAC is unavailable.",
+    )
+    tariff_cache_revalidate_seconds: int = Field(
+        default=43200,
+        ge=0,
+        validation_alias="TARIFF_CACHE_REVALIDATE_SECONDS",
+        description="After the TTL, how long cached tariffs are still served while one background call refreshes them.",
+    )
+    tariff_shared_cache_path: str | None = Field(
+        default=None,
+        validation_alias="TARIFF_SHARED_CACHE_PATH",
+        description="Memory-mapped file sharing cached tariffs among the workers of one host; unset disables it.",
+    )
+    tariff_shared_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        ge=1024 * 1024,
+        validation_alias="TARIFF_SHARED_CACHE_MAX_BYTES",
+        description="Size of the shared tariff file; it is compacted when full.",
+    )
+    tariff_store_enabled: bool = Field(
+        default=True,
+        validation_alias="TARIFF_STORE_ENABLED",
+        description="Persist lane tariffs in a local database so restarted workers skip SICETAC.",
+    )
+    tariff_store_url: str = Field(
+        default="sqlite:///./tariffs.db",
+        validation_alias="TARIFF_STORE_URL",
+        description="Database URL of the local tariff store (SQLite file per host by default).",
+    )
+    tariff_import_max_bytes: int = Field(
+        default=200 * 1024 * 1024,
+        ge=1,
+        validation_alias="TARIFF_IMPORT_MAX_BYTES",
+        description="Largest SiceTac export accepted by the tariff import endpoint.",
+    )
+
+    # Batch quoting
+    batch_max_items: int = Field(
+        default=1000,
+        ge=1,
+        validation_alias="BATCH_MAX_ITEMS",
+        description="Maximum number of quote requests accepted in one batch call.",
+    )
+    batch_max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        validation_alias="BATCH_MAX_CONCURRENCY",
+        description="Maximum concurrent upstream lane lookups per batch call.",
+    )
+    batch_stream_buffer_items: int = Field(
+        default=16,
+        ge=1,
+        validation_alias="BATCH_STREAM_BUFFER_ITEMS",
+        description="Resolved lanes buffered for a streaming client before upstream fan-out pauses.",
+    )
+
+    # Rate matrix (origin x destination x configuration tariff sheets)
+    matrix_max_cells: int = Field(
+        default=5000,
+        ge=1,
+        validation_alias="MATRIX_MAX_CELLS",
+        description="Maximum origin x destination x configuration combinations per matrix call.",
+    )
+    matrix_upstream_rate_per_second: float = Field(
+        default=5.0,
+        gt=0,
+        validation_alias="MATRIX_UPSTREAM_RATE_PER_SECOND",
+        description="Upstream lane lookups per second a matrix call may start.",
+    )
+
+    # History-driven cache warming
+    cache_warm_enabled: bool = Field(
+        default=True,
+        validation_alias="CACHE_WARM_ENABLED",
+        description="Periodically warm the tariff cache for the most quoted lanes.",
+    )
+    cache_warm_top_lanes: int = Field(
+        default=200,
+        ge=1,
+        validation_alias="CACHE_WARM_TOP_LANES",
+        description="Most quoted lanes (by quotation history) kept warm.",
+    )
+    cache_warm_history_days: int = Field(
+        default=7,
+        ge=1,
+        validation_alias="CACHE_WARM_HISTORY_DAYS",
+        description="Quotation history window used to rank lanes for warming.",
+    )
+    cache_warm_concurrency: int = Field(
+        default=4,
+        ge=1,
+        validation_alias="CACHE_WARM_CONCURRENCY",
+        description="Lanes warmed at once; upstream calls still go through the background limiter lane.",
+    )
+    cache_warm_interval_seconds: float = Field(
+        default=1800.0,
+        gt=0,
+        validation_alias="CACHE_WARM_INTERVAL_SECONDS",
+        description="Time between warming runs.",
+    )
+
+    # Month-rollover prefetch of the most quoted lanes
+    prefetch_enabled: bool = Field(
+        default=True,
+        validation_alias="PREFETCH_ENABLED",
+        description="Prefetch the new period's tariffs for popular lanes when the month rolls over.",
+    )
+    prefetch_top_lanes: int = Field(
+        default=500,
+        ge=1,
+        validation_alias="PREFETCH_TOP_LANES",
+        description="Most quoted lanes (by quotation history) prefetched for each new period.",
+    )
+    prefetch_history_days: int = Field(
+        default=90,
+        ge=1,
+        validation_alias="PREFETCH_HISTORY_DAYS",
+        description="Quotation history window used to rank lanes.",
+    )
+    prefetch_concurrency: int = Field(
+        default=4,
+        ge=1,
+        validation_alias="PREFETCH_CONCURRENCY",
+        description="Lanes prefetched at once; upstream calls still go through the background limiter lane.",
+    )
+    prefetch_rollover_delay_seconds: float = Field(
+        default=300.0,
+        ge=0,
+        validation_alias="PREFETCH_ROLLOVER_DELAY_SECONDS",
+        description="Wait after midnight of the 1st before prefetching, so SICETAC has published the period.",
+    )
+    prefetch_lock_path: str = Field(
+        default="./prefetch.lock",
+        validation_alias="PREFETCH_LOCK_PATH",
+        description="File lock that lets only one worker per host run the prefetch.",
+    )
+
+    @field_validator("sicetac_verify_ssl", "sicetac_hedging_enabled", mode="before")
     @classmethod
     def _normalize_boolean(cls, value: object) -> bool | object:
         if isinstance(value, str):
@@ -76,11 +435,19 @@ class Settings(BaseSettings):
                 return False
         return value
 
-    @field_validator("sicetac_timeout_seconds", mode="before")
+    @field_validator(
+        "sicetac_timeout_seconds",
+        "sicetac_connect_timeout_seconds",
+        "sicetac_read_timeout_seconds",
+        "sicetac_pool_timeout_seconds",
+        "sicetac_pool_keepalive_expiry_seconds",
+        "sicetac_hedge_delay_seconds",
+        mode="before",
+    )
     @classmethod
     def _normalize_timeout(cls, value: object) -> object:
         if isinstance(value, str):
-            return value.strip()
+            return value.strip() or None
         return value
 
 
@@ -97,6 +464,11 @@ class Settings(BaseSettings):
         description="Limits structured logging of upstream SOAP requests to avoid leaking credentials.",
     )
 
+    @property
+    def sicetac_endpoint_list(self) -> list[str]:
+        endpoints = [item.strip() for item in self.sicetac_endpoints.split(",") if item.strip()]
+        return list(dict.fromkeys(endpoints)) or [self.sicetac_endpoint]
+
     @property
     def jwks_url(self) -> str:
         if self.supabase_jwks_url:
@@ -12,6 +12,7 @@ from datetime import datetime
 from app.api.routes import router as api_router
 from app.core.config import get_settings
 from app.models.database import init_database
+from app.services.transport import initialize_transport, shutdown_transport
 
 # Configure logging with detailed format
 logging.basicConfig(
@@ -129,12 +130,20 @@ def create_app() -> FastAPI:
             logger.error(f"Failed to initialize database: {str(e)}", exc_info=True)
             raise
 
+        await initialize_transport(settings)
+        logger.info("SICETAC connection pool initialized")
+
         # Log environment info
         logger.info(f"SICETAC Endpoint: {settings.sicetac_endpoint}")
         logger.info(f"SICETAC Username configured: {bool(settings.sicetac_username)}")
         logger.info(f"Supabase URL: {settings.supabase_project_url}")
         logger.info("Application startup complete")
 
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        logger.info("Shutting down application...")
+        await shutdown_transport()
+
     return app
 
 
@@ -2,10 +2,14 @@
 Production-ready FastAPI application with all services integrated.
 """
 
+import asyncio
 import os
 import logging
+import tempfile
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from dataclasses import asdict
+from typing import Optional
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -21,10 +25,22 @@ from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.auth_logging import AuthLoggingMiddleware
 
 # Import services
+from app.core.config import get_settings
 from app.services.realtime import initialize_realtime_services, shutdown_realtime_services
 from app.services.cache import initialize_cache
+from app.services.transport import initialize_transport, shutdown_transport, get_transport
+from app.services.sicetac import get_sicetac_client
+from app.services.tariff_import import import_tariffs
+from app.services.prefetch import get_prefetcher, start_prefetcher, stop_prefetcher
+from app.services.warming import get_warmer, start_warmer, stop_warmer
 from app.services.monitoring import initialize_monitoring, metrics_collector, health_checker
 
+# Use development auth if environment is local
+if os.getenv('ENVIRONMENT', 'local') == 'local':
+    from app.core.auth_dev import get_current_user_dev as get_current_user
+else:
+    from app.core.auth import get_current_user
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,12 +62,21 @@ async def lifespan(app: FastAPI):
         cache_service = await initialize_cache()
         app.state.cache = cache_service
 
+        # Initialize shared SICETAC connection pool
+        app.state.sicetac_transport = await initialize_transport()
+
         # Initialize real-time services
         await initialize_realtime_services()
 
         # Initialize monitoring
         await initialize_monitoring()
 
+        # Prefetch popular lanes whenever the SICETAC period rolls over
+        start_prefetcher(get_sicetac_client(), get_settings())
+
+        # Keep the most quoted lanes warm
+        start_warmer(get_sicetac_client(), get_settings())
+
         logger.info("All services initialized successfully")
 
     except Exception as e:
@@ -65,6 +90,11 @@ async def lifespan(app: FastAPI):
 
     try:
         await shutdown_realtime_services()
+        await stop_prefetcher()
+        await stop_warmer()
+        if get_sicetac_client().tariff_store is not None:
+            await get_sicetac_client().tariff_store.flush()
+        await shutdown_transport()
         if hasattr(app.state, "cache") and app.state.cache:
             await app.state.cache.disconnect()
 
@@ -188,7 +218,9 @@ async def health():
 @app.get("/health/detailed")
 async def health_detailed():
     """Detailed health check with all service statuses."""
-    return await health_checker.run_checks()
+    results = await health_checker.run_checks()
+    results["sicetac_circuit"] = get_sicetac_client().breaker.get_stats()
+    return results
 
 
 # Metrics endpoint
@@ -201,12 +233,27 @@ async def metrics():
         "errors": metrics_collector.get_stats("error.count"),
         "cache": {
             "hits": metrics_collector.get_stats("cache.hit"),
-            "misses": metrics_collector.get_stats("cache.miss")
-        }
+            "misses": metrics_collector.get_stats("cache.miss"),
+            "tariffs": get_sicetac_client().tariff_cache.get_stats(),
+            "warm_coverage": metrics_collector.get_stats("cache.warm_coverage"),
+        },
+        "upstream_pool": get_transport().get_stats(),
+        "upstream_mirrors": get_sicetac_client().mirrors.get_stats(),
+        "upstream_coalescing": get_sicetac_client().coalescer.get_stats(),
+        "upstream_concurrency": get_sicetac_client().limiter.get_stats(),
+        "upstream_retries": get_sicetac_client().retry_budget.get_stats(),
+        "tariff_store": store.get_stats() if (store := get_sicetac_client().tariff_store) else None,
     }
 
 
 # Admin endpoints
+def require_admin(user: dict = Depends(get_current_user)) -> dict:
+    """Authenticated user with the admin role or a liftit.co account."""
+    if user.get("role") != "admin" and not user.get("email", "").endswith("@liftit.co"):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
+
 @app.get("/api/admin/cache/stats")
 async def cache_stats(request: Request):
     """Get cache statistics (admin only)."""
@@ -217,13 +264,88 @@ async def cache_stats(request: Request):
 
 @app.post("/api/admin/cache/clear")
 async def clear_cache(request: Request, pattern: str = "*"):
-    """Clear cache entries (admin only)."""
+    """Clear cache entries matching a Redis glob pattern (admin only).
+
+    Memory tiers are cleared before responding; Redis is cleared by a
+    background job whose progress is at /api/admin/cache/clear/{job_id}.
+    """
     if hasattr(request.app.state, "cache"):
-        count = await request.app.state.cache.clear_pattern(pattern)
-        return {"cleared": count, "pattern": pattern}
+        job = await request.app.state.cache.start_clear(pattern)
+        shared = get_sicetac_client().tariff_cache.clear_shared(pattern)
+        return {**asdict(job), "cleared": job.memory_deleted + shared}
     return {"error": "cache not initialized"}
 
 
+@app.get("/api/admin/cache/clear/{job_id}")
+async def clear_cache_status(request: Request, job_id: str):
+    """Progress of a background cache clear (admin only)."""
+    job = request.app.state.cache.get_clear_job(job_id) if hasattr(request.app.state, "cache") else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown cache clear job")
+    return asdict(job)
+
+
+@app.get("/api/admin/cache/warm/status")
+async def cache_warm_status():
+    """Last cache warming run and coverage of last week's traffic (admin only)."""
+    warmer = get_warmer()
+    if warmer is None:
+        return {"status": "cache warming disabled"}
+    return warmer.get_status()
+
+
+@app.get("/api/admin/prefetch/status")
+async def prefetch_status():
+    """Progress of the month-rollover tariff prefetch (admin only)."""
+    prefetcher = get_prefetcher()
+    if prefetcher is None:
+        return {"status": "prefetch disabled"}
+    return prefetcher.get_status()
+
+
+@app.post("/api/admin/tariffs/import")
+async def import_tariff_export(
+    request: Request,
+    period: Optional[str] = None,
+    format: Optional[str] = None,
+    encoding: str = "utf-8-sig",
+    _: dict = Depends(require_admin),
+):
+    """Import a SiceTac master export sent as the raw request body (admin only).
+
+    The body (CSV, or XLSX with ``format=xlsx``) is spooled to a temporary
+    file as it arrives and then streamed into the local tariff store. Cached
+    lanes of the imported periods are dropped so the import is served.
+    """
+    client = get_sicetac_client()
+    if client.tariff_store is None:
+        raise HTTPException(status_code=409, detail="The local tariff store is disabled")
+    if format is None and "spreadsheetml" in request.headers.get("content-type", ""):
+        format = "xlsx"
+    max_bytes = get_settings().tariff_import_max_bytes
+    too_large = HTTPException(status_code=413, detail=f"Exports are limited to {max_bytes} bytes")
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as upload:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise too_large
+            upload.write(chunk)
+        upload.seek(0)
+        try:
+            report = await asyncio.to_thread(
+                import_tariffs, client.tariff_store, upload, period=period, file_format=format, encoding=encoding
+            )
+        except (RuntimeError, ValueError, UnicodeDecodeError) as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    for imported in report.periods:
+        await client.tariff_cache.invalidate_period(imported)
+    return asdict(report)
+
 if __name__ == "__main__":
     # Production server configuration
     port = int(os.getenv("PORT", 8000))
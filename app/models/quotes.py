@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -9,6 +10,43 @@ _ALLOWED_CARGO_TYPES = {"GENERAL", "CONTENEDOR", "CARGA REFRIGERADA", "GRANEL S
 _ALLOWED_UNIT_TYPES = {"ESTACAS", "TRAYLER", "TERMOKING"}
 
 
+def _check_period(value: str) -> str:
+    if len(value) != 6 or not value.isdigit():
+        raise ValueError("Period must follow yyyymm format")
+    return value
+
+
+def _check_configuration(value: str) -> str:
+    candidate = value.upper()
+    if candidate not in _ALLOWED_CONFIGS:
+        raise ValueError(f"Configuration '{value}' is not supported by Sicetac")
+    return candidate
+
+
+def _check_divipola(value: str) -> str:
+    if len(value) != 8 or not value.isdigit() or not value.endswith("000"):
+        raise ValueError("DIVIPOLA codes must be 8 digits ending in 000")
+    return value
+
+
+def _check_cargo_type(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return value
+    if value.upper() not in _ALLOWED_CARGO_TYPES:
+        raise ValueError(
+            "Cargo type must be one of General, Contenedor, Carga Refrigerada, Granel Sólido",
+        )
+    return value.upper()
+
+
+def _check_unit_type(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return value
+    if value.upper() not in _ALLOWED_UNIT_TYPES:
+        raise ValueError("Unit type must be one of Estacas, Trayler, Termoking")
+    return value.upper()
+
+
 class QuoteRequest(BaseModel):
     period: str = Field(..., description="Period in yyyymm format (e.g. 202401).")
     configuration: str = Field(..., description="Truck configuration code (e.g. 3S3).")
@@ -35,44 +73,27 @@ class QuoteRequest(BaseModel):
     @field_validator("period")
     @classmethod
     def validate_period(cls, value: str) -> str:
-        if len(value) != 6 or not value.isdigit():
-            raise ValueError("Period must follow yyyymm format")
-        return value
+        return _check_period(value)
 
     @field_validator("configuration")
     @classmethod
     def normalise_configuration(cls, value: str) -> str:
-        candidate = value.upper()
-        if candidate not in _ALLOWED_CONFIGS:
-            raise ValueError(f"Configuration '{value}' is not supported by Sicetac")
-        return candidate
+        return _check_configuration(value)
 
     @field_validator("origin", "destination")
     @classmethod
     def validate_divipola(cls, value: str) -> str:
-        if len(value) != 8 or not value.isdigit() or not value.endswith("000"):
-            raise ValueError("DIVIPOLA codes must be 8 digits ending in 000")
-        return value
+        return _check_divipola(value)
 
     @field_validator("cargo_type")
     @classmethod
     def validate_cargo(cls, value: Optional[str]) -> Optional[str]:
-        if value is None:
-            return value
-        if value.upper() not in _ALLOWED_CARGO_TYPES:
-            raise ValueError(
-                "Cargo type must be one of General, Contenedor, Carga Refrigerada, Granel Sólido",
-            )
-        return value.upper()
+        return _check_cargo_type(value)
 
     @field_validator("unit_type")
     @classmethod
     def validate_unit(cls, value: Optional[str]) -> Optional[str]:
-        if value is None:
-            return value
-        if value.upper() not in _ALLOWED_UNIT_TYPES:
-            raise ValueError("Unit type must be one of Estacas, Trayler, Termoking")
-        return value.upper()
+        return _check_unit_type(value)
 
     @field_validator("variables")
     @classmethod
@@ -97,3 +118,90 @@ class QuoteResult(BaseModel):
 class QuoteResponse(BaseModel):
     request: QuoteRequest
     quotes: List[QuoteResult]
+    stale: bool = Field(
+        default=False,
+        description="True when Sicetac was unavailable and the last known tariffs were served.",
+    )
+    data_as_of: Optional[datetime] = Field(default=None, description="When the tariffs were fetched from Sicetac.")
+
+
+class QuoteError(BaseModel):
+    status_code: int = Field(..., description="HTTP status the single quote would have failed with.")
+    detail: str
+
+
+class BatchQuoteRequest(BaseModel):
+    items: List[QuoteRequest] = Field(..., min_length=1, description="Quote requests to resolve together.")
+
+
+class BatchQuoteItem(BaseModel):
+    index: int = Field(..., description="Position of the request in the submitted batch.")
+    request: QuoteRequest
+    quotes: Optional[List[QuoteResult]] = None
+    error: Optional[QuoteError] = None
+    stale: bool = False
+    data_as_of: Optional[datetime] = None
+
+
+class BatchQuoteResponse(BaseModel):
+    items: List[BatchQuoteItem]
+    total: int
+    succeeded: int
+    failed: int
+
+
+class MatrixQuoteRequest(BaseModel):
+    period: str = Field(..., description="Period in yyyymm format (e.g. 202401).")
+    origins: List[str] = Field(..., min_length=1, description="DIVIPOLA origin codes.")
+    destinations: List[str] = Field(..., min_length=1, description="DIVIPOLA destination codes.")
+    configurations: Optional[List[str]] = Field(
+        default=None,
+        validate_default=True,
+        description="Truck configurations to include. Defaults to every configuration Sicetac supports.",
+    )
+    cargo_type: Optional[str] = Field(default=None)
+    unit_type: Optional[str] = Field(default=None)
+    logistics_hours: float = Field(default=0.0, ge=0)
+
+    @field_validator("period")
+    @classmethod
+    def validate_period(cls, value: str) -> str:
+        return _check_period(value)
+
+    @field_validator("origins", "destinations")
+    @classmethod
+    def validate_divipola(cls, value: List[str]) -> List[str]:
+        return list(dict.fromkeys(_check_divipola(code) for code in value))
+
+    @field_validator("configurations")
+    @classmethod
+    def normalise_configurations(cls, value: Optional[List[str]]) -> List[str]:
+        if not value:
+            return sorted(_ALLOWED_CONFIGS)
+        return list(dict.fromkeys(_check_configuration(config) for config in value))
+
+    @field_validator("cargo_type")
+    @classmethod
+    def validate_cargo(cls, value: Optional[str]) -> Optional[str]:
+        return _check_cargo_type(value)
+
+    @field_validator("unit_type")
+    @classmethod
+    def validate_unit(cls, value: Optional[str]) -> Optional[str]:
+        return _check_unit_type(value)
+
+
+class MatrixCellError(BaseModel):
+    origin: str
+    destination: str
+    configuration: str
+    status_code: int
+    detail: str
+
+
+class MatrixQuoteResponse(BaseModel):
+    period: str
+    logistics_hours: float
+    rows: int = Field(..., description="Number of quotes, i.e. the length of every column.")
+    columns: Dict[str, List[Any]] = Field(..., description="One array per field, aligned by row.")
+    errors: List[MatrixCellError]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, Float, Index, Integer, String, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.declarative import declarative_base
+
+# Separate metadata from app.models.database: the tariff store is a local
+# cache of SICETAC data, not application data, and lives in its own file.
+TariffBase = declarative_base()
+
+
+class TariffDocumentDB(TariffBase):
+    """One raw SICETAC document (a unit/cargo tariff row) for a lane and period."""
+
+    __tablename__ = "tariff_documents"
+
+    id = Column(Integer, primary_key=True)
+
+    # Lane
+    period = Column(String(6), nullable=False)
+    configuration = Column(String(10), nullable=False)
+    origin_code = Column(String(8), nullable=False)
+    destination_code = Column(String(8), nullable=False)
+    unit_type = Column(String(50), nullable=True)
+    cargo_type = Column(String(50), nullable=True)
+
+    # Document values, as SICETAC returns them
+    route_code = Column(String(20), nullable=True)
+    route_name = Column(String(255), nullable=True)
+    mobilization_value = Column(Float, nullable=False)
+    ton_value = Column(Float, nullable=True)
+    hour_value = Column(Float, nullable=True)
+    distance_km = Column(Float, nullable=True)
+
+    # When SICETAC (or an import) produced the value, epoch seconds
+    fetched_at = Column(Float, nullable=False)
+    # "soap" for upstream answers, "import" for rows from a period export
+    source = Column(String(10), nullable=False, default="soap")
+
+    __table_args__ = (
+        Index(
+            "idx_tariff_lane",
+            "period", "configuration", "origin_code", "destination_code", "unit_type", "cargo_type",
+        ),
+    )
+
+
+def create_tariff_engine(url: str) -> Engine:
+    """Engine for the tariff store, configured like app.models.database."""
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_pre_ping=True, pool_size=5, max_overflow=10)
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets every worker read while one of them writes behind.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    return engine
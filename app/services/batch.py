@@ -0,0 +1,216 @@
+"""
+Batch quoting: resolve many quote requests with bounded upstream fan-out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Hashable, List, Optional, Sequence
+
+import httpx
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from app.core.config import Settings
+from app.models.quotes import BatchQuoteItem, QuoteError, QuoteRequest
+from app.services.concurrency import BATCH
+from app.services.pricing import LaneTariffs, price_documents
+from app.services.sicetac import SicetacClient
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamRateLimiter:
+    """
+    Token bucket pacing upstream lane lookups to ``rate`` per second.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# One limiter per process, so concurrent matrix calls share the upstream rate
+_matrix_limiter: Optional[UpstreamRateLimiter] = None
+_matrix_limiter_settings: Optional[Settings] = None
+
+
+def get_matrix_rate_limiter(settings: Settings) -> UpstreamRateLimiter:
+    """The process-wide limiter for matrix calls' upstream lookups."""
+    global _matrix_limiter, _matrix_limiter_settings
+
+    if _matrix_limiter is None or _matrix_limiter_settings is not settings:
+        _matrix_limiter = UpstreamRateLimiter(
+            settings.matrix_upstream_rate_per_second,
+            burst=settings.batch_max_concurrency,
+        )
+        _matrix_limiter_settings = settings
+    return _matrix_limiter
+
+
+def _to_error(exc: BaseException) -> QuoteError:
+    """Map a lookup failure to the error a single /quote call would have returned."""
+    if isinstance(exc, HTTPException):
+        return QuoteError(status_code=exc.status_code, detail=str(exc.detail))
+    if isinstance(exc, httpx.TimeoutException):
+        return QuoteError(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Sicetac request timed out")
+    return QuoteError(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Sicetac request failed: {exc}")
+
+
+def _price_items(
+    lane_items: List[int],
+    requests: Sequence[QuoteRequest],
+    lane: LaneTariffs | None,
+    error: BaseException | None,
+) -> List[BatchQuoteItem]:
+    items = []
+    for index in lane_items:
+        request = requests[index]
+        if error is not None:
+            items.append(BatchQuoteItem(index=index, request=request, error=_to_error(error)))
+            continue
+        try:
+            quotes = price_documents(lane.documents, request)
+        except HTTPException as exc:
+            items.append(BatchQuoteItem(index=index, request=request, error=_to_error(exc)))
+        else:
+            items.append(BatchQuoteItem(
+                index=index,
+                request=request,
+                quotes=quotes,
+                stale=lane.stale,
+                data_as_of=lane.data_as_of,
+            ))
+    return items
+
+
+async def iter_batch(
+    client: SicetacClient,
+    requests: Sequence[QuoteRequest],
+    concurrency: int,
+    buffer_size: int = 0,
+    rate_limiter: Optional[UpstreamRateLimiter] = None,
+    priority: str = BATCH,
+) -> AsyncIterator[BatchQuoteItem]:
+    """
+    Yield one item per request as soon as its lane is resolved.
+
+    Requests sharing a lane are looked up once. Cached lanes are served
+    first, then misses are fetched by at most ``concurrency`` workers.
+    With ``buffer_size`` set, workers pause once that many resolved lanes
+    are waiting to be consumed, so a slow reader bounds memory use. A
+    ``rate_limiter`` additionally paces how often workers go upstream.
+    Upstream calls queue behind interactive quotes in the ``priority`` lane.
+    """
+    lanes: Dict[Hashable, List[int]] = defaultdict(list)
+    for index, request in enumerate(requests):
+        lanes[client.lane_key(request)].append(index)
+    logger.info(f"Batch of {len(requests)} requests spans {len(lanes)} unique lanes")
+
+    misses: List[Hashable] = []
+    async for item in _iter_cached(client, requests, lanes, misses):
+        yield item
+    if not misses:
+        return
+    async for item in _iter_fetched(
+        client, requests, lanes, misses, concurrency, buffer_size, rate_limiter, priority
+    ):
+        yield item
+
+
+async def _iter_cached(
+    client: SicetacClient,
+    requests: Sequence[QuoteRequest],
+    lanes: Dict[Hashable, List[int]],
+    misses: List[Hashable],
+) -> AsyncIterator[BatchQuoteItem]:
+    """Serve lanes already in the tariff cache, collecting the rest into ``misses``.
+
+    The cache is read in one bulk lookup for every lane of the batch.
+    """
+    cached_lanes = await client.cached_lanes([requests[lane_items[0]] for lane_items in lanes.values()])
+    for (lane, lane_items), cached in zip(lanes.items(), cached_lanes):
+        if isinstance(cached, HTTPException):
+            for item in _price_items(lane_items, requests, None, cached):
+                yield item
+            continue
+        if cached is None:
+            misses.append(lane)
+            continue
+        for item in _price_items(lane_items, requests, cached, None):
+            yield item
+
+
+async def _fetch_items(
+    client: SicetacClient,
+    requests: Sequence[QuoteRequest],
+    lane: Hashable,
+    lane_items: List[int],
+    priority: str,
+) -> List[BatchQuoteItem]:
+    try:
+        fetched = await client.fetch_lane(requests[lane_items[0]], priority)
+    except Exception as exc:
+        logger.warning(f"Batch lane {lane[:4]} failed: {exc!r}")
+        return _price_items(lane_items, requests, None, exc)
+    return _price_items(lane_items, requests, fetched, None)
+
+
+async def _iter_fetched(
+    client: SicetacClient,
+    requests: Sequence[QuoteRequest],
+    lanes: Dict[Hashable, List[int]],
+    misses: List[Hashable],
+    concurrency: int,
+    buffer_size: int,
+    rate_limiter: Optional[UpstreamRateLimiter],
+    priority: str,
+) -> AsyncIterator[BatchQuoteItem]:
+    """Fetch missing lanes with a bounded worker pool, yielding in completion order."""
+    pending: asyncio.Queue = asyncio.Queue()
+    for lane in misses:
+        pending.put_nowait(lane)
+    results: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+    async def worker() -> None:
+        while True:
+            try:
+                lane = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if rate_limiter is not None:
+                await rate_limiter.acquire()
+            await results.put(await _fetch_items(client, requests, lane, lanes[lane], priority))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(misses)))]
+    try:
+        for _ in range(len(misses)):
+            for item in await results.get():
+                yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def iter_ndjson(items: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+    """Encode each item as one NDJSON line as soon as it is available."""
+    async for item in items:
+        yield item.model_dump_json().encode("utf-8") + b"\n"
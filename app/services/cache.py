@@ -5,30 +5,111 @@ Production caching service with Redis and in-memory fallback.
 import json
 import hashlib
 import logging
-from typing import Any, Dict, Optional, Union
-from datetime import datetime, timedelta
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Union
 from functools import wraps
 import asyncio
 
+from app.services.invalidation import InvalidationBus
+from app.services.memory_tier import MemoryTier
+from app.services.serialization import Serializer
+from app.services.shared_tariffs import SharedTariffFile, get_shared_tariff_file
+from app.utils.periods import is_closed_period
+
 logger = logging.getLogger("cache")
 
+# Keys per Redis MGET, pipeline or UNLINK in the bulk operations.
+_BULK_CHUNK = 500
+
+# Finished clear jobs kept for progress queries.
+_MAX_CLEAR_JOBS = 20
+
+
+@dataclass
+class ClearJob:
+    """Progress of a pattern clear; Redis keys are counted as they are unlinked."""
+
+    id: str
+    pattern: str
+    state: str = "running"  # running, done, failed
+    memory_deleted: int = 0
+    matched: int = 0
+    deleted: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+def _chunks(items: Sequence, size: int = _BULK_CHUNK) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class CacheService:
     """
     Multi-tier caching service with Redis and in-memory fallback.
     """
 
-    def __init__(self, redis_client=None):
+    def __init__(
+        self,
+        redis_client=None,
+        memory_max_entries: int = 10000,
+        memory_max_bytes: int = 64 * 1024 * 1024,
+        serializer: Optional[Serializer] = None,
+    ):
         self.redis_client = redis_client
-        self.memory_cache: Dict[str, Dict[str, Any]] = {}
+        self.serializer = serializer or Serializer()
+        self.memory_cache = MemoryTier(memory_max_entries, memory_max_bytes)
+        self.instance_id = uuid.uuid4().hex
+        self.invalidations: Optional[InvalidationBus] = None
+        self._pattern_listeners: List[Callable[[str], Any]] = []
+        self._clear_jobs: "OrderedDict[str, ClearJob]" = OrderedDict()
+        self._clear_tasks: Set[asyncio.Task] = set()
         self.cache_stats = {
             "hits": 0,
             "misses": 0,
             "errors": 0,
             "memory_hits": 0,
-            "redis_hits": 0
+            "redis_hits": 0,
         }
 
+    @classmethod
+    def from_settings(cls, settings, redis_client=None) -> "CacheService":
+        return cls(
+            redis_client,
+            memory_max_entries=settings.cache_memory_max_entries,
+            memory_max_bytes=settings.cache_memory_max_bytes,
+            serializer=Serializer.from_settings(settings),
+        )
+
+    def attach_invalidations(self, bus: InvalidationBus) -> None:
+        """Share deletes with other workers' memory tiers through ``bus``."""
+        self.invalidations = bus
+        bus.subscribe(self._on_invalidation)
+
+    def add_pattern_listener(self, listener: Callable[[str], Any]) -> None:
+        """Also apply pattern clears received from other workers with ``listener``."""
+        if listener not in self._pattern_listeners:
+            self._pattern_listeners.append(listener)
+
+    async def _broadcast(self, **event: Any) -> None:
+        if self.invalidations is not None:
+            await self.invalidations.publish({"origin": self.instance_id, **event})
+
+    def _on_invalidation(self, event: Dict[str, Any]) -> None:
+        """Apply another worker's delete to this memory tier (and pattern listeners)."""
+        if event.get("origin") == self.instance_id:
+            return
+        for key in event.get("keys", ()):
+            self.memory_cache.delete(key)
+        if "pattern" in event:
+            self._clear_memory_pattern(event["pattern"])
+            for listener in self._pattern_listeners:
+                listener(event["pattern"])
+
     def _generate_cache_key(self, prefix: str, params: Dict[str, Any]) -> str:
         """Generate a consistent cache key from parameters."""
         # Sort params for consistent key generation
@@ -52,21 +133,17 @@ class CacheService:
                     if value:
                         self.cache_stats["hits"] += 1
                         self.cache_stats["redis_hits"] += 1
-                        return json.loads(value) if isinstance(value, str) else value
+                        return self.serializer.loads(value)
                 except Exception as e:
                     logger.warning(f"Redis get error: {e}")
                     self.cache_stats["errors"] += 1
 
             # Fall back to memory cache
-            if key in self.memory_cache:
-                entry = self.memory_cache[key]
-                if entry["expires_at"] > datetime.utcnow():
-                    self.cache_stats["hits"] += 1
-                    self.cache_stats["memory_hits"] += 1
-                    return entry["value"]
-                else:
-                    # Expired, remove it
-                    del self.memory_cache[key]
+            value = self.memory_cache.get(key)
+            if value is not None:
+                self.cache_stats["hits"] += 1
+                self.cache_stats["memory_hits"] += 1
+                return value
 
             self.cache_stats["misses"] += 1
             return default
@@ -80,32 +157,35 @@ class CacheService:
         self,
         key: str,
         value: Any,
-        ttl: int = 300  # 5 minutes default
+        ttl: Optional[int] = 300,  # 5 minutes default, None never expires
+        local: bool = True,
     ) -> bool:
         """
         Set value in cache (both Redis and memory).
+
+        With ``local`` off the value skips this worker's memory tier, for
+        values kept in a tier shared by the host's workers.
         """
         try:
-            # Serialize value
-            serialized = json.dumps(value) if not isinstance(value, str) else value
+            # Serialize value (binary, compressed above a size threshold)
+            serialized, size = self.serializer.encode(value)
 
             # Store in Redis
             if self.redis_client:
                 try:
-                    await self.redis_client.setex(key, ttl, serialized)
+                    if ttl is None:
+                        await self.redis_client.set(key, serialized)
+                    else:
+                        await self.redis_client.setex(key, ttl, serialized)
                 except Exception as e:
                     logger.warning(f"Redis set error: {e}")
                     self.cache_stats["errors"] += 1
 
-            # Store in memory cache with expiration
-            self.memory_cache[key] = {
-                "value": value,
-                "expires_at": datetime.utcnow() + timedelta(seconds=ttl)
-            }
-
-            # Limit memory cache size
-            if len(self.memory_cache) > 1000:
-                self._cleanup_memory_cache()
+            # Store in memory cache; the tier evicts by recency and size
+            if local:
+                self.memory_cache.set(key, value, ttl, size)
+            else:
+                self.memory_cache.delete(key)
 
             return True
 
@@ -114,6 +194,92 @@ class CacheService:
             self.cache_stats["errors"] += 1
             return False
 
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Values of the cached ``keys``, missing ones left out.
+
+        Redis is read with one MGET per chunk of keys instead of one round
+        trip per key; keys Redis does not have fall back to memory.
+        """
+        found: Dict[str, Any] = {}
+        remaining = list(dict.fromkeys(keys))
+        if self.redis_client and remaining:
+            try:
+                for chunk in _chunks(remaining):
+                    for key, value in zip(chunk, await self.redis_client.mget(chunk)):
+                        if value:
+                            found[key] = self.serializer.loads(value)
+            except Exception as e:
+                logger.warning(f"Redis mget error: {e}")
+                self.cache_stats["errors"] += 1
+            self.cache_stats["redis_hits"] += len(found)
+            remaining = [key for key in remaining if key not in found]
+
+        for key in remaining:
+            value = self.memory_cache.get(key)
+            if value is not None:
+                found[key] = value
+                self.cache_stats["memory_hits"] += 1
+
+        self.cache_stats["hits"] += len(found)
+        self.cache_stats["misses"] += len(keys) - len(found)
+        return found
+
+    async def set_many(
+        self,
+        values: Dict[str, Any],
+        ttl: Optional[int] = 300,
+        ttls: Optional[Dict[str, Optional[int]]] = None,
+    ) -> bool:
+        """Set several values, pipelined to Redis in chunks.
+
+        Every value gets ``ttl`` unless ``ttls`` names another for its key.
+        """
+        try:
+            encoded = {key: self.serializer.encode(value) for key, value in values.items()}
+            key_ttls = dict.fromkeys(values, ttl)
+            key_ttls.update(ttls or {})
+
+            if self.redis_client:
+                try:
+                    for chunk in _chunks(list(encoded)):
+                        pipe = self.redis_client.pipeline(transaction=False)
+                        for key in chunk:
+                            if key_ttls[key] is None:
+                                pipe.set(key, encoded[key][0])
+                            else:
+                                pipe.setex(key, key_ttls[key], encoded[key][0])
+                        await pipe.execute()
+                except Exception as e:
+                    logger.warning(f"Redis pipelined set error: {e}")
+                    self.cache_stats["errors"] += 1
+
+            for key, value in values.items():
+                self.memory_cache.set(key, value, key_ttls[key], encoded[key][1])
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            self.cache_stats["errors"] += 1
+            return False
+
+    async def delete_many(self, keys: Sequence[str]) -> int:
+        """Delete several keys; Redis frees them with UNLINK, off its main thread."""
+        deleted = 0
+        keys = list(dict.fromkeys(keys))
+        if self.redis_client and keys:
+            try:
+                for chunk in _chunks(keys):
+                    deleted += await self.redis_client.unlink(*chunk)
+            except Exception as e:
+                logger.warning(f"Redis unlink error: {e}")
+                self.cache_stats["errors"] += 1
+
+        memory_deleted = sum(self.memory_cache.delete(key) for key in keys)
+        await self._broadcast(keys=keys)
+        return max(deleted, memory_deleted)
+
     async def delete(self, key: str) -> bool:
         """Delete value from cache."""
         try:
@@ -124,9 +290,9 @@ class CacheService:
                 except Exception as e:
                     logger.warning(f"Redis delete error: {e}")
 
-            # Delete from memory
-            if key in self.memory_cache:
-                del self.memory_cache[key]
+            # Delete from memory, here and in the other workers
+            self.memory_cache.delete(key)
+            await self._broadcast(keys=[key])
 
             return True
 
@@ -135,47 +301,82 @@ class CacheService:
             return False
 
     async def clear_pattern(self, pattern: str) -> int:
-        """Clear all keys matching a pattern."""
-        count = 0
+        """
+        Clear all keys matching a Redis glob pattern, waiting for Redis.
 
-        # Clear from Redis
+        ``*``, ``?`` and ``[...]`` match as in Redis SCAN MATCH, in memory
+        too: ``quote:11001000:*`` never touches ``route:11001000:...``.
+        """
+        job = await self._begin_clear(pattern)
         if self.redis_client:
-            try:
-                async for key in self.redis_client.scan_iter(pattern):
-                    await self.redis_client.delete(key)
-                    count += 1
-            except Exception as e:
-                logger.warning(f"Redis clear pattern error: {e}")
-
-        # Clear from memory
-        keys_to_delete = [
-            k for k in self.memory_cache.keys()
-            if pattern.replace("*", "") in k
-        ]
-        for key in keys_to_delete:
-            del self.memory_cache[key]
-            count += 1
+            await self._clear_redis(job)
+        return job.memory_deleted + job.deleted
 
-        return count
+    async def start_clear(self, pattern: str) -> "ClearJob":
+        """
+        Clear matching keys from the memory tiers now and from Redis in a
+        background job; the returned job reports progress.
+        """
+        job = await self._begin_clear(pattern)
+        if self.redis_client:
+            task = asyncio.create_task(self._clear_redis(job))
+            self._clear_tasks.add(task)
+            task.add_done_callback(self._clear_tasks.discard)
+        return job
+
+    def get_clear_job(self, job_id: str) -> Optional["ClearJob"]:
+        return self._clear_jobs.get(job_id)
+
+    async def _begin_clear(self, pattern: str) -> "ClearJob":
+        job = ClearJob(id=uuid.uuid4().hex[:12], pattern=pattern)
+        self._clear_jobs[job.id] = job
+        while len(self._clear_jobs) > _MAX_CLEAR_JOBS:
+            self._clear_jobs.popitem(last=False)
+
+        # Clear from memory, here and in the other workers
+        job.memory_deleted = self._clear_memory_pattern(pattern)
+        await self._broadcast(pattern=pattern)
+        if not self.redis_client:
+            job.state = "done"
+            job.finished_at = time.time()
+        return job
+
+    async def _clear_redis(self, job: "ClearJob") -> None:
+        """SCAN the keyspace in chunks and UNLINK each chunk, so Redis never blocks."""
+        try:
+            chunk: List[Any] = []
+            async for key in self.redis_client.scan_iter(job.pattern, count=_BULK_CHUNK):
+                job.matched += 1
+                chunk.append(key)
+                if len(chunk) >= _BULK_CHUNK:
+                    job.deleted += await self.redis_client.unlink(*chunk)
+                    chunk = []
+            if chunk:
+                job.deleted += await self.redis_client.unlink(*chunk)
+            job.state = "done"
+        except Exception as e:
+            logger.warning(f"Redis clear pattern error: {e}")
+            self.cache_stats["errors"] += 1
+            job.state = "failed"
+            job.error = repr(e)
+        finally:
+            job.finished_at = time.time()
 
-    def _cleanup_memory_cache(self):
-        """Remove expired entries from memory cache."""
-        now = datetime.utcnow()
-        expired_keys = [
-            key for key, entry in self.memory_cache.items()
-            if entry["expires_at"] <= now
-        ]
-        for key in expired_keys:
-            del self.memory_cache[key]
-
-        # If still too large, remove oldest entries
-        if len(self.memory_cache) > 800:
-            sorted_entries = sorted(
-                self.memory_cache.items(),
-                key=lambda x: x[1]["expires_at"]
-            )
-            for key, _ in sorted_entries[:200]:
-                del self.memory_cache[key]
+    def _clear_memory_pattern(self, pattern: str) -> int:
+        keys_to_delete = self.memory_cache.keys_matching(pattern)
+        for key in keys_to_delete:
+            self.memory_cache.delete(key)
+        return len(keys_to_delete)
+
+    async def disconnect(self) -> None:
+        """Stop listening for invalidations and clear jobs, and close the Redis connection."""
+        if self.invalidations is not None:
+            await self.invalidations.stop()
+        for task in self._clear_tasks:
+            task.cancel()
+        await asyncio.gather(*self._clear_tasks, return_exceptions=True)
+        if self.redis_client:
+            await self.redis_client.aclose()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -190,6 +391,8 @@ class CacheService:
             "total_requests": total_requests,
             "hit_rate": round(hit_rate, 2),
             "memory_cache_size": len(self.memory_cache),
+            "memory_cache": self.memory_cache.get_stats(),
+            "invalidations": self.invalidations.get_stats() if self.invalidations else None,
             "redis_available": bool(self.redis_client)
         }
 
@@ -280,54 +483,269 @@ class QuoteCache:
         period: str,
         quote_data: Dict
     ):
-        """Cache quote data."""
+        """Cache quote data, and its route info, in one Redis pipeline."""
         key = f"quote:{origin}:{destination}:{config}:{period}"
-        await self.cache.set(key, quote_data, self.quote_ttl)
-
-        # Also cache route info
         route_key = f"route:{origin}:{destination}"
-        await self.cache.set(
-            route_key,
-            {"distance": quote_data.get("distance"), "active": True},
-            self.route_ttl
+        await self.cache.set_many(
+            {key: quote_data, route_key: {"distance": quote_data.get("distance"), "active": True}},
+            ttls={key: self.quote_ttl, route_key: self.route_ttl},
         )
 
     async def invalidate_route(self, origin: str, destination: str):
         """Invalidate all quotes for a route."""
         pattern = f"quote:{origin}:{destination}:*"
-        count = await self.cache.clear_pattern(pattern)
-        logger.info(f"Invalidated {count} quotes for {origin}-{destination}")
+        job = await self.cache.start_clear(pattern)
+        logger.info(
+            f"Invalidated {job.memory_deleted} cached quotes for {origin}-{destination}, "
+            f"Redis clear running as job {job.id}"
+        )
+        return job
 
-    async def warm_cache(self, popular_routes: list):
-        """Pre-warm cache with popular routes."""
-        from app.services.sicetac import SicetacClient
-        from app.core.config import get_settings
+    async def warm_cache(self, popular_routes: Optional[list] = None):
+        """Warm the tariff cache for ``popular_routes``, or the hottest lanes in history.
 
-        client = SicetacClient(get_settings())
-        warmed = 0
+        Routes are dicts with ``configuration``, ``origin`` and ``destination``,
+        and optionally ``period`` (default: the current one). Warming goes
+        through app.services.warming.CacheWarmer; returns one progress per period.
+        """
+        from app.core.config import get_settings
+        from app.services.sicetac import get_sicetac_client
+        from app.services.warming import CacheWarmer, get_warmer
 
+        warmer = get_warmer() or CacheWarmer.from_settings(get_sicetac_client(), get_settings())
+        if popular_routes is None:
+            return [await warmer.warm()]
+        lanes_by_period: Dict[Optional[str], list] = {}
         for route in popular_routes:
-            try:
-                # Fetch and cache quote
-                quote_data = await client.fetch_quotes(route)
-                await self.set_quote(
-                    route["origin"],
-                    route["destination"],
-                    route["configuration"],
-                    route["period"],
-                    quote_data
-                )
-                warmed += 1
-            except Exception as e:
-                logger.error(f"Failed to warm cache for route: {e}")
+            lanes_by_period.setdefault(route.get("period"), []).append(
+                (route["configuration"], route["origin"], route["destination"])
+            )
+        return [await warmer.warm(period=period, lanes=lanes) for period, lanes in lanes_by_period.items()]
 
-        logger.info(f"Warmed cache with {warmed} routes")
+
+class TariffCache:
+    """
+    Cache for SICETAC tariffs, which are fixed for each monthly period.
+
+    Tariffs of closed periods never expire, the current period gets a long
+    TTL and lookups SICETAC answered without tariffs are cached briefly.
+    For ``revalidate_ttl`` seconds after the TTL an entry is still a hit,
+    flagged ``revalidate`` so the caller refreshes it in the background
+    (stale-while-revalidate). Expired current-period entries are kept for
+    ``stale_ttl`` more seconds so they can still be served, marked stale,
+    while SICETAC is down. With a ``shared`` file, entries live once per
+    host in it instead of in every worker's memory tier.
+    """
+
+    def __init__(
+        self,
+        cache_service: CacheService,
+        current_ttl: int = 43200,
+        negative_ttl: int = 120,
+        stale_ttl: int = 2592000,
+        revalidate_ttl: int = 43200,
+        shared: Optional[SharedTariffFile] = None,
+    ):
+        self.cache = cache_service
+        self.shared = shared
+        if shared is not None:
+            # Clears from other hosts reach this host's file through the cache's invalidations.
+            cache_service.add_pattern_listener(self.clear_shared)
+        self.current_ttl = current_ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.revalidate_ttl = revalidate_ttl
+        self.stats = {"hits": 0, "misses": 0, "negative_hits": 0, "stale_hits": 0, "revalidations": 0}
+
+    @classmethod
+    def from_settings(cls, cache_service: CacheService, settings) -> "TariffCache":
+        return cls(
+            cache_service,
+            current_ttl=settings.tariff_cache_current_ttl_seconds,
+            negative_ttl=settings.tariff_cache_negative_ttl_seconds,
+            stale_ttl=settings.tariff_cache_stale_ttl_seconds,
+            revalidate_ttl=settings.tariff_cache_revalidate_seconds,
+            shared=get_shared_tariff_file(settings),
+        )
+
+    def ttl_for(self, period: str) -> Optional[int]:
+        """TTL for a period: None (never expire) once the month is closed."""
+        if is_closed_period(period):
+            return None
+        return self.current_ttl
+
+    @staticmethod
+    def _key(quote_request) -> str:
+        """Key for a lane; unit/cargo filters and hours are applied after lookup."""
+        key = (
+            f"tariff:{quote_request.period}:{quote_request.configuration}:"
+            f"{quote_request.origin}:{quote_request.destination}"
+        )
+        if quote_request.variables:
+            variables_hash = hashlib.md5(",".join(quote_request.variables).encode()).hexdigest()[:8]
+            key = f"{key}:{variables_hash}"
+        return key
+
+    def is_fresh_fetch(self, period: str, fetched_at: float) -> bool:
+        """Whether documents fetched at ``fetched_at`` are still within their TTL."""
+        ttl = self.ttl_for(period)
+        return ttl is None or fetched_at + ttl > time.time()
+
+    @staticmethod
+    def _is_fresh(entry: Dict) -> bool:
+        fresh_until = entry.get("fresh_until")
+        return fresh_until is None or fresh_until > time.time()
+
+    async def get(self, quote_request) -> Optional[Dict]:
+        """Get a fresh entry: {"documents": [...], "fetched_at": ...} or {"error": {...}}."""
+        return self._count(await self._read(self._key(quote_request)))
+
+    async def get_many(self, quote_requests: Sequence) -> List[Optional[Dict]]:
+        """``get`` for many lanes in one bulk cache read, in request order."""
+        keys = [self._key(quote_request) for quote_request in quote_requests]
+        entries = await self._read_many(keys)
+        return [self._count(entries.get(key)) for key in keys]
+
+    def _count(self, entry: Optional[Dict]) -> Optional[Dict]:
+        """Classify a raw entry as a hit, a revalidating hit or a miss, and count it."""
+        from app.services.monitoring import performance_monitor
+
+        if entry is not None and not self._is_fresh(entry):
+            if (entry.get("revalidate_until") or 0) > time.time():
+                self.stats["revalidations"] += 1
+                entry = {**entry, "revalidate": True}
+            else:
+                entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            performance_monitor.record_cache_miss("tariff")
+            return None
+
+        self.stats["hits"] += 1
+        if "error" in entry:
+            self.stats["negative_hits"] += 1
+        performance_monitor.record_cache_hit("tariff")
+        return entry
+
+    async def peek(self, quote_request) -> Optional[Dict]:
+        """Fresh entry for a lane without counting a hit or miss (warming, coverage)."""
+        entry = await self._read(self._key(quote_request))
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry
+
+    async def peek_many(self, quote_requests: Sequence) -> List[Optional[Dict]]:
+        """``peek`` for many lanes in one bulk cache read, in request order."""
+        keys = [self._key(quote_request) for quote_request in quote_requests]
+        entries = await self._read_many(keys)
+        return [
+            entry if entry is not None and self._is_fresh(entry) else None
+            for entry in map(entries.get, keys)
+        ]
+
+    async def get_stale(self, quote_request) -> Optional[Dict]:
+        """Last known documents for a lane, even past their TTL."""
+        entry = await self._read(self._key(quote_request))
+        if entry is None or "documents" not in entry:
+            return None
+        self.stats["stale_hits"] += 1
+        return entry
+
+    async def set(
+        self,
+        quote_request,
+        documents: list,
+        fetched_at: Optional[float] = None,
+        pinned: bool = False,
+    ):
+        """Cache the raw, unfiltered documents SICETAC returned for a lane.
+
+        ``fetched_at`` keeps the original fetch time of documents that come
+        from the local tariff store rather than straight from SICETAC.
+        ``pinned`` documents (an imported period export) never expire.
+        """
+        fetched_at = fetched_at or time.time()
+        ttl = None if pinned else self.ttl_for(quote_request.period)
+        await self._write(
+            self._key(quote_request),
+            {
+                "documents": documents,
+                "fetched_at": fetched_at,
+                "fresh_until": None if ttl is None else fetched_at + ttl,
+                "revalidate_until": None if ttl is None else fetched_at + ttl + self.revalidate_ttl,
+            },
+            None if ttl is None else ttl + self.stale_ttl,
+        )
+
+    async def set_negative(self, quote_request, status_code: int, detail: str):
+        """Cache briefly that SICETAC had no tariff for a lane."""
+        await self._write(
+            self._key(quote_request),
+            {"error": {"status_code": status_code, "detail": detail}},
+            self.negative_ttl,
+        )
+
+    async def _read(self, key: str) -> Optional[Dict]:
+        if self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not None:
+                return entry
+        return await self.cache.get(key)
+
+    async def _read_many(self, keys: Sequence[str]) -> Dict[str, Dict]:
+        entries: Dict[str, Dict] = {}
+        if self.shared is not None:
+            for key in keys:
+                entry = self.shared.get(key)
+                if entry is not None:
+                    entries[key] = entry
+        missing = [key for key in keys if key not in entries]
+        if missing:
+            entries.update(await self.cache.get_many(missing))
+        return entries
+
+    async def _write(self, key: str, entry: Dict, ttl: Optional[int]) -> None:
+        # Redis still gets every entry, for the workers of other hosts.
+        shared = self.shared is not None and self.shared.put(key, entry, ttl)
+        await self.cache.set(key, entry, ttl, local=not shared)
+
+    def clear_shared(self, pattern: str) -> int:
+        """Delete entries matching a glob pattern from the host's shared file."""
+        return self.shared.delete_matching(pattern) if self.shared is not None else 0
+
+    async def invalidate_period(self, period: str) -> int:
+        """Drop every cached lane of a period, e.g. after its tariffs were imported.
+
+        Closed periods are cached without expiry, so lanes cached before an
+        import would otherwise never pick it up.
+        """
+        pattern = f"tariff:{period}:*"
+        return await self.cache.clear_pattern(pattern) + self.clear_shared(pattern)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / total * 100, 2) if total else 0,
+            "shared": self.shared.get_stats() if self.shared is not None else None,
+        }
 
 
 # Global cache instance
 cache_service: Optional[CacheService] = None
 
 
+def get_cache_service() -> CacheService:
+    """Return the global cache, falling back to a memory-only one."""
+    global cache_service
+
+    if cache_service is None:
+        from app.core.config import get_settings
+
+        cache_service = CacheService.from_settings(get_settings())
+    return cache_service
+
+
 async def initialize_cache():
     """Initialize cache service."""
     global cache_service
@@ -338,7 +756,7 @@ async def initialize_cache():
         redis_client = await redis.from_url(
             "redis://localhost:6379",
             encoding="utf-8",
-            decode_responses=True
+            decode_responses=False  # values are binary, see app.services.serialization
         )
         await redis_client.ping()
         logger.info("Connected to Redis cache")
@@ -346,5 +764,11 @@ async def initialize_cache():
         logger.warning("Redis not available, using memory cache only")
         redis_client = None
 
-    cache_service = CacheService(redis_client)
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    cache_service = CacheService.from_settings(settings, redis_client)
+    bus = InvalidationBus(redis_client, settings.cache_invalidation_channel)
+    cache_service.attach_invalidations(bus)
+    bus.start()
     return cache_service
\ No newline at end of file
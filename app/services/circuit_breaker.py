@@ -0,0 +1,159 @@
+"""
+Circuit breaker for the SICETAC SOAP upstream.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"SICETAC circuit is open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker driven by error and timeout rates.
+
+    Outcomes are kept over a sliding time window. Once the window holds at
+    least ``min_calls`` outcomes and either rate crosses its threshold, the
+    circuit opens and calls fail fast for ``open_seconds``. After that a
+    limited number of probe calls are let through (half-open); a successful
+    probe closes the circuit and a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        error_rate_threshold: float = 0.5,
+        timeout_rate_threshold: float = 0.3,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.timeout_rate_threshold = timeout_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()  # (time, failed, timed_out)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "CircuitBreaker":
+        return cls(
+            window_seconds=settings.sicetac_breaker_window_seconds,
+            min_calls=settings.sicetac_breaker_min_calls,
+            error_rate_threshold=settings.sicetac_breaker_error_rate,
+            timeout_rate_threshold=settings.sicetac_breaker_timeout_rate,
+            open_seconds=settings.sicetac_breaker_open_seconds,
+            half_open_max_calls=settings.sicetac_breaker_half_open_calls,
+        )
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream now. Pair with a record_* call."""
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self.rejected_calls += 1
+                return False
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                self.rejected_calls += 1
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._transition(CLOSED)
+            return
+        self._record(failed=False, timed_out=False)
+
+    def record_failure(self, timed_out: bool = False) -> None:
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._transition(OPEN)
+            return
+        self._record(failed=True, timed_out=timed_out)
+        if self.state == CLOSED and self._should_trip():
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give back a permit whose call ended without a verdict (e.g. cancelled)."""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _record(self, failed: bool, timed_out: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, failed, timed_out))
+        self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _rates(self) -> Tuple[int, float, float]:
+        self._trim(time.monotonic())
+        total = len(self._outcomes)
+        if not total:
+            return 0, 0.0, 0.0
+        failures = sum(1 for _, failed, _ in self._outcomes if failed)
+        timeouts = sum(1 for _, _, timed_out in self._outcomes if timed_out)
+        return total, failures / total, timeouts / total
+
+    def _should_trip(self) -> bool:
+        total, error_rate, timeout_rate = self._rates()
+        return total >= self.min_calls and (
+            error_rate >= self.error_rate_threshold
+            or timeout_rate >= self.timeout_rate_threshold
+        )
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"SICETAC circuit breaker {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        elif state == CLOSED:
+            self._outcomes.clear()
+        self._probes_in_flight = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        total, error_rate, timeout_rate = self._rates()
+        return {
+            "state": self.state,
+            "window_calls": total,
+            "error_rate": round(error_rate, 3),
+            "timeout_rate": round(timeout_rate, 3),
+            "retry_after_seconds": round(self.retry_after(), 1) if self.state == OPEN else 0,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+        }
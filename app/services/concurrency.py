@@ -0,0 +1,230 @@
+"""
+Adaptive concurrency limit for upstream SICETAC calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, Union
+
+from app.services.deadlines import Deadline
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, most urgent first.
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BATCH, BACKGROUND)
+
+# Share of the current limit each lane may occupy, so lower lanes always
+# leave headroom for interactive quotes instead of queueing ahead of them.
+_LANE_SHARE = {INTERACTIVE: 1.0, BATCH: 0.75, BACKGROUND: 0.5}
+
+# Weight of the newest sample in the short (current) and long (baseline)
+# latency averages. The slow baseline lets a lasting change in upstream
+# speed become the new normal instead of pinning the limit at its floor.
+_LATENCY_SMOOTHING = 0.2
+_BASELINE_SMOOTHING = 0.02
+
+
+@dataclass
+class Ticket:
+    """
+    Priority of one logical upstream lookup.
+
+    Coalesced callers share their leader's ticket, so a more urgent caller
+    can promote a lookup that is still queued behind lower-priority work,
+    and a caller with more time left can extend its deadline.
+    """
+
+    priority: str = INTERACTIVE
+    deadline: Optional[Deadline] = None
+    _waiter: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight upstream calls, with priority lanes.
+
+    Every call holds a slot between ``acquire`` and ``release``. Healthy
+    calls raise the limit by roughly one slot per round trip while it is
+    actually being used. A timeout or overload response, or smoothed latency
+    rising past ``latency_tolerance`` times its long-run baseline, cuts the
+    limit by ``backoff``, at most once per round trip.
+
+    Free slots go to the most urgent waiting lane first; batch and
+    background callers are further capped to a share of the limit.
+
+    Until a latency sample exists, cuts are spaced by ``decrease_interval``
+    instead of the round trip.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 20,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.5,
+        decrease_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.decrease_interval = decrease_interval
+        self._clock = clock
+
+        self.in_flight = 0
+        self._in_flight_by_lane: Dict[str, int] = dict.fromkeys(PRIORITIES, 0)
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in PRIORITIES}
+        self._baseline_latency: Optional[float] = None
+        self._smoothed_latency: Optional[float] = None
+        self._last_decrease: Optional[float] = None
+
+        self.granted: Dict[str, int] = dict.fromkeys(PRIORITIES, 0)
+        self.decreases = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "AdaptiveLimiter":
+        return cls(
+            initial_limit=settings.sicetac_limit_initial,
+            min_limit=settings.sicetac_limit_min,
+            max_limit=settings.sicetac_limit_max,
+            latency_tolerance=settings.sicetac_limit_latency_tolerance,
+            backoff=settings.sicetac_limit_backoff,
+            decrease_interval=settings.sicetac_connect_timeout_seconds,
+        )
+
+    def _lane_capacity(self, lane: str) -> int:
+        return max(1, int(self.limit * _LANE_SHARE[lane]))
+
+    def _can_grant(self, lane: str) -> bool:
+        return self.in_flight < int(self.limit) and self.in_flight < self._lane_capacity(lane)
+
+    def _grant(self, lane: str) -> None:
+        self.in_flight += 1
+        self._in_flight_by_lane[lane] += 1
+        self.granted[lane] += 1
+
+    async def acquire(self, priority: Union[str, Ticket] = INTERACTIVE) -> str:
+        """
+        Wait for a slot and return the lane it was granted in.
+
+        Every acquire needs one ``release`` of that lane. Pass a ``Ticket``
+        instead of a lane name to allow ``promote`` while waiting.
+        """
+        ticket = priority if isinstance(priority, Ticket) else Ticket(priority)
+        lane = ticket.priority
+        if lane not in self._waiters:
+            raise ValueError(f"Unknown priority lane: {lane}")
+
+        ahead = any(self._waiters[other] for other in PRIORITIES[: PRIORITIES.index(lane) + 1])
+        if not ahead and self._can_grant(lane):
+            self._grant(lane)
+            return lane
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        ticket._waiter = waiter
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as we were cancelled; pass it on.
+                self.release(waiter.result())
+            else:
+                self._waiters[ticket.priority].remove(waiter)
+            raise
+        finally:
+            ticket._waiter = None
+
+    def promote(self, ticket: Ticket, priority: str) -> None:
+        """Raise a ticket to a more urgent lane, moving it if it is still queued."""
+        if PRIORITIES.index(priority) >= PRIORITIES.index(ticket.priority):
+            return
+        waiter = ticket._waiter
+        if waiter is not None and not waiter.done():
+            self._waiters[ticket.priority].remove(waiter)
+            self._waiters[priority].append(waiter)
+        logger.debug(f"Promoted SICETAC lookup from {ticket.priority} to {priority}")
+        ticket.priority = priority
+        self._wake()
+
+    def release(self, priority: str = INTERACTIVE, latency: Optional[float] = None, dropped: bool = False) -> None:
+        """
+        Free a slot and adapt the limit.
+
+        ``latency`` is the call's round trip in seconds, ``dropped`` marks a
+        timeout or overload response. Calls that ended without a meaningful
+        signal (cancelled, malformed request) pass neither.
+        """
+        self.in_flight = max(0, self.in_flight - 1)
+        self._in_flight_by_lane[priority] = max(0, self._in_flight_by_lane[priority] - 1)
+        if dropped:
+            self._decrease("upstream overloaded")
+        elif latency is not None:
+            self._on_sample(latency)
+        self._wake()
+
+    def _on_sample(self, latency: float) -> None:
+        if self._smoothed_latency is None:
+            self._smoothed_latency = self._baseline_latency = latency
+        else:
+            self._smoothed_latency += _LATENCY_SMOOTHING * (latency - self._smoothed_latency)
+            self._baseline_latency += _BASELINE_SMOOTHING * (latency - self._baseline_latency)
+
+        if self._smoothed_latency > self._baseline_latency * self.latency_tolerance:
+            self._decrease(f"latency {self._smoothed_latency:.2f}s over baseline {self._baseline_latency:.2f}s")
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow while the limit is actually in use.
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _decrease(self, reason: str) -> None:
+        now = self._clock()
+        # One cut per round trip: calls already in flight report the same congestion.
+        spacing = self._smoothed_latency if self._smoothed_latency is not None else self.decrease_interval
+        if self._last_decrease is not None and now - self._last_decrease < spacing:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        if self.limit < previous:
+            self.decreases += 1
+            logger.warning(f"SICETAC concurrency limit {previous:.1f} -> {self.limit:.1f} ({reason})")
+
+    def _wake(self) -> None:
+        for lane in PRIORITIES:
+            queue = self._waiters[lane]
+            while queue and self._can_grant(lane):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._grant(lane)
+                waiter.set_result(lane)
+            if queue:
+                # Lower lanes never overtake a waiting higher lane.
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "in_flight_by_priority": dict(self._in_flight_by_lane),
+            "queued": {lane: len(queue) for lane, queue in self._waiters.items()},
+            "granted": dict(self.granted),
+            "decreases": self.decreases,
+            "baseline_latency_ms": (
+                round(self._baseline_latency * 1000, 1) if self._baseline_latency is not None else None
+            ),
+            "smoothed_latency_ms": (
+                round(self._smoothed_latency * 1000, 1) if self._smoothed_latency is not None else None
+            ),
+        }
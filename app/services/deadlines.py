@@ -0,0 +1,53 @@
+"""
+Request deadlines carried from the HTTP request down to each upstream attempt.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+# Header a caller can send to ask for a shorter (or longer, up to the
+# configured maximum) time budget, in seconds.
+DEADLINE_HEADER = "X-Request-Timeout"
+
+
+class DeadlineExceeded(Exception):
+    """The caller's time budget ran out before SICETAC answered."""
+
+
+@dataclass
+class Deadline:
+    """Absolute point in time (monotonic clock) by which work must finish."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def extend_to(self, other: "Deadline") -> None:
+        """Push this deadline out to ``other`` if that is later."""
+        self.expires_at = max(self.expires_at, other.expires_at)
+
+
+def deadline_from_headers(headers: Mapping[str, str], default: float, maximum: float) -> Deadline:
+    """Deadline for an incoming request: ``X-Request-Timeout`` if valid, else ``default``."""
+    seconds: Optional[float] = None
+    raw = headers.get(DEADLINE_HEADER)
+    if raw:
+        try:
+            seconds = float(raw)
+        except ValueError:
+            seconds = None
+    if seconds is None or seconds <= 0:
+        seconds = default
+    return Deadline.after(min(seconds, maximum))
@@ -0,0 +1,100 @@
+"""
+Cross-worker invalidation of the in-memory cache tier.
+
+Every gunicorn worker keeps its own CacheService memory tier. When one
+worker deletes keys or clears a pattern, it publishes the event on a Redis
+channel. Each worker listens on that channel and drops the same entries from
+its memory tier. Otherwise the others would keep answering from their
+memory fallback until TTL expiry. Without Redis the bus only reaches
+subscribers in the same process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = "cache:invalidate"
+
+# Wait before resubscribing after the pub/sub connection drops.
+_RECONNECT_DELAY_SECONDS = 1.0
+
+Event = Dict[str, Any]
+
+
+class InvalidationBus:
+    """Publish invalidation events to every worker, Redis pub/sub or in-process."""
+
+    def __init__(self, redis_client=None, channel: str = DEFAULT_CHANNEL):
+        self.redis_client = redis_client
+        self.channel = channel
+        self._handlers: List[Callable[[Event], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"published": 0, "received": 0, "errors": 0}
+
+    def subscribe(self, handler: Callable[[Event], None]) -> None:
+        self._handlers.append(handler)
+
+    async def publish(self, event: Event) -> None:
+        """Send an event to every subscriber, this process's included."""
+        self.stats["published"] += 1
+        if self.redis_client is None:
+            self._dispatch(event)
+            return
+        try:
+            await self.redis_client.publish(self.channel, json.dumps(event))
+        except Exception as e:
+            # Other workers miss this one; their entries still expire by TTL.
+            logger.warning(f"Cache invalidation publish error: {e}")
+            self.stats["errors"] += 1
+            self._dispatch(event)
+
+    def _dispatch(self, event: Event) -> None:
+        for handler in list(self._handlers):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Cache invalidation handler error: {e!r}")
+                self.stats["errors"] += 1
+
+    def start(self) -> None:
+        """Listen on the Redis channel in the background (no-op without Redis)."""
+        if self.redis_client is not None and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self.stats["received"] += 1
+                    self._dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error, resubscribing: {e}")
+                self.stats["errors"] += 1
+                await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "channel": self.channel,
+            "listening": self._task is not None and not self._task.done(),
+            "redis": self.redis_client is not None,
+        }
@@ -0,0 +1,127 @@
+"""
+Rate matrix: origin x destination x configuration tariff sheets.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+from app.models.quotes import BatchQuoteItem, MatrixCellError, MatrixQuoteRequest, QuoteRequest
+
+MATRIX_COLUMNS = (
+    "origin",
+    "destination",
+    "configuration",
+    "route_code",
+    "route_name",
+    "unit_type",
+    "cargo_type",
+    "mobilization_value",
+    "ton_value",
+    "hour_value",
+    "distance_km",
+    "minimum_payable",
+)
+
+# CSV exports carry failed cells as rows too, so a lane that errored can be
+# told apart from one that simply has no tariffs.
+CSV_COLUMNS = MATRIX_COLUMNS + ("error_status", "error_detail")
+
+
+def matrix_size(matrix: MatrixQuoteRequest) -> int:
+    return len(matrix.origins) * len(matrix.destinations) * len(matrix.configurations)
+
+
+def expand_matrix(matrix: MatrixQuoteRequest) -> List[QuoteRequest]:
+    """Cartesian product of the matrix, skipping origin == destination cells."""
+    return [
+        # Fields were validated on the matrix request already.
+        QuoteRequest.model_construct(
+            period=matrix.period,
+            configuration=configuration,
+            origin=origin,
+            destination=destination,
+            cargo_type=matrix.cargo_type,
+            unit_type=matrix.unit_type,
+            logistics_hours=matrix.logistics_hours,
+            variables=None,
+        )
+        for origin, destination, configuration in itertools.product(
+            matrix.origins, matrix.destinations, matrix.configurations
+        )
+        if origin != destination
+    ]
+
+
+def _rows(item: BatchQuoteItem) -> Iterator[Tuple[Any, ...]]:
+    request = item.request
+    for quote in item.quotes or ():
+        yield (
+            request.origin,
+            request.destination,
+            request.configuration,
+            quote.route_code,
+            quote.route_name,
+            quote.unit_type,
+            quote.cargo_type,
+            quote.mobilization_value,
+            quote.ton_value,
+            quote.hour_value,
+            quote.distance_km,
+            quote.minimum_payable,
+        )
+
+
+def _cell_error(item: BatchQuoteItem) -> MatrixCellError:
+    return MatrixCellError(
+        origin=item.request.origin,
+        destination=item.request.destination,
+        configuration=item.request.configuration,
+        status_code=item.error.status_code,
+        detail=item.error.detail,
+    )
+
+
+async def collect_columns(
+    items: AsyncIterator[BatchQuoteItem],
+) -> Tuple[Dict[str, List[Any]], List[MatrixCellError]]:
+    """Gather matrix results into one array per column plus per-cell errors."""
+    columns: Dict[str, List[Any]] = {name: [] for name in MATRIX_COLUMNS}
+    appenders = [columns[name].append for name in MATRIX_COLUMNS]
+    errors: List[MatrixCellError] = []
+    async for item in items:
+        if item.error is not None:
+            errors.append(_cell_error(item))
+            continue
+        for row in _rows(item):
+            for append, value in zip(appenders, row):
+                append(value)
+    return columns, errors
+
+
+async def iter_csv(items: AsyncIterator[BatchQuoteItem]) -> AsyncIterator[bytes]:
+    """Stream the matrix as CSV, one chunk per resolved cell.
+
+    Failed cells become a row with only the cell keys and the error filled in.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    padding = ("",) * (len(MATRIX_COLUMNS) - 3)
+    async for item in items:
+        if item.error is not None:
+            request = item.request
+            writer.writerow(
+                (request.origin, request.destination, request.configuration)
+                + padding
+                + (item.error.status_code, item.error.detail)
+            )
+        else:
+            writer.writerows(row + ("", "") for row in _rows(item))
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
@@ -0,0 +1,145 @@
+"""
+Bounded in-process tier of CacheService.
+
+Entries live in an OrderedDict kept in recency order, so a get, a set and
+an LRU eviction are each O(1). Expiry uses the monotonic clock. An expired
+entry is dropped when it is read (lazy), and every set also checks a few of
+the least recently used entries (incremental sweep), so nothing ever scans
+the whole tier. Size is capped by entry count and by an estimate of the
+bytes held.
+
+String keys are also indexed by each of their ``:``-terminated prefixes
+("quote:", "quote:11001000:", ...). A glob pattern with a literal prefix
+then only checks the keys under that prefix, not every key in the tier.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterator, List, NamedTuple, Optional, Set
+
+_GLOB_CHARS = re.compile(r"[*?\[\\]")
+
+
+def _prefixes(key: str) -> List[str]:
+    """Every ``:``-terminated prefix of a key."""
+    prefixes = []
+    end = key.find(":")
+    while end != -1:
+        prefixes.append(key[:end + 1])
+        end = key.find(":", end + 1)
+    return prefixes
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expires_at: Optional[float]  # time.monotonic(); None never expires
+    size: int
+
+
+class MemoryTier:
+    """LRU cache with per-entry TTLs and entry and byte caps."""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, sweep_batch: int = 8):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_batch = sweep_batch
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._by_prefix: Dict[str, Set[str]] = {}
+        self.bytes = 0
+        self.stats = {"evictions": 0, "expirations": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Value for ``key``, or None when missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float], size: int) -> None:
+        """Store ``value`` for ``ttl`` seconds (None never expires); ``size`` is its estimated bytes."""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return  # would evict the whole tier and still not fit
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = _Entry(value, expires_at, size)
+        self.bytes += size
+        if isinstance(key, str):
+            for prefix in _prefixes(key):
+                self._by_prefix.setdefault(prefix, set()).add(key)
+        self._sweep()
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def delete(self, key: Hashable) -> bool:
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def keys_matching(self, pattern: str) -> List[str]:
+        """Keys matching a Redis-style glob ``pattern`` (case-sensitive, ``*`` spans ``:``)."""
+        literal = _GLOB_CHARS.search(pattern)
+        if literal is None:
+            return [pattern] if pattern in self._entries else []
+        prefix = pattern[:pattern.rfind(":", 0, literal.start()) + 1]
+        candidates = self._by_prefix.get(prefix, ()) if prefix else [k for k in self._entries if isinstance(k, str)]
+        return [key for key in candidates if fnmatch.fnmatchcase(key, pattern)]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_prefix.clear()
+        self.bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        self.bytes -= self._entries.pop(key).size
+        if isinstance(key, str):
+            for prefix in _prefixes(key):
+                keys = self._by_prefix[prefix]
+                keys.discard(key)
+                if not keys:
+                    del self._by_prefix[prefix]
+
+    def _sweep(self) -> None:
+        """Drop expired entries among the few least recently used ones."""
+        now = time.monotonic()
+        expired = [
+            key
+            for key, entry in islice(self._entries.items(), self.sweep_batch)
+            if entry.expires_at is not None and entry.expires_at <= now
+        ]
+        for key in expired:
+            self._remove(key)
+        self.stats["expirations"] += len(expired)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
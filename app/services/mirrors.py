@@ -0,0 +1,130 @@
+"""
+Latency tracking for the equivalent SICETAC SOAP mirrors (rndcws, rndcws2).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Latency assumed for a mirror before it has answered anything.
+_UNKNOWN_LATENCY = 2.0
+
+
+@dataclass
+class MirrorStats:
+    """Recent behaviour of a single mirror."""
+
+    endpoint: str
+    samples: deque = field(default_factory=lambda: deque(maxlen=200))
+    ewma: Optional[float] = None
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    hedge_wins: int = 0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * fraction))
+        return ordered[index]
+
+    @property
+    def score(self) -> float:
+        """Expected latency, penalised by recent consecutive failures."""
+        base = self.ewma if self.ewma is not None else _UNKNOWN_LATENCY
+        return base * (1 + self.consecutive_failures)
+
+
+class MirrorTracker:
+    """
+    Track per-mirror latency to pick the primary and the hedge delay.
+    """
+
+    def __init__(self, endpoints: List[str], alpha: float = 0.2, min_samples: int = 20):
+        if not endpoints:
+            raise ValueError("At least one SICETAC endpoint is required")
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.mirrors: Dict[str, MirrorStats] = {
+            endpoint: MirrorStats(endpoint=endpoint) for endpoint in endpoints
+        }
+        self.hedged_requests = 0
+
+    @property
+    def endpoints(self) -> List[str]:
+        return list(self.mirrors)
+
+    def ordered(self) -> List[str]:
+        """Mirrors sorted from preferred primary to last resort."""
+        return sorted(self.mirrors, key=lambda endpoint: self.mirrors[endpoint].score)
+
+    def record_success(self, endpoint: str, latency: float) -> None:
+        stats = self.mirrors[endpoint]
+        stats.samples.append(latency)
+        stats.ewma = latency if stats.ewma is None else (
+            self.alpha * latency + (1 - self.alpha) * stats.ewma
+        )
+        stats.successes += 1
+        stats.consecutive_failures = 0
+
+    def record_cancelled(self, endpoint: str, elapsed: float) -> None:
+        """Account for a call abandoned after ``elapsed`` seconds, e.g. a lost hedge.
+
+        The real latency is at least ``elapsed``, so it is folded in as a
+        sample when it exceeds the current estimate. Without this a mirror
+        that turned slow keeps its old fast average and stays primary.
+        """
+        stats = self.mirrors[endpoint]
+        if stats.ewma is not None and elapsed <= stats.ewma:
+            return
+        stats.samples.append(elapsed)
+        stats.ewma = elapsed if stats.ewma is None else (
+            self.alpha * elapsed + (1 - self.alpha) * stats.ewma
+        )
+
+    def record_failure(self, endpoint: str) -> None:
+        stats = self.mirrors[endpoint]
+        stats.failures += 1
+        stats.consecutive_failures += 1
+
+    def record_hedge(self) -> None:
+        self.hedged_requests += 1
+
+    def record_hedge_win(self, endpoint: str) -> None:
+        self.mirrors[endpoint].hedge_wins += 1
+
+    def hedge_delay(
+        self,
+        endpoint: str,
+        percentile: float,
+        default: float,
+        minimum: float,
+    ) -> float:
+        """Delay before hedging, from the primary's observed latency percentile."""
+        stats = self.mirrors[endpoint]
+        if len(stats.samples) < self.min_samples:
+            return default
+        return max(minimum, stats.percentile(percentile) or default)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "hedged_requests": self.hedged_requests,
+            "order": self.ordered(),
+            "mirrors": {
+                endpoint: {
+                    "ewma_ms": round(stats.ewma * 1000, 1) if stats.ewma is not None else None,
+                    "p90_ms": round(stats.percentile(0.9) * 1000, 1) if stats.samples else None,
+                    "successes": stats.successes,
+                    "failures": stats.failures,
+                    "consecutive_failures": stats.consecutive_failures,
+                    "hedge_wins": stats.hedge_wins,
+                }
+                for endpoint, stats in self.mirrors.items()
+            },
+        }
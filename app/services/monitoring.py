@@ -371,8 +371,14 @@ async def initialize_monitoring():
         except:
             return False
 
+    async def check_sicetac():
+        """Check the SICETAC circuit breaker is not open."""
+        from app.services.sicetac import get_sicetac_client
+        return get_sicetac_client().breaker.state != "open"
+
     health_checker.register_check("database", check_database)
     health_checker.register_check("cache", check_cache)
+    health_checker.register_check("sicetac_upstream", check_sicetac)
 
     # Start cleanup task
     async def cleanup_task():
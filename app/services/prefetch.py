@@ -0,0 +1,169 @@
+"""
+Month-rollover prefetch of the new period's tariffs.
+
+SICETAC tariffs are keyed by period, so on the 1st of every month every lane
+misses the cache at once. The prefetcher wakes up when the period rolls over.
+It ranks lanes by how often they were quoted in the recent quotation history,
+then loads the new period for the top ones. Those loads go through
+SicetacClient at background priority, so they queue behind live traffic in
+the adaptive limiter.
+
+Runs are resumable. Lanes that are already fresh in the cache are skipped,
+and others already in the local tariff store are read from it without an
+upstream call. After a restart the run simply starts over, and only the
+missing lanes reach SICETAC.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+from app.services.warming import LaneSource, WarmProgress, top_lanes_from_history, warm_lanes
+from app.utils.periods import current_period, seconds_until_next_period
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Re-check the period at least this often, in case the clock jumps.
+_MAX_SLEEP_SECONDS = 3600.0
+
+
+class PeriodPrefetcher:
+    """Prefetch popular lanes for each new period, one run per rollover."""
+
+    def __init__(
+        self,
+        client,
+        lane_source: LaneSource = top_lanes_from_history,
+        top_lanes: int = 500,
+        history_days: int = 90,
+        concurrency: int = 4,
+        rollover_delay: float = 300.0,
+        lock_path: Optional[str] = None,
+    ):
+        self.client = client
+        self.lane_source = lane_source
+        self.top_lanes = top_lanes
+        self.history_days = history_days
+        self.concurrency = concurrency
+        self.rollover_delay = rollover_delay
+        self.lock_path = lock_path
+        self.progress = WarmProgress()
+        self.next_run_at: Optional[float] = None
+        self._last_period: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, client, settings) -> "PeriodPrefetcher":
+        return cls(
+            client,
+            top_lanes=settings.prefetch_top_lanes,
+            history_days=settings.prefetch_history_days,
+            concurrency=settings.prefetch_concurrency,
+            rollover_delay=settings.prefetch_rollover_delay_seconds,
+            lock_path=settings.prefetch_lock_path,
+        )
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            period = current_period()
+            if period != self._last_period:
+                # Also runs once at startup, resuming an interrupted rollover.
+                try:
+                    await self.run(period)
+                except Exception as exc:
+                    logger.error(f"Prefetch of period {period} failed: {exc!r}")
+                self._last_period = period
+            delay = min(seconds_until_next_period() + self.rollover_delay, _MAX_SLEEP_SECONDS)
+            self.next_run_at = time.time() + delay
+            await asyncio.sleep(delay)
+
+    async def run(self, period: str) -> WarmProgress:
+        """Load ``period`` for the top lanes; returns the final progress."""
+        lock = self._try_lock()
+        if lock is False:
+            logger.info(f"Prefetch of period {period} is running in another worker")
+            self.progress = WarmProgress(period=period, state="skipped")
+            return self.progress
+
+        progress = self.progress = WarmProgress(period=period, state="running", started_at=time.time())
+        try:
+            lanes = await asyncio.to_thread(self.lane_source, self.top_lanes, self.history_days)
+            logger.info(f"Prefetching period {period} for {len(lanes)} lanes")
+            await warm_lanes(self.client, period, lanes, self.concurrency, progress)
+            progress.state = "done"
+        except Exception as exc:
+            progress.state = "failed"
+            progress.error = repr(exc)
+            raise
+        finally:
+            progress.finished_at = time.time()
+            if lock:
+                lock.close()
+        logger.info(
+            f"Prefetch of period {period} done: {progress.fetched} loaded, {progress.fresh} already fresh, "
+            f"{progress.no_tariff} without tariff, {progress.failed} failed"
+        )
+        return progress
+
+    def _try_lock(self):
+        """Open lock file when this worker owns the run, False when another one does."""
+        if self.lock_path is None or fcntl is None:
+            return None
+        handle = open(self.lock_path, "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        return handle
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **asdict(self.progress),
+            "running": self._task is not None and not self._task.done(),
+            "next_run_at": self.next_run_at,
+        }
+
+
+# One prefetcher per process
+_prefetcher: Optional[PeriodPrefetcher] = None
+
+
+def get_prefetcher() -> Optional[PeriodPrefetcher]:
+    return _prefetcher
+
+
+def start_prefetcher(client, settings) -> Optional[PeriodPrefetcher]:
+    """Start the rollover scheduler unless PREFETCH_ENABLED is off."""
+    global _prefetcher
+
+    if not settings.prefetch_enabled:
+        return None
+    if _prefetcher is None:
+        _prefetcher = PeriodPrefetcher.from_settings(client, settings)
+    _prefetcher.start()
+    return _prefetcher
+
+
+async def stop_prefetcher() -> None:
+    if _prefetcher is not None:
+        await _prefetcher.stop()
@@ -0,0 +1,82 @@
+"""
+Pricing stage: turn raw SICETAC documents into quotes for a request.
+
+Raw documents are what gets cached for a lane (period, configuration,
+origin, destination). Unit/cargo filters and logistics hours are applied
+here per request, so changing either never needs another SOAP call.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.models.quotes import QuoteRequest, QuoteResult
+
+# Raw document = SICETAC lowercase tags, numeric values already converted.
+TariffDocument = Dict[str, Any]
+
+TEXT_FIELDS = ("ruta", "nombreruta", "nombreunidadtransporte", "nombretipocarga")
+NUMERIC_FIELDS = ("valor", "valortonelada", "valorhora", "distancia")
+
+
+@dataclass
+class LaneTariffs:
+    """Raw documents for one lane and how current they are."""
+
+    documents: List[TariffDocument]
+    fetched_at: Optional[float] = None
+    stale: bool = False
+
+    @property
+    def data_as_of(self) -> Optional[datetime]:
+        if self.fetched_at is None:
+            return None
+        return datetime.fromtimestamp(self.fetched_at, tz=timezone.utc)
+
+
+def minimum_payable(document: TariffDocument, logistics_hours: float) -> float:
+    """Valor mínimo a pagar = valor movilización + valorhora * horas pactadas."""
+    return document["valor"] + (document.get("valorhora") or 0.0) * logistics_hours
+
+
+def select_documents(
+    documents: Iterable[TariffDocument],
+    unit_type: Optional[str] = None,
+    cargo_type: Optional[str] = None,
+) -> List[TariffDocument]:
+    """Keep the documents matching the (already upper-cased) unit and cargo filters."""
+    return [
+        document for document in documents
+        if (not unit_type or (document.get("nombreunidadtransporte") or "").upper() == unit_type)
+        and (not cargo_type or (document.get("nombretipocarga") or "").upper() == cargo_type)
+    ]
+
+
+def to_quote(document: TariffDocument, logistics_hours: float) -> QuoteResult:
+    # Documents come from our own parser, so skip re-validation.
+    return QuoteResult.model_construct(
+        route_code=document.get("ruta"),
+        route_name=document.get("nombreruta"),
+        unit_type=document.get("nombreunidadtransporte"),
+        cargo_type=document.get("nombretipocarga"),
+        mobilization_value=document["valor"],
+        ton_value=document.get("valortonelada"),
+        hour_value=document.get("valorhora"),
+        distance_km=document.get("distancia"),
+        minimum_payable=minimum_payable(document, logistics_hours),
+    )
+
+
+def price_documents(documents: List[TariffDocument], quote_request: QuoteRequest) -> List[QuoteResult]:
+    """Filter a lane's documents for the request and price its logistics hours."""
+    selected = select_documents(documents, quote_request.unit_type, quote_request.cargo_type)
+    if not selected:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sicetac did not return quotes for the requested unit and cargo types",
+        )
+    return [to_quote(document, quote_request.logistics_hours) for document in selected]
@@ -3,7 +3,6 @@ Real-time price update service using WebSockets and Redis caching.
 """
 
 import asyncio
-import json
 import logging
 from typing import Dict, List, Optional, Set
 from datetime import datetime, timedelta
@@ -11,6 +10,8 @@ import redis.asyncio as redis
 from fastapi import WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
+from app.services.serialization import Serializer
+
 logger = logging.getLogger("realtime")
 
 
@@ -101,9 +102,10 @@ class ConnectionManager:
 class PriceCache:
     """Redis-based price caching service."""
 
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", serializer: Optional[Serializer] = None):
         self.redis_url = redis_url
         self.redis_client: Optional[redis.Redis] = None
+        self.serializer = serializer or Serializer()
         self.default_ttl = 300  # 5 minutes
 
     async def connect(self):
@@ -112,7 +114,7 @@ class PriceCache:
             self.redis_client = await redis.from_url(
                 self.redis_url,
                 encoding="utf-8",
-                decode_responses=True
+                decode_responses=False  # values are binary, see app.services.serialization
             )
             await self.redis_client.ping()
             logger.info("Connected to Redis cache")
@@ -144,7 +146,7 @@ class PriceCache:
         try:
             data = await self.redis_client.get(key)
             if data:
-                return json.loads(data)
+                return self.serializer.loads(data)
         except Exception as e:
             logger.error(f"Cache get error: {e}")
         return None
@@ -169,7 +171,7 @@ class PriceCache:
             await self.redis_client.setex(
                 key,
                 ttl,
-                json.dumps(price_data)
+                self.serializer.dumps(price_data)
             )
         except Exception as e:
             logger.error(f"Cache set error: {e}")
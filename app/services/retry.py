@@ -0,0 +1,100 @@
+"""
+Retry policy for upstream SICETAC calls: retryable errors, jittered backoff
+and a process-wide retry budget.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Gateway-style answers that a second attempt may get past.
+_RETRYABLE_STATUS = {429, 502, 503, 504}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transport failures and overload answers; never local pool exhaustion."""
+    if isinstance(exc, httpx.PoolTimeout):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUS
+    return isinstance(exc, httpx.TransportError)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff before retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class RetryBudget:
+    """
+    Cap retries to a fraction of recent calls.
+
+    Over a sliding window, retries may not exceed ``ratio`` times the number
+    of first attempts, plus ``min_retries`` so a quiet process can still
+    retry the occasional blip. During an incident this keeps retries from
+    multiplying the load on an upstream that is already failing.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_retries: int = 3,
+        window_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._calls: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.total_retries = 0
+        self.denied_retries = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> "RetryBudget":
+        return cls(
+            ratio=settings.sicetac_retry_budget_ratio,
+            min_retries=settings.sicetac_retry_budget_min_retries,
+            window_seconds=settings.sicetac_retry_budget_window_seconds,
+        )
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for events in (self._calls, self._retries):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_call(self) -> None:
+        """Count a first attempt."""
+        now = self._clock()
+        self._trim(now)
+        self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, or report that it is exhausted."""
+        now = self._clock()
+        self._trim(now)
+        if len(self._retries) + 1 > self.min_retries + self.ratio * len(self._calls):
+            self.denied_retries += 1
+            return False
+        self._retries.append(now)
+        self.total_retries += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._trim(self._clock())
+        return {
+            "window_calls": len(self._calls),
+            "window_retries": len(self._retries),
+            "total_retries": self.total_retries,
+            "denied_retries": self.denied_retries,
+        }
@@ -0,0 +1,241 @@
+"""
+Binary serialization of cache values.
+
+Every value is written with a small versioned header naming its codec,
+compression and layout, so workers running different optional packages
+(and entries written before this format) can still read each other:
+
+    magic (2 bytes) | version | codec | compression | layout | payload
+
+Codecs are msgpack or orjson when installed, else the stdlib json. Payloads
+above a size threshold are compressed with zstd or lz4 when installed.
+With a binary codec, lists of records sharing the same fields (SICETAC
+documents) are laid out as one field list plus rows of values instead of
+repeating every field name in every record. The stdlib json codec writes
+them as they are: building the rows costs more there than it saves.
+``QuoteResult`` lists are always written as rows in schema field order.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models.quotes import QuoteResult
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional speedup
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional compression
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional compression
+    lz4_frame = None
+
+MAGIC = b"\xfcC"
+VERSION = 1
+_HEADER_SIZE = len(MAGIC) + 4
+
+# Layouts
+_PLAIN = b"v"  # the value as is
+_TABLE = b"t"  # list of records: [fields, rows]
+_QUOTES = b"q"  # list of QuoteResult: rows in QuoteResult field order
+_DICT = b"d"  # dict with record-list values: [other items, {key: [fields, rows]}]
+
+_QUOTE_FIELDS = tuple(QuoteResult.model_fields)
+
+_CODECS = {"json": b"j", "orjson": b"o", "msgpack": b"m"}
+_COMPRESSIONS = {"none": b"-", "zlib": b"d", "zstd": b"z", "lz4": b"l"}
+
+
+def _json_dumps(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+@lru_cache(maxsize=None)
+def _codec_functions(codec: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if codec == "json":
+        return _json_dumps, _json_loads
+    if codec == "orjson":
+        if orjson is None:
+            raise RuntimeError("CACHE_SERIALIZER=orjson requires orjson (pip install orjson)")
+        return (lambda payload: orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)), orjson.loads
+    if codec == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("CACHE_SERIALIZER=msgpack requires msgpack (pip install msgpack)")
+        return (
+            lambda payload: msgpack.packb(payload, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False),
+        )
+    raise ValueError(f"Unknown cache serializer {codec!r}")
+
+
+@lru_cache(maxsize=None)
+def _compression_functions(compression: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    if compression == "none":
+        return bytes, bytes
+    if compression == "zlib":
+        return (lambda data: zlib.compress(data, 1)), zlib.decompress
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("CACHE_COMPRESSION=zstd requires zstandard (pip install zstandard)")
+        compressor, decompressor = zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor()
+        return compressor.compress, decompressor.decompress
+    if compression == "lz4":
+        if lz4_frame is None:
+            raise RuntimeError("CACHE_COMPRESSION=lz4 requires lz4 (pip install lz4)")
+        return lz4_frame.compress, lz4_frame.decompress
+    raise ValueError(f"Unknown cache compression {compression!r}")
+
+
+def _default_codec() -> str:
+    if msgpack is not None:
+        return "msgpack"
+    return "orjson" if orjson is not None else "json"
+
+
+def _default_compression() -> str:
+    if zstandard is not None:
+        return "zstd"
+    return "lz4" if lz4_frame is not None else "none"
+
+
+def _table(items: List[Any]) -> Optional[List[Any]]:
+    """[fields, rows] for two or more dicts with the same keys in the same order, else None."""
+    if len(items) < 2 or not isinstance(items[0], dict):
+        return None
+    fields = tuple(items[0])
+    rows = []
+    for item in items:
+        if not isinstance(item, dict) or tuple(item) != fields:
+            return None
+        rows.append(list(item.values()))
+    return [list(fields), rows]
+
+
+def _untable(table: List[Any]) -> List[Dict[str, Any]]:
+    fields, rows = table
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _pack(value: Any, tables: bool = True) -> Tuple[bytes, Any]:
+    """(layout, payload) for a value; record lists become tables only with ``tables``."""
+    if isinstance(value, list) and value:
+        if all(type(item) is QuoteResult for item in value):
+            return _QUOTES, [[getattr(item, name) for name in _QUOTE_FIELDS] for item in value]
+        table = _table(value) if tables else None
+        if table is not None:
+            return _TABLE, table
+    elif isinstance(value, dict) and tables:
+        tables = {}
+        for key, item in value.items():
+            if isinstance(item, list):
+                table = _table(item)
+                if table is not None:
+                    tables[key] = table
+        if tables:
+            return _DICT, [{key: item for key, item in value.items() if key not in tables}, tables]
+    return _PLAIN, value
+
+
+def _unpack(layout: bytes, payload: Any) -> Any:
+    if layout == _PLAIN:
+        return payload
+    if layout == _TABLE:
+        return _untable(payload)
+    if layout == _QUOTES:
+        # Values were validated when the results were built.
+        return [QuoteResult.model_construct(**dict(zip(_QUOTE_FIELDS, row))) for row in payload]
+    if layout == _DICT:
+        rest, tables = payload
+        return {**rest, **{key: _untable(table) for key, table in tables.items()}}
+    raise ValueError(f"Unknown cache layout {layout!r}")
+
+
+class Serializer:
+    """Encode cache values to bytes and back."""
+
+    def __init__(self, codec: str = "auto", compression: str = "auto", compress_min_bytes: int = 1024):
+        self.codec = _default_codec() if codec == "auto" else codec
+        self.compression = _default_compression() if compression == "auto" else compression
+        self.compress_min_bytes = compress_min_bytes
+        self._dumps, _ = _codec_functions(self.codec)
+        self._compress, _ = _compression_functions(self.compression)
+        self._codec_id = _CODECS[self.codec]
+        self._compression_id = _COMPRESSIONS[self.compression]
+        self._tables = self.codec != "json"
+
+    @classmethod
+    def from_settings(cls, settings) -> "Serializer":
+        return cls(
+            codec=settings.cache_serializer,
+            compression=settings.cache_compression,
+            compress_min_bytes=settings.cache_compress_min_bytes,
+        )
+
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """(stored bytes, uncompressed payload size) for a value."""
+        layout, payload = _pack(value, self._tables)
+        data = self._dumps(payload)
+        size = len(data)
+        compression = b"-"
+        if self._compression_id != b"-" and size >= self.compress_min_bytes:
+            data = self._compress(data)
+            compression = self._compression_id
+        header = MAGIC + bytes((VERSION,)) + self._codec_id + compression + layout
+        return header + data, size
+
+    def dumps(self, value: Any) -> bytes:
+        return self.encode(value)[0]
+
+    def loads(self, data: bytes | str) -> Any:
+        """Decode a value written by any codec, or a plain JSON entry from before the header."""
+        if isinstance(data, str) or not data.startswith(MAGIC):
+            return _loads_legacy(data)
+        version = data[len(MAGIC)]
+        if version != VERSION:
+            raise ValueError(f"Unsupported cache format version {version}")
+        codec, compression, layout = (data[i:i + 1] for i in range(len(MAGIC) + 1, _HEADER_SIZE))
+        payload = memoryview(data)[_HEADER_SIZE:]
+        if compression != b"-":
+            payload = _decompressor(compression)(payload)
+        return _unpack(layout, _loader(codec)(bytes(payload)))
+
+
+def _loads_legacy(data: bytes | str) -> Any:
+    text = data.decode("utf-8") if isinstance(data, bytes) else data
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text  # strings were stored as they were
+
+
+def _loader(codec_id: bytes) -> Callable[[bytes], Any]:
+    for name, known in _CODECS.items():
+        if known == codec_id:
+            return _codec_functions(name)[1]
+    raise ValueError(f"Unknown cache codec {codec_id!r}")
+
+
+def _decompressor(compression_id: bytes) -> Callable[[bytes], bytes]:
+    for name, known in _COMPRESSIONS.items():
+        if known == compression_id:
+            return _compression_functions(name)[1]
+    raise ValueError(f"Unknown cache compression {compression_id!r}")
@@ -0,0 +1,251 @@
+"""
+Tariff cache shared by the workers of one host.
+
+Each gunicorn worker otherwise keeps its own copy of every cached lane.
+With SharedTariffFile, tariff entries are appended to one memory-mapped
+file. Every worker maps it read-only, so the bytes live once in the page
+cache however many workers there are. A lane one worker fetched is a hit
+for the others without a Redis round trip.
+
+The file is an append-only log. Each record holds a key, an expiry and an
+encoded entry, and the latest record for a key wins. Workers keep a small
+index (key to offset) and bring it up to date by scanning only the records
+appended since their last read. Writers append one at a time under an
+flock on a lock file next to the data file, and publish a record by moving
+the committed end offset in the header. When the file is full, the writer
+compacts the live records into a new file, swaps it in, and marks the old
+one retired so readers reopen.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.services.serialization import Serializer
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"STF1"
+# magic, committed end offset, retired flag
+_HEADER = struct.Struct("<4sQQ")
+_END_OFFSET = 4
+_RETIRED_OFFSET = 12
+# payload length (0 for a delete), expiry epoch (0 never expires), key length
+_RECORD = struct.Struct("<IdH")
+
+# Location of a key's latest record: payload offset, payload length, expiry.
+_Slot = Tuple[int, int, float]
+
+
+def _record(key: str, payload: bytes, expires_at: float) -> bytes:
+    encoded_key = key.encode("utf-8")
+    return _RECORD.pack(len(payload), expires_at, len(encoded_key)) + encoded_key + payload
+
+
+class SharedTariffFile:
+    """Append-only, memory-mapped key/value log shared by the processes of one host."""
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, serializer: Optional[Serializer] = None):
+        if fcntl is None:
+            raise RuntimeError("The shared tariff cache needs flock (POSIX only)")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.serializer = serializer or Serializer()
+        self._lock_fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._index: Dict[str, _Slot] = {}
+        self._scanned = _HEADER.size
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "write_skips": 0, "compactions": 0, "errors": 0}
+        with self._locked():
+            if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+                self._create(path)
+            self._open()
+
+    @classmethod
+    def from_settings(cls, settings) -> "SharedTariffFile":
+        return cls(
+            settings.tariff_shared_cache_path,
+            max_bytes=settings.tariff_shared_cache_max_bytes,
+            serializer=Serializer.from_settings(settings),
+        )
+
+    def _locked(self):
+        return _FileLock(self._lock_fd)
+
+    def _create(self, path: str) -> None:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, self.max_bytes)  # sparse: disk is used as records are written
+            os.pwrite(fd, _HEADER.pack(_MAGIC, _HEADER.size, 0), 0)
+        finally:
+            os.close(fd)
+
+    def _open(self) -> None:
+        self.close()
+        self._fd = os.open(self.path, os.O_RDWR)
+        self._mm = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+        magic, _, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} is not a shared tariff file")
+        self._index = {}
+        self._scanned = _HEADER.size
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _refresh(self) -> None:
+        """Follow a compaction and index the records appended since the last call."""
+        _, end, retired = _HEADER.unpack_from(self._mm, 0)
+        if retired:
+            self._open()
+            _, end, _ = _HEADER.unpack_from(self._mm, 0)
+        offset = self._scanned
+        while offset < end:
+            length, expires_at, key_length = _RECORD.unpack_from(self._mm, offset)
+            key_start = offset + _RECORD.size
+            key = self._mm[key_start:key_start + key_length].decode("utf-8")
+            payload = key_start + key_length
+            if length:
+                self._index[key] = (payload, length, expires_at)
+            else:
+                self._index.pop(key, None)
+            offset = payload + length
+        self._scanned = offset
+
+    def get(self, key: str) -> Optional[Any]:
+        """The latest unexpired value for ``key``, or None."""
+        try:
+            self._refresh()
+            slot = self._index.get(key)
+            if slot is None or (slot[2] and slot[2] <= time.time()):
+                self.stats["misses"] += 1
+                return None
+            offset, length, _ = slot
+            value = self.serializer.loads(self._mm[offset:offset + length])
+        except Exception as exc:
+            logger.warning(f"Shared tariff cache read error: {exc!r}")
+            self.stats["errors"] += 1
+            return None
+        self.stats["hits"] += 1
+        return value
+
+    def put(self, key: str, value: Any, ttl: Optional[float]) -> bool:
+        """Append ``value`` for ``key``; False when it could not be stored."""
+        expires_at = 0.0 if ttl is None else time.time() + ttl
+        try:
+            return self._append([(key, self.serializer.dumps(value), expires_at)])
+        except Exception as exc:
+            logger.warning(f"Shared tariff cache write error: {exc!r}")
+            self.stats["errors"] += 1
+            return False
+
+    def delete_matching(self, pattern: str) -> int:
+        """Delete every key matching a glob ``pattern``; returns how many."""
+        self._refresh()
+        now = time.time()
+        keys = [
+            key
+            for key, (_, _, expires_at) in self._index.items()
+            if (not expires_at or expires_at > now) and fnmatch.fnmatchcase(key, pattern)
+        ]
+        if keys:
+            self._append([(key, b"", 0.0) for key in keys])
+        return len(keys)
+
+    def _append(self, records: Iterable[Tuple[str, bytes, float]]) -> bool:
+        data = b"".join(_record(key, payload, expires_at) for key, payload, expires_at in records)
+        with self._locked():
+            self._refresh()
+            # The mapped file, not max_bytes: it may predate a change of the setting.
+            _, end, _ = _HEADER.unpack_from(self._mm, 0)
+            if end + len(data) > len(self._mm):
+                self._compact()
+                _, end, _ = _HEADER.unpack_from(self._mm, 0)
+                if end + len(data) > len(self._mm):
+                    self.stats["write_skips"] += 1
+                    return False
+            os.pwrite(self._fd, data, end)
+            # Readers only look up to the committed end, so the records appear at once.
+            os.pwrite(self._fd, struct.pack("<Q", end + len(data)), _END_OFFSET)
+            self._refresh()
+        self.stats["writes"] += 1
+        return True
+
+    def _compact(self) -> None:
+        """Rewrite the live records into a fresh file of max_bytes and retire this one (lock held)."""
+        now = time.time()
+        live = b"".join(
+            _record(key, self._mm[offset:offset + length], expires_at)
+            for key, (offset, length, expires_at) in self._index.items()
+            if not expires_at or expires_at > now
+        )
+        if _HEADER.size + len(live) > self.max_bytes:
+            live = b""  # every entry is live and the file is still full: start over
+        tmp_path = f"{self.path}.tmp"
+        self._create(tmp_path)
+        fd = os.open(tmp_path, os.O_RDWR)
+        try:
+            os.pwrite(fd, live, _HEADER.size)
+            os.pwrite(fd, struct.pack("<Q", _HEADER.size + len(live)), _END_OFFSET)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, self.path)
+        os.pwrite(self._fd, struct.pack("<Q", 1), _RETIRED_OFFSET)
+        self.stats["compactions"] += 1
+        self._open()
+        self._refresh()
+
+    def get_stats(self) -> Dict[str, Any]:
+        end = _HEADER.unpack_from(self._mm, 0)[1] if self._mm is not None else 0
+        return {
+            **self.stats,
+            "entries": len(self._index),
+            "used_bytes": end,
+            "file_bytes": len(self._mm) if self._mm is not None else 0,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class _FileLock:
+    """Exclusive flock held for a ``with`` block."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+# One mapping per process
+_shared: Optional[SharedTariffFile] = None
+
+
+def get_shared_tariff_file(settings) -> Optional[SharedTariffFile]:
+    """The host's shared tariff file, or None unless TARIFF_SHARED_CACHE_PATH is set."""
+    global _shared
+
+    if not settings.tariff_shared_cache_path:
+        return None
+    if _shared is None:
+        _shared = SharedTariffFile.from_settings(settings)
+    return _shared
@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from dataclasses import dataclass
-from typing import List
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple, Union
 
 import httpx
-from defusedxml import ElementTree as ET
 from fastapi import HTTPException, status
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.core.config import Settings, get_settings
-from app.models.quotes import QuoteRequest, QuoteResult
+from app.models.quotes import QuoteRequest, QuoteResponse, QuoteResult
+from app.services.cache import TariffCache, get_cache_service
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.concurrency import BACKGROUND, INTERACTIVE, AdaptiveLimiter, Ticket
+from app.services.deadlines import Deadline, DeadlineExceeded
+from app.services.mirrors import MirrorTracker
+from app.services.pricing import LaneTariffs, price_documents
+from app.services.retry import RetryBudget, backoff_delay, is_retryable
+from app.services.singleflight import SingleFlight
+from app.services.soap_parser import parse_documents
+from app.services.soap_template import SoapPayloadTemplate
+from app.services.tariff_store import TariffStore, get_tariff_store
+from app.services.transport import SicetacTransport, get_transport
 
 logger = logging.getLogger(__name__)
 
@@ -25,264 +37,449 @@ _DEFAULT_VARIABLES = [
     "DISTANCIA",
 ]
 
+# Hedge delay used until a mirror has enough latency samples.
+_DEFAULT_HEDGE_DELAY = 2.0
 
-def _retry_request(func):
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=10), stop=stop_after_attempt(3))
-    async def wrapper(*args, **kwargs):
-        return await func(*args, **kwargs)
 
-    return wrapper
+def _timeout_error() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Sicetac request timed out")
 
 
-def _to_float(value: str | None) -> float | None:
-    if value is None or value == "":
-        return None
-    try:
-        return float(value)
-    except ValueError:
-        return None
+def _is_overload(exc: BaseException) -> bool:
+    """Timeouts and 429/5xx answers mean SICETAC is struggling under load."""
+    if isinstance(exc, httpx.PoolTimeout):
+        return False
+    if isinstance(exc, httpx.TimeoutException):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return False
 
 
 @dataclass
 class SicetacClient:
     settings: Settings
-
-    async def fetch_quotes(self, quote_request: QuoteRequest) -> List[QuoteResult]:
+    transport: Optional[SicetacTransport] = None
+    mirrors: Optional[MirrorTracker] = None
+    coalescer: SingleFlight = field(default_factory=SingleFlight)
+    tariff_cache: Optional[TariffCache] = None
+    breaker: Optional[CircuitBreaker] = None
+    limiter: Optional[AdaptiveLimiter] = None
+    retry_budget: Optional[RetryBudget] = None
+    payload_template: Optional[SoapPayloadTemplate] = None
+    tariff_store: Optional[TariffStore] = None
+
+    def __post_init__(self) -> None:
+        if self.mirrors is None:
+            self.mirrors = MirrorTracker(self.settings.sicetac_endpoint_list)
+        if self.tariff_cache is None:
+            self.tariff_cache = TariffCache.from_settings(get_cache_service(), self.settings)
+        if self.breaker is None:
+            self.breaker = CircuitBreaker.from_settings(self.settings)
+        if self.limiter is None:
+            self.limiter = AdaptiveLimiter.from_settings(self.settings)
+        if self.retry_budget is None:
+            self.retry_budget = RetryBudget.from_settings(self.settings)
+        if self.payload_template is None:
+            self.payload_template = SoapPayloadTemplate.from_settings(self.settings, _DEFAULT_VARIABLES)
+        if self.tariff_store is None and self.settings.tariff_store_enabled:
+            self.tariff_store = get_tariff_store(self.settings)
+
+    async def fetch_quotes(
+        self,
+        quote_request: QuoteRequest,
+        priority: str = INTERACTIVE,
+        deadline: Optional[Deadline] = None,
+    ) -> List[QuoteResult]:
         logger.debug("Starting fetch_quotes")
-        payload = self._build_payload(quote_request)
-        logger.debug(f"Payload built, size: {len(payload)} bytes")
-        response_text = await self._post_payload(payload)
-        logger.debug(f"Response received, size: {len(response_text)} bytes")
-        return self._parse_response(response_text, quote_request)
-
-    def _build_payload(self, quote_request: QuoteRequest) -> str:
-        logger.debug("Building SICETAC XML payload")
-        variables = quote_request.variables or _DEFAULT_VARIABLES
-        variable_string = ", ".join(variables)
-        logger.debug(f"Variables requested: {variable_string}")
-
-        document_lines = [
-            f"<PERIODO>'{quote_request.period}'</PERIODO>",
-            f"<CONFIGURACION>'{quote_request.configuration}'</CONFIGURACION>",
-            f"<ORIGEN>'{quote_request.origin}'</ORIGEN>",
-            f"<DESTINO>'{quote_request.destination}'</DESTINO>",
-        ]
-        if quote_request.unit_type:
-            logger.debug(f"Adding unit type filter: {quote_request.unit_type}")
-            document_lines.append(
-                f"<NOMBREUNIDADTRANSPORTE>'{quote_request.unit_type.upper()}'</NOMBREUNIDADTRANSPORTE>"
+        lane = await self.fetch_lane(quote_request, priority, deadline)
+        return price_documents(lane.documents, quote_request)
+
+    async def quote(
+        self,
+        quote_request: QuoteRequest,
+        priority: str = INTERACTIVE,
+        deadline: Optional[Deadline] = None,
+    ) -> QuoteResponse:
+        """Quotes for a request, flagged when served from last known data."""
+        lane = await self.fetch_lane(quote_request, priority, deadline)
+        return QuoteResponse(
+            request=quote_request,
+            quotes=price_documents(lane.documents, quote_request),
+            stale=lane.stale,
+            data_as_of=lane.data_as_of,
+        )
+
+    async def fetch_lane(
+        self,
+        quote_request: QuoteRequest,
+        priority: str = INTERACTIVE,
+        deadline: Optional[Deadline] = None,
+    ) -> LaneTariffs:
+        """Raw, unfiltered SICETAC documents for the request's lane, from cache or upstream.
+
+        ``priority`` is the concurrency lane (interactive, batch or background)
+        an upstream call waits in. ``deadline`` bounds the whole lookup,
+        retries included, and defaults to ``sicetac_deadline_seconds`` from now.
+        Joining a coalesced lookup promotes it to the caller's priority and
+        deadline when those are more urgent or later.
+        """
+        lane = await self.cached_lane(quote_request)
+        if lane is not None:
+            logger.debug("Serving lane from tariff cache")
+            return lane
+
+        # Identical concurrent lane lookups share one upstream call.
+        lane_request = self._lane_request(quote_request)
+        deadline = deadline or Deadline.after(self.settings.sicetac_deadline_seconds)
+        ticket = Ticket(priority, deadline=Deadline(deadline.expires_at))
+
+        def join(leader: Ticket) -> None:
+            self.limiter.promote(leader, priority)
+            leader.deadline.extend_to(deadline)
+
+        try:
+            return await asyncio.wait_for(
+                self.coalescer.do(
+                    self.lane_key(lane_request),
+                    lambda: self._load_lane(lane_request, ticket),
+                    state=ticket,
+                    on_join=join,
+                ),
+                timeout=deadline.remaining(),
             )
-        if quote_request.cargo_type:
-            logger.debug(f"Adding cargo type filter: {quote_request.cargo_type}")
-            document_lines.append(
-                f"<NOMBRETIPOCARGA>'{quote_request.cargo_type.upper()}'</NOMBRETIPOCARGA>"
+        except asyncio.TimeoutError as exc:
+            # The shared lookup keeps going for other callers and the cache.
+            raise _timeout_error() from exc
+
+    async def cached_lane(self, quote_request: QuoteRequest) -> Optional[LaneTariffs]:
+        """Cached documents for the request's lane without calling upstream.
+
+        Returns None on a miss and raises the cached error for lanes SICETAC
+        recently answered without tariffs. Entries past their TTL but within
+        the revalidation window are served as they are while one background
+        lookup refreshes them.
+        """
+        lane_request = self._lane_request(quote_request)
+        return self._cached(lane_request, await self.tariff_cache.get(lane_request))
+
+    async def cached_lanes(
+        self, quote_requests: Sequence[QuoteRequest]
+    ) -> List[Union[LaneTariffs, HTTPException, None]]:
+        """``cached_lane`` for many requests in one bulk cache read.
+
+        Cached errors are returned in place of the lane instead of raised.
+        """
+        lane_requests = [self._lane_request(quote_request) for quote_request in quote_requests]
+        results: List[Union[LaneTariffs, HTTPException, None]] = []
+        for lane_request, cached in zip(lane_requests, await self.tariff_cache.get_many(lane_requests)):
+            try:
+                results.append(self._cached(lane_request, cached))
+            except HTTPException as exc:
+                results.append(exc)
+        return results
+
+    def _cached(self, lane_request: QuoteRequest, cached: Optional[dict]) -> Optional[LaneTariffs]:
+        if cached is None:
+            return None
+        if "error" in cached:
+            raise HTTPException(**cached["error"])
+        if cached.get("revalidate"):
+            self._revalidate(lane_request)
+        return LaneTariffs(documents=cached["documents"], fetched_at=cached.get("fetched_at"))
+
+    def _revalidate(self, lane_request: QuoteRequest) -> None:
+        """Refresh a lane in the background, joining any lookup already running for it."""
+        ticket = Ticket(BACKGROUND, deadline=Deadline.after(self.settings.sicetac_deadline_seconds))
+        self.coalescer.start(
+            self.lane_key(lane_request),
+            lambda: self._load_lane(lane_request, ticket),
+            state=ticket,
+        )
+
+    async def _load_lane(self, lane_request: QuoteRequest, ticket: Ticket) -> LaneTariffs:
+        stored = await self._stored_lane(lane_request)
+        # Imported exports are the official tariffs for the whole period.
+        if stored is not None and (
+            stored.imported or self.tariff_cache.is_fresh_fetch(lane_request.period, stored.fetched_at)
+        ):
+            logger.debug("Serving lane from local tariff store")
+            await self.tariff_cache.set(
+                lane_request, stored.documents, fetched_at=stored.fetched_at, pinned=stored.imported
             )
+            return stored
 
-        document_section = "\n    ".join(document_lines)
-
-        # Build inner XML request
-        inner_xml = f"""<?xml version='1.0' encoding='ISO-8859-1' ?>
-<root>
-  <acceso>
-    <username>{self.settings.sicetac_username}</username>
-    <password>{self.settings.sicetac_password}</password>
-  </acceso>
-  <solicitud>
-    <tipo>2</tipo>
-    <procesoid>26</procesoid>
-  </solicitud>
-  <variables>
-    {variable_string}
-  </variables>
-  <documento>
-    {document_section}
-  </documento>
-</root>"""
-
-        # Escape inner XML for SOAP
-        escaped_xml = inner_xml.replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
-
-        # Wrap in SOAP envelope for RPC style
-        payload = f"""<?xml version="1.0" encoding="ISO-8859-1"?>
-<SOAP-ENV:Envelope
-    xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/"
-    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-    xmlns:xsd="http://www.w3.org/2001/XMLSchema">
-  <SOAP-ENV:Body SOAP-ENV:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/">
-    <NS1:AtenderMensajeRNDC xmlns:NS1="urn:BPMServicesIntf-IBPMServices">
-      <Request xsi:type="xsd:string">{escaped_xml}</Request>
-    </NS1:AtenderMensajeRNDC>
-  </SOAP-ENV:Body>
-</SOAP-ENV:Envelope>"""
-
-        logger.debug(f"SOAP Envelope built, size: {len(payload)} bytes")
-        return payload
-
-    @_retry_request
-    async def _post_payload(self, payload: str) -> str:
+        try:
+            response_text = await self._query_upstream(lane_request, ticket)
+        except Exception as exc:
+            stale = await self.tariff_cache.get_stale(lane_request)
+            if stale is not None:
+                logger.warning(f"SICETAC unavailable ({exc!r}), serving last known tariffs")
+                return LaneTariffs(documents=stale["documents"], fetched_at=stale.get("fetched_at"), stale=True)
+            if stored is not None:
+                logger.warning(f"SICETAC unavailable ({exc!r}), serving stored tariffs")
+                stored.stale = True
+                return stored
+            if isinstance(exc, CircuitOpenError):
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Sicetac is temporarily unavailable and no previous tariff is known for this lane",
+                    headers={"Retry-After": str(int(exc.retry_after) + 1)},
+                ) from exc
+            if isinstance(exc, DeadlineExceeded):
+                raise _timeout_error() from exc
+            raise
+
+        logger.debug(f"Response received, size: {len(response_text)} bytes")
+        try:
+            documents = parse_documents(response_text)
+        except HTTPException as exc:
+            if exc.status_code == status.HTTP_404_NOT_FOUND:
+                await self.tariff_cache.set_negative(lane_request, exc.status_code, exc.detail)
+            raise
+
+        fetched_at = time.time()
+        await self.tariff_cache.set(lane_request, documents, fetched_at=fetched_at)
+        if self.tariff_store is not None and not lane_request.variables:
+            self.tariff_store.save_behind(lane_request, documents, fetched_at)
+        return LaneTariffs(documents=documents, fetched_at=fetched_at)
+
+    async def _stored_lane(self, lane_request: QuoteRequest) -> Optional[LaneTariffs]:
+        """The lane from the local tariff store; custom variable lists are never stored."""
+        if self.tariff_store is None or lane_request.variables:
+            return None
+        try:
+            return await self.tariff_store.load(lane_request)
+        except Exception as exc:
+            logger.warning(f"Local tariff store unavailable: {exc!r}")
+            return None
+
+    @staticmethod
+    def _lane_request(quote_request: QuoteRequest) -> QuoteRequest:
+        """The unfiltered upstream query that serves every unit, cargo and hours value."""
+        return quote_request.model_copy(
+            update={"unit_type": None, "cargo_type": None, "logistics_hours": 0.0}
+        )
+
+    @staticmethod
+    def lane_key(quote_request: QuoteRequest) -> Tuple:
+        """Normalized identity of the unfiltered lane a request is served from."""
+        return (
+            quote_request.period,
+            quote_request.configuration,
+            quote_request.origin,
+            quote_request.destination,
+            tuple(quote_request.variables or _DEFAULT_VARIABLES),
+        )
+
+    async def _query_upstream(self, quote_request: QuoteRequest, ticket: Ticket) -> str:
+        payload = self._build_payload(quote_request)
+        logger.debug(f"Payload built, size: {len(payload)} bytes")
+        return await self._post_payload(payload, ticket)
+
+    def _build_payload(self, quote_request: QuoteRequest) -> bytes:
+        # Unit and cargo filters are applied locally (pricing.select_documents) so one
+        # upstream call serves every filter combination for the lane.
+        return self.payload_template.render(
+            quote_request.period,
+            quote_request.configuration,
+            quote_request.origin,
+            quote_request.destination,
+            quote_request.variables,
+        )
+
+    async def _post_payload(self, payload: bytes, ticket: Ticket) -> str:
+        """Send the payload upstream, retrying while the deadline and retry budget allow.
+
+        Only transport failures and gateway-style answers are retried, with
+        jittered exponential backoff. SICETAC business errors (ErrorMSG) come
+        back as a normal response and are never retried.
+        """
+        self.retry_budget.record_call()
+        attempt = 1
+        while True:
+            try:
+                return await self._attempt(payload, ticket)
+            except Exception as exc:
+                delay = self._retry_delay(exc, attempt, ticket.deadline)
+                if delay is None:
+                    raise
+                attempt += 1
+                logger.warning(f"SICETAC attempt failed ({exc!r}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def _retry_delay(self, exc: BaseException, attempt: int, deadline: Deadline) -> Optional[float]:
+        """Backoff before the next attempt, or None when it should not be retried."""
+        if attempt >= self.settings.sicetac_max_attempts or not is_retryable(exc):
+            return None
+        delay = backoff_delay(
+            attempt,
+            base=self.settings.sicetac_retry_base_delay_seconds,
+            cap=self.settings.sicetac_retry_max_delay_seconds,
+        )
+        # An attempt that cannot even connect before the deadline is pointless.
+        if deadline.remaining() <= delay + self.settings.sicetac_connect_timeout_seconds:
+            return None
+        if not self.retry_budget.try_spend():
+            logger.warning("SICETAC retry budget exhausted, not retrying")
+            return None
+        return delay
+
+    async def _attempt(self, payload: bytes, ticket: Ticket) -> str:
+        """One upstream attempt, gated by the circuit breaker and the concurrency limit."""
+        if ticket.deadline.expired:
+            raise DeadlineExceeded()
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.breaker.retry_after())
+        try:
+            lane = await self.limiter.acquire(ticket)
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+        started = time.perf_counter()
+        try:
+            response_text = await asyncio.wait_for(
+                self._post_hedged(payload, ticket.deadline),
+                timeout=ticket.deadline.remaining(),
+            )
+        except (asyncio.CancelledError, asyncio.TimeoutError, httpx.PoolTimeout) as exc:
+            # Cancelled, out of caller time, or our own pool exhausted: none of
+            # these says anything about SICETAC's health.
+            self.limiter.release(lane)
+            self.breaker.release()
+            if isinstance(exc, asyncio.TimeoutError):
+                raise DeadlineExceeded() from exc
+            raise
+        except Exception as exc:
+            self.limiter.release(lane, dropped=_is_overload(exc))
+            self.breaker.record_failure(timed_out=isinstance(exc, httpx.TimeoutException))
+            raise
+        self.limiter.release(lane, latency=time.perf_counter() - started)
+        self.breaker.record_success()
+        return response_text
+
+    async def _post_hedged(self, payload: bytes, deadline: Optional[Deadline] = None) -> str:
+        """Send the payload to the preferred mirror, hedging to the next one if it is slow."""
+        endpoints = self.mirrors.ordered()
+        if not self.settings.sicetac_hedging_enabled or len(endpoints) < 2:
+            return await self._post_to_endpoint(endpoints[0], payload, deadline)
+
+        primary, secondary = endpoints[0], endpoints[1]
+        delay = self._hedge_delay(primary)
+        hedged = False
+        tasks = {asyncio.create_task(self._post_to_endpoint(primary, payload, deadline)): primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                task = done.pop()
+                if task.exception() is None:
+                    return task.result()
+                logger.warning(f"Primary SICETAC mirror {primary} failed, failing over to {secondary}")
+            else:
+                logger.info(f"SICETAC mirror {primary} slower than {delay:.2f}s, hedging to {secondary}")
+                hedged = True
+                self.mirrors.record_hedge()
+            tasks[asyncio.create_task(self._post_to_endpoint(secondary, payload, deadline))] = secondary
+
+            last_error: BaseException | None = None
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if hedged and tasks[task] == secondary:
+                            self.mirrors.record_hedge_win(secondary)
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _hedge_delay(self, endpoint: str) -> float:
+        if self.settings.sicetac_hedge_delay_seconds is not None:
+            return self.settings.sicetac_hedge_delay_seconds
+        return self.mirrors.hedge_delay(
+            endpoint,
+            percentile=self.settings.sicetac_hedge_percentile,
+            default=_DEFAULT_HEDGE_DELAY,
+            minimum=self.settings.sicetac_hedge_min_delay_seconds,
+        )
+
+    def _attempt_timeout(self, deadline: Optional[Deadline]) -> httpx.Timeout:
+        """Per-attempt timeouts, never longer than the time the caller has left."""
+        remaining = deadline.remaining() if deadline is not None else float("inf")
+        return httpx.Timeout(
+            min(self.settings.sicetac_timeout_seconds, remaining),
+            connect=min(self.settings.sicetac_connect_timeout_seconds, remaining),
+            read=min(self.settings.sicetac_read_timeout_seconds, remaining),
+            pool=min(self.settings.sicetac_pool_timeout_seconds, remaining),
+        )
+
+    async def _post_to_endpoint(self, endpoint: str, payload: bytes, deadline: Optional[Deadline] = None) -> str:
         # Use the correct SOAP endpoint
-        soap_endpoint = self.settings.sicetac_endpoint.replace("/ws/rndcService", "/soap/IBPMServices")
+        soap_endpoint = endpoint.replace("/ws/rndcService", "/soap/IBPMServices")
         logger.info(f"Sending request to SICETAC SOAP endpoint: {soap_endpoint}")
-        logger.debug(f"Timeout: {self.settings.sicetac_timeout_seconds}s, SSL Verify: {self.settings.sicetac_verify_ssl}")
+        logger.debug(
+            f"Connect timeout: {self.settings.sicetac_connect_timeout_seconds}s, "
+            f"Read timeout: {self.settings.sicetac_read_timeout_seconds}s, "
+            f"SSL Verify: {self.settings.sicetac_verify_ssl}"
+        )
 
         headers = {
             "Content-Type": "text/xml; charset=ISO-8859-1",
             "SOAPAction": "urn:BPMServicesIntf-IBPMServices#AtenderMensajeRNDC"
         }
-        async with httpx.AsyncClient(verify=self.settings.sicetac_verify_ssl) as client:
-            try:
-                logger.debug("Sending SOAP POST request...")
-                response = await client.post(
-                    soap_endpoint,
-                    content=payload.encode("iso-8859-1"),
-                    headers=headers,
-                    timeout=self.settings.sicetac_timeout_seconds,
-                )
-                logger.info(f"SICETAC response status: {response.status_code}")
-                logger.debug(f"Response headers: {dict(response.headers)}")
-
-                response.raise_for_status()
-                response_text = response.text
-                logger.debug(f"Response text (first 500 chars): {response_text[:500]}...")
-                return response_text
-            except httpx.TimeoutException as e:
-                logger.error(f"SICETAC request timeout after {self.settings.sicetac_timeout_seconds}s: {str(e)}")
-                raise
-            except httpx.HTTPStatusError as e:
-                logger.error(f"SICETAC HTTP error {e.response.status_code}: {e.response.text}")
-                raise
-            except Exception as e:
-                logger.error(f"Unexpected error calling SICETAC: {str(e)}", exc_info=True)
-                raise
-
-    def _parse_response(self, response_text: str, quote_request: QuoteRequest) -> List[QuoteResult]:
-        logger.debug("Parsing SICETAC SOAP response")
+        transport = self.transport or get_transport(self.settings)
+        started = time.perf_counter()
         try:
-            # First parse the SOAP envelope
-            soap_root = ET.fromstring(response_text)
-            logger.debug(f"SOAP root tag: {soap_root.tag}")
-
-            # Find the Body element (handling namespaces)
-            body = None
-            for elem in soap_root:
-                if 'Body' in elem.tag:
-                    body = elem
-                    break
-
-            if body is None:
-                logger.error("No SOAP Body found in response")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="Invalid SOAP response from SICETAC",
-                )
-
-            # Find the response element
-            response_elem = None
-            for elem in body:
-                if 'AtenderMensajeRNDCResponse' in elem.tag:
-                    response_elem = elem
-                    break
-
-            if response_elem is None:
-                logger.error("No AtenderMensajeRNDCResponse found in SOAP Body")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="Invalid SICETAC response structure",
-                )
-
-            # Get the actual XML content from the response
-            # Try different methods to find the return element
-            return_elem = None
-            for elem in response_elem.iter():
-                if 'return' in elem.tag.lower():
-                    return_elem = elem
-                    break
-
-            if return_elem is None:
-                # Try direct search without namespace
-                return_elem = response_elem.find('.//return')
-
-            if return_elem is None or return_elem.text is None:
-                logger.error("No return element found in SOAP response")
-                logger.debug(f"Response element structure: {[child.tag for child in response_elem]}")
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="Empty response from SICETAC",
-                )
-
-            # The inner XML is escaped, so we need to parse it again
-            inner_xml = return_elem.text
-            logger.debug(f"Inner XML (first 500 chars): {inner_xml[:500]}")
-
-            # Parse the actual SICETAC response
-            root = ET.fromstring(inner_xml)
-            logger.debug(f"SICETAC response root tag: {root.tag}")
-        except ET.ParseError as exc:
-            logger.error(f"Failed to parse XML response: {str(exc)}")
-            logger.error(f"Response text was: {response_text[:1000]}")
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail="Failed to parse response from Sicetac",
-            ) from exc
-
-        error_node = root.find("ErrorMSG")
-        if error_node is not None and error_node.text:
-            error_msg = error_node.text.strip()
-            logger.warning(f"SICETAC returned error: {error_msg}")
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error_msg)
-
-        documents = root.findall("documento")
-        logger.info(f"Found {len(documents)} documents in SICETAC response")
-        if not documents:
-            logger.warning("No documents found in SICETAC response")
-            logger.debug(f"Full response XML: {response_text}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Sicetac response did not include any quotes",
-            )
-
-        results: List[QuoteResult] = []
-        for idx, document in enumerate(documents):
-            values = {child.tag.lower(): (child.text or "").strip() for child in document}
-            logger.debug(f"Document {idx + 1} fields: {list(values.keys())}")
-
-            mobilization_text = values.get("valor")
-            if mobilization_text in (None, ""):
-                logger.debug(f"Document {idx + 1}: No 'valor' field, skipping")
-                continue
-            mobilization = _to_float(mobilization_text)
-            if mobilization is None:
-                logger.debug(f"Document {idx + 1}: Invalid mobilization value '{mobilization_text}', skipping")
-                continue
-            logger.debug(f"Document {idx + 1}: Mobilization value = {mobilization}")
-            hour_value = _to_float(values.get("valorhora"))
-            minimum_payable = mobilization
-            if hour_value is not None:
-                minimum_payable += hour_value * quote_request.logistics_hours
-            quote = QuoteResult(
-                route_code=values.get("ruta"),
-                route_name=values.get("nombreruta"),
-                unit_type=values.get("nombreunidadtransporte"),
-                cargo_type=values.get("nombretipocarga"),
-                mobilization_value=mobilization,
-                ton_value=_to_float(values.get("valortonelada")),
-                hour_value=hour_value,
-                distance_km=_to_float(values.get("distancia")),
-                minimum_payable=minimum_payable,
+            logger.debug("Sending SOAP POST request...")
+            response = await transport.post(
+                soap_endpoint,
+                content=payload,
+                headers=headers,
+                timeout=self._attempt_timeout(deadline),
             )
-            results.append(quote)
-            logger.debug(f"Added quote {idx + 1}: Route={quote.route_code}, MinPayable={quote.minimum_payable}")
-
-        if not results:
-            logger.error("No valid quotes extracted from SICETAC response")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Sicetac did not return monetary values for the requested parameters",
-            )
-
-        logger.info(f"Successfully parsed {len(results)} quotes")
-        return results
+            logger.info(f"SICETAC response status: {response.status_code}")
+            logger.debug(f"Response headers: {dict(response.headers)}")
+
+            response.raise_for_status()
+            response_text = response.text
+            logger.debug(f"Response text (first 500 chars): {response_text[:500]}...")
+            self.mirrors.record_success(endpoint, time.perf_counter() - started)
+            return response_text
+        except asyncio.CancelledError:
+            logger.debug(f"Request to {soap_endpoint} cancelled by a faster mirror")
+            self.mirrors.record_cancelled(endpoint, time.perf_counter() - started)
+            raise
+        except httpx.PoolTimeout:
+            logger.warning("Timed out waiting for a free SICETAC connection in the local pool")
+            raise
+        except httpx.TimeoutException as e:
+            self.mirrors.record_failure(endpoint)
+            logger.error(f"SICETAC request timeout: {str(e)}")
+            raise
+        except httpx.HTTPStatusError as e:
+            self.mirrors.record_failure(endpoint)
+            logger.error(f"SICETAC HTTP error {e.response.status_code}: {e.response.text}")
+            raise
+        except Exception as e:
+            self.mirrors.record_failure(endpoint)
+            logger.error(f"Unexpected error calling SICETAC: {str(e)}", exc_info=True)
+            raise
+
+
+# Shared client so mirror statistics survive across requests
+_shared_client: Optional[SicetacClient] = None
 
 
 def get_sicetac_client(settings: Settings | None = None) -> SicetacClient:
-    return SicetacClient(settings=settings or get_settings())
+    global _shared_client
+
+    settings = settings or get_settings()
+    if _shared_client is None or _shared_client.settings is not settings:
+        _shared_client = SicetacClient(settings=settings)
+    return _shared_client
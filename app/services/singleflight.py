@@ -0,0 +1,86 @@
+"""
+Single-flight coalescing of identical in-flight upstream calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Share one in-flight call among concurrent callers asking for the same key.
+
+    The first caller (the leader) starts the work in its own task; callers that
+    arrive while it is running await the same task. A caller being cancelled
+    does not cancel the shared work for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Tuple[asyncio.Task, Any]] = {}
+        self.leader_calls = 0
+        self.coalesced_calls = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[T]],
+        state: Any = None,
+        on_join: Optional[Callable[[Any], None]] = None,
+    ) -> T:
+        """
+        Run ``func`` for ``key``, or join the call already running for it.
+
+        The leader's ``state`` is kept with its call; a follower's
+        ``on_join`` is called with it, e.g. to raise the call's priority.
+        """
+        return await asyncio.shield(self.start(key, func, state, on_join))
+
+    def start(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[T]],
+        state: Any = None,
+        on_join: Optional[Callable[[Any], None]] = None,
+    ) -> asyncio.Task:
+        """Like ``do`` without waiting: the shared task, started only if none is running."""
+        call = self._calls.get(key)
+        if call is None:
+            self.leader_calls += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = (task, state)
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            task, leader_state = call
+            self.coalesced_calls += 1
+            logger.debug(f"Coalesced onto in-flight call for {key}")
+            if on_join is not None:
+                on_join(leader_state)
+        return task
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+        # Mark the exception as retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.leader_calls + self.coalesced_calls
+        return {
+            "leader_calls": self.leader_calls,
+            "coalesced_calls": self.coalesced_calls,
+            "in_flight": self.in_flight,
+            "coalesced_rate": round(self.coalesced_calls / total * 100, 2) if total else 0,
+        }
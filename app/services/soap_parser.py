@@ -0,0 +1,168 @@
+"""
+Single-pass parser for SICETAC SOAP responses.
+
+The SOAP envelope only wraps one escaped string: the inner XML document
+with the tariffs. Instead of building a tree for the envelope and walking
+it, the ``<return>`` payload is located with a string search, unescaped,
+and only the inner document is parsed. Known lowercase tags are mapped
+straight onto tariff document fields.
+
+Security: any document type declaration, in the envelope or in the inner
+document, is rejected before parsing. Without a DTD, expat cannot declare
+entities, so entity expansion and external entity attacks are impossible.
+That is the protection defusedxml's ``forbid_dtd`` gives, and it lets the
+inner document go through the C-accelerated ElementTree parser instead of
+defusedxml's pure-Python one, which is where most of the time went.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import List, Optional
+from xml.etree import ElementTree as ET
+
+from fastapi import HTTPException, status
+
+from app.services.pricing import NUMERIC_FIELDS, TEXT_FIELDS, TariffDocument
+
+logger = logging.getLogger(__name__)
+
+_RESPONSE_TAG = "AtenderMensajeRNDCResponse"
+_RETURN_OPEN = re.compile(r"<(?:[\w.-]+:)?return\b[^>]*>")
+_RETURN_CLOSE = re.compile(r"</(?:[\w.-]+:)?return\s*>")
+_BODY_OPEN = re.compile(r"<(?:[\w.-]+:)?Body\b")
+_ENTITY = re.compile(r"&(#x[0-9a-fA-F]+|#[0-9]+|lt|gt|amp|quot|apos);")
+_NAMED_ENTITIES = {"lt": "<", "gt": ">", "amp": "&", "quot": '"', "apos": "'"}
+_CDATA_START = "<![CDATA["
+_CDATA_END = "]]>"
+
+_FIELDS = frozenset(TEXT_FIELDS + NUMERIC_FIELDS)
+
+
+def _bad_gateway(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=detail)
+
+
+def _not_found(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _replace_entity(match: re.Match) -> str:
+    name = match.group(1)
+    if name[0] != "#":
+        return _NAMED_ENTITIES[name]
+    return chr(int(name[2:], 16) if name[1] in "xX" else int(name[1:]))
+
+
+def _unescape(text: str) -> str:
+    """Resolve the XML predefined entities and character references only."""
+    if "&" not in text:
+        return text
+    if "&#" in text:
+        return _ENTITY.sub(_replace_entity, text)
+    # Common case: only the five named entities; plain replaces run in C.
+    return (
+        text.replace("&lt;", "<")
+        .replace("&gt;", ">")
+        .replace("&quot;", '"')
+        .replace("&apos;", "'")
+        .replace("&amp;", "&")
+    )
+
+
+def _reject_dtd(text: str) -> None:
+    # Never needed by SICETAC; refuse instead of risking entity expansion.
+    if "<!DOCTYPE" in text or "<!ENTITY" in text:
+        logger.error("SICETAC response contains a DTD, refusing to parse it")
+        raise _bad_gateway("Failed to parse response from Sicetac")
+
+
+def extract_return(response_text: str) -> str:
+    """Inner XML carried in the envelope's ``<return>`` element."""
+    _reject_dtd(response_text)
+
+    body = _BODY_OPEN.search(response_text)
+    if body is None:
+        logger.error("No SOAP Body found in response")
+        raise _bad_gateway("Invalid SOAP response from SICETAC")
+
+    response_at = response_text.find(_RESPONSE_TAG, body.end())
+    if response_at < 0:
+        logger.error("No AtenderMensajeRNDCResponse found in SOAP Body")
+        raise _bad_gateway("Invalid SICETAC response structure")
+
+    opening = _RETURN_OPEN.search(response_text, response_at)
+    closing = _RETURN_CLOSE.search(response_text, opening.end()) if opening else None
+    if opening is None or closing is None or opening.group(0).endswith("/>"):
+        logger.error("No return element found in SOAP response")
+        raise _bad_gateway("Empty response from SICETAC")
+
+    payload = response_text[opening.end():closing.start()].strip()
+    if payload.startswith(_CDATA_START) and payload.endswith(_CDATA_END):
+        payload = payload[len(_CDATA_START):-len(_CDATA_END)]
+    else:
+        payload = _unescape(payload)
+    if not payload:
+        logger.error("Empty return element in SOAP response")
+        raise _bad_gateway("Empty response from SICETAC")
+    return payload
+
+
+def _document(element) -> Optional[TariffDocument]:
+    values = {}
+    for child in element:
+        tag = child.tag.lower()
+        if tag in _FIELDS:
+            values[tag] = (child.text or "").strip()
+
+    valor = _to_float(values.get("valor"))
+    if valor is None:
+        return None
+    document: TariffDocument = {name: values.get(name) for name in TEXT_FIELDS}
+    for name in NUMERIC_FIELDS:
+        document[name] = _to_float(values.get(name))
+    return document
+
+
+def parse_documents(response_text: str) -> List[TariffDocument]:
+    """Raw tariff documents from a SICETAC SOAP response.
+
+    Raises 502 for malformed responses and 404 when SICETAC answered with an
+    ``ErrorMSG`` or without usable tariffs.
+    """
+    inner_xml = extract_return(response_text)
+    _reject_dtd(inner_xml)
+    try:
+        root = ET.fromstring(inner_xml)
+    except ET.ParseError as exc:
+        logger.error(f"Failed to parse SICETAC inner XML: {exc}")
+        raise _bad_gateway("Failed to parse response from Sicetac") from exc
+
+    error_node = root.find("ErrorMSG")
+    if error_node is not None and error_node.text:
+        error_msg = error_node.text.strip()
+        logger.warning(f"SICETAC returned error: {error_msg}")
+        raise _not_found(error_msg)
+
+    elements = root.findall("documento")
+    if not elements:
+        logger.warning("No documents found in SICETAC response")
+        raise _not_found("Sicetac response did not include any quotes")
+
+    documents = [document for document in map(_document, elements) if document is not None]
+    if not documents:
+        logger.error("No valid quotes extracted from SICETAC response")
+        raise _not_found("Sicetac did not return monetary values for the requested parameters")
+
+    logger.debug(f"Parsed {len(documents)} of {len(elements)} SICETAC documents")
+    return documents
@@ -0,0 +1,239 @@
+"""
+Bulk import of SiceTac master exports into the local tariff store.
+
+The RNDC portal (Consultas - Consultar Maestros - SiceTac) downloads the
+full master of a period as Excel; it is often re-saved as CSV. Files are read
+row by row and never loaded whole. Each row's codes are normalized with the
+same rules as QuoteRequest, and the rows are handed to
+TariffStore.replace_periods in batches. Once a period is imported, every quote
+for it is answered from the store without SOAP traffic.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from app.models.quotes import _check_configuration, _check_divipola, _check_period
+from app.services.tariff_store import TariffStore
+
+logger = logging.getLogger(__name__)
+
+# Normalized header (upper case, no accents or separators) -> store column.
+_HEADER_ALIASES = {
+    "PERIODO": "period",
+    "ANOMES": "period",
+    "CONFIGURACION": "configuration",
+    "CONFIGURACIONVEHICULAR": "configuration",
+    "ORIGEN": "origin_code",
+    "CODIGOORIGEN": "origin_code",
+    "CODORIGEN": "origin_code",
+    "DIVIPOLAORIGEN": "origin_code",
+    "DESTINO": "destination_code",
+    "CODIGODESTINO": "destination_code",
+    "CODDESTINO": "destination_code",
+    "DIVIPOLADESTINO": "destination_code",
+    "RUTA": "route_code",
+    "CODIGORUTA": "route_code",
+    "NOMBRERUTA": "route_name",
+    "NOMBREUNIDADTRANSPORTE": "unit_type",
+    "UNIDADTRANSPORTE": "unit_type",
+    "UNIDADDETRANSPORTE": "unit_type",
+    "NOMBRETIPOCARGA": "cargo_type",
+    "TIPOCARGA": "cargo_type",
+    "TIPODECARGA": "cargo_type",
+    "VALOR": "mobilization_value",
+    "VALORMOVILIZACION": "mobilization_value",
+    "VALORTONELADA": "ton_value",
+    "VALORHORA": "hour_value",
+    "DISTANCIA": "distance_km",
+}
+_REQUIRED = ("configuration", "origin_code", "destination_code", "mobilization_value")
+_NUMERIC = ("mobilization_value", "ton_value", "hour_value", "distance_km")
+_TEXT = ("route_code", "route_name", "unit_type", "cargo_type")
+
+# Rejected rows reported back, so a broken export is easy to diagnose.
+_MAX_REPORTED_ERRORS = 20
+
+Source = Union[str, Path, IO[bytes]]
+
+
+@dataclass
+class ImportReport:
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_skipped: int = 0
+    periods: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    def skip(self, line: int, reason: str) -> None:
+        self.rows_skipped += 1
+        if len(self.errors) < _MAX_REPORTED_ERRORS:
+            self.errors.append(f"row {line}: {reason}")
+
+
+def _header_key(name: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Z0-9]", "", text.upper())
+
+
+def _text(value: Any) -> str:
+    """Cell text without the quotes RNDC wraps around codes ('202401')."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().strip("'\"").strip() if value is not None else ""
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, (int, float)):
+        return None if value is None else float(value)
+    text = _text(value).replace("$", "").replace(" ", "")
+    if not text:
+        return None
+    if "," in text and "." in text:
+        # Whichever separator comes last is the decimal one.
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".")
+    return float(text)
+
+
+def _divipola(value: Any) -> str:
+    code = _text(value)
+    if code.isdigit() and len(code) == 5:
+        code += "000"  # municipality code without the head-town suffix
+    return _check_divipola(code.zfill(8))
+
+
+def normalize_row(values: Dict[str, Any], period: Optional[str]) -> Dict[str, Any]:
+    """Store row for one export row; raises ValueError when it cannot be used."""
+    missing = [name for name in _REQUIRED if values.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    row_period = _text(values.get("period")) or period
+    if not row_period:
+        raise ValueError("missing period (no PERIODO column and none given)")
+    row = {
+        "period": _check_period(row_period),
+        "configuration": _check_configuration(_text(values["configuration"])),
+        "origin_code": _divipola(values["origin_code"]),
+        "destination_code": _divipola(values["destination_code"]),
+    }
+    for name in _TEXT:
+        row[name] = _text(values.get(name)) or None
+    for name in _NUMERIC:
+        row[name] = _number(values.get(name))
+    if row["mobilization_value"] is None:
+        raise ValueError("mobilization_value is not a number")
+    return row
+
+
+def _csv_rows(stream: IO[bytes], encoding: str) -> Iterator[Sequence[Any]]:
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    sample = text.read(8192)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        yield from csv.reader(text, dialect)
+    finally:
+        text.detach()
+
+
+def _xlsx_rows(stream: IO[bytes]) -> Iterator[Sequence[Any]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise RuntimeError("Importing Excel exports requires openpyxl (pip install openpyxl)") from exc
+
+    # read_only streams rows from the sheet XML instead of building the workbook.
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _detect_format(source: Source, file_format: Optional[str]) -> str:
+    if file_format:
+        return file_format.lower()
+    name = str(source) if isinstance(source, (str, Path)) else getattr(source, "name", "")
+    return "xlsx" if str(name).lower().endswith((".xlsx", ".xlsm")) else "csv"
+
+
+def iter_export_rows(
+    stream: IO[bytes], file_format: str, encoding: str = "utf-8-sig"
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, values by store column) for each data row of an export.
+
+    Title rows above the header (the portal adds some) are skipped: the
+    header is the first row naming the lane columns.
+    """
+    rows = _xlsx_rows(stream) if file_format == "xlsx" else _csv_rows(stream, encoding)
+    columns: Optional[List[Optional[str]]] = None
+    for line, cells in enumerate(rows, start=1):
+        if columns is None:
+            candidate = [_HEADER_ALIASES.get(_header_key(cell)) for cell in cells]
+            if {"origin_code", "destination_code", "mobilization_value"} <= set(candidate):
+                columns = candidate
+            continue
+        if not any(cell not in (None, "") for cell in cells):
+            continue
+        yield line, {name: cell for name, cell in zip(columns, cells) if name}
+    if columns is None:
+        raise ValueError("No header row with ORIGEN, DESTINO and VALOR columns found")
+
+
+def import_tariffs(
+    store: TariffStore,
+    source: Source,
+    period: Optional[str] = None,
+    file_format: Optional[str] = None,
+    encoding: str = "utf-8-sig",
+    batch_size: int = 1000,
+) -> ImportReport:
+    """Stream an export into the store, replacing the periods it contains.
+
+    ``period`` is used for rows without a PERIODO column. Rows that do not
+    pass the QuoteRequest rules are skipped and reported.
+    """
+    file_format = _detect_format(source, file_format)
+    if period is not None:
+        period = _check_period(_text(period))
+    report = ImportReport()
+
+    def rows(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+        for line, values in iter_export_rows(stream, file_format, encoding):
+            report.rows_read += 1
+            try:
+                row = normalize_row(values, period)
+            except ValueError as exc:
+                report.skip(line, str(exc))
+                continue
+            if row["period"] not in report.periods:
+                report.periods.append(row["period"])
+            yield row
+
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as stream:
+            result = store.replace_periods(rows(stream), batch_size=batch_size)
+    else:
+        result = store.replace_periods(rows(source), batch_size=batch_size)
+
+    report.rows_imported = result["rows"]
+    logger.info(
+        f"Imported {report.rows_imported} tariff rows for periods {report.periods} "
+        f"({report.rows_skipped} skipped)"
+    )
+    return report
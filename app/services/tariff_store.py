@@ -0,0 +1,214 @@
+"""
+Durable local store of raw SICETAC documents.
+
+The in-memory tier of the cache starts empty in every new process. The
+store keeps each lane's documents in a local database (SQLite in WAL mode by
+default), so a restarted worker answers known lanes with one indexed read
+instead of a SOAP call. SicetacClient reads through it on a cache miss and
+writes behind it after upstream answers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.tariffs import TariffBase, TariffDocumentDB, create_tariff_engine
+from app.services.pricing import LaneTariffs, TariffDocument
+
+logger = logging.getLogger(__name__)
+
+# Raw document field -> store column.
+_COLUMNS = {
+    "ruta": "route_code",
+    "nombreruta": "route_name",
+    "nombreunidadtransporte": "unit_type",
+    "nombretipocarga": "cargo_type",
+    "valor": "mobilization_value",
+    "valortonelada": "ton_value",
+    "valorhora": "hour_value",
+    "distancia": "distance_km",
+}
+_SELECTED = [getattr(TariffDocumentDB, column) for column in _COLUMNS.values()]
+
+SOURCE_SOAP = "soap"
+SOURCE_IMPORT = "import"
+
+
+@dataclass
+class StoredLane(LaneTariffs):
+    """Lane tariffs read from the store; ``imported`` lanes came from a period export."""
+
+    imported: bool = False
+
+
+def _lane_filter(period: str, configuration: str, origin: str, destination: str):
+    return (
+        TariffDocumentDB.period == period,
+        TariffDocumentDB.configuration == configuration,
+        TariffDocumentDB.origin_code == origin,
+        TariffDocumentDB.destination_code == destination,
+    )
+
+
+class TariffStore:
+    """Lane documents persisted across restarts, keyed by the lane index."""
+
+    def __init__(self, url: str):
+        self.engine = create_tariff_engine(url)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        TariffBase.metadata.create_all(bind=self.engine)
+        self._pending: Set[asyncio.Task] = set()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "write_errors": 0}
+
+    @classmethod
+    def from_settings(cls, settings) -> "TariffStore":
+        return cls(settings.tariff_store_url)
+
+    def get_lane(
+        self, period: str, configuration: str, origin: str, destination: str
+    ) -> Optional[StoredLane]:
+        """Stored documents for a lane, or None when the lane was never stored."""
+        with self.session_factory() as session:
+            rows = session.execute(
+                select(*_SELECTED, TariffDocumentDB.fetched_at, TariffDocumentDB.source)
+                .where(*_lane_filter(period, configuration, origin, destination))
+                .order_by(TariffDocumentDB.id)
+            ).all()
+        if not rows:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return StoredLane(
+            documents=[dict(zip(_COLUMNS, row[:-2])) for row in rows],
+            fetched_at=min(row[-2] for row in rows),
+            imported=all(row[-1] == SOURCE_IMPORT for row in rows),
+        )
+
+    def put_lane(
+        self,
+        period: str,
+        configuration: str,
+        origin: str,
+        destination: str,
+        documents: Iterable[TariffDocument],
+        fetched_at: float,
+    ) -> None:
+        """Replace a lane's documents in one transaction."""
+        rows = self._rows(period, configuration, origin, destination, documents, fetched_at)
+        with self.session_factory() as session, session.begin():
+            session.execute(
+                delete(TariffDocumentDB).where(*_lane_filter(period, configuration, origin, destination))
+            )
+            if rows:
+                session.execute(insert(TariffDocumentDB), rows)
+        self.stats["writes"] += 1
+
+    def replace_periods(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> Dict[str, int]:
+        """Bulk-load complete periods, replacing whatever was stored for them.
+
+        ``rows`` hold store columns (lane and document values) and are
+        consumed lazily, ``batch_size`` at a time. Each period seen is
+        cleared before its first batch is inserted, all in one transaction.
+        Importing the same export twice therefore leaves the same rows, and
+        readers keep seeing the old rows until the import commits.
+        """
+        fetched_at = time.time()
+        periods: Set[str] = set()
+        inserted = 0
+        batch: List[Dict[str, Any]] = []
+        with self.session_factory() as session, session.begin():
+            for row in rows:
+                if row["period"] not in periods:
+                    periods.add(row["period"])
+                    session.execute(delete(TariffDocumentDB).where(TariffDocumentDB.period == row["period"]))
+                batch.append({"fetched_at": fetched_at, "source": SOURCE_IMPORT, **row})
+                if len(batch) >= batch_size:
+                    session.execute(insert(TariffDocumentDB), batch)
+                    inserted += len(batch)
+                    batch = []
+            if batch:
+                session.execute(insert(TariffDocumentDB), batch)
+                inserted += len(batch)
+        self.stats["writes"] += 1
+        return {"periods": len(periods), "rows": inserted}
+
+    @staticmethod
+    def _rows(
+        period: str,
+        configuration: str,
+        origin: str,
+        destination: str,
+        documents: Iterable[TariffDocument],
+        fetched_at: float,
+    ) -> List[Dict[str, Any]]:
+        lane = {
+            "period": period,
+            "configuration": configuration,
+            "origin_code": origin,
+            "destination_code": destination,
+            "fetched_at": fetched_at,
+            "source": SOURCE_SOAP,
+        }
+        return [
+            {**lane, **{column: document.get(field) for field, column in _COLUMNS.items()}}
+            for document in documents
+        ]
+
+    async def load(self, quote_request) -> Optional[StoredLane]:
+        """Read a request's lane without blocking the event loop."""
+        return await asyncio.to_thread(
+            self.get_lane,
+            quote_request.period,
+            quote_request.configuration,
+            quote_request.origin,
+            quote_request.destination,
+        )
+
+    def save_behind(self, quote_request, documents: List[TariffDocument], fetched_at: float) -> None:
+        """Persist a lane in the background; failures are logged, never raised."""
+        task = asyncio.create_task(
+            asyncio.to_thread(
+                self.put_lane,
+                quote_request.period,
+                quote_request.configuration,
+                quote_request.origin,
+                quote_request.destination,
+                documents,
+                fetched_at,
+            )
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._write_done)
+
+    def _write_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["write_errors"] += 1
+            logger.warning(f"Could not persist lane tariffs: {task.exception()!r}")
+
+    async def flush(self) -> None:
+        """Wait for pending background writes (shutdown and tests)."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending_writes": len(self._pending)}
+
+
+# One store (and engine) per process
+_store: Optional[TariffStore] = None
+
+
+def get_tariff_store(settings) -> TariffStore:
+    global _store
+
+    if _store is None:
+        _store = TariffStore.from_settings(settings)
+    return _store
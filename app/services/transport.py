@@ -0,0 +1,200 @@
+"""
+Application-scoped HTTP transport for upstream SICETAC calls.
+
+A single pooled ``httpx.AsyncClient`` is shared by every ``SicetacClient`` so
+keep-alive connections to rndcws are reused instead of paying a new TCP
+handshake per quote.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_size(settings: Settings) -> int:
+    """Configured pool size, raised to what the concurrency limit can use.
+
+    Each in-flight call may hold two connections while it is hedged to a
+    second mirror, so a smaller pool would time out on our side.
+    """
+    hedging = settings.sicetac_hedging_enabled and len(settings.sicetac_endpoint_list) > 1
+    needed = settings.sicetac_limit_max * (2 if hedging else 1)
+    if settings.sicetac_pool_max_connections < needed:
+        logger.warning(
+            f"SICETAC_POOL_MAX_CONNECTIONS={settings.sicetac_pool_max_connections} is below "
+            f"{needed} connections the concurrency limit can use; using {needed}"
+        )
+        return needed
+    return settings.sicetac_pool_max_connections
+
+
+class SicetacTransport:
+    """
+    Pooled HTTP transport with connection usage metrics.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.settings = settings
+        self.limits = httpx.Limits(
+            max_connections=_pool_size(settings),
+            max_keepalive_connections=settings.sicetac_pool_max_keepalive,
+            keepalive_expiry=settings.sicetac_pool_keepalive_expiry_seconds,
+        )
+        self.timeout = httpx.Timeout(
+            settings.sicetac_timeout_seconds,
+            connect=settings.sicetac_connect_timeout_seconds,
+            read=settings.sicetac_read_timeout_seconds,
+            pool=settings.sicetac_pool_timeout_seconds,
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_use = 0
+        self._waiting = 0
+        self._requests = 0
+        self._connections_opened = 0
+        self._wait_samples = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._recent_waits: deque = deque(maxlen=500)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            logger.info(
+                f"Opening SICETAC connection pool (max={self.limits.max_connections}, "
+                f"keepalive={self.limits.max_keepalive_connections})"
+            )
+            self._client = httpx.AsyncClient(
+                verify=self.settings.sicetac_verify_ssl,
+                limits=self.limits,
+                timeout=self.timeout,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def post(
+        self,
+        url: str,
+        content: bytes,
+        headers: Dict[str, str],
+        timeout: Optional[httpx.Timeout] = None,
+    ) -> httpx.Response:
+        """POST through the shared pool.
+
+        httpx enforces the pool size and pool timeout itself. Time spent
+        waiting for a connection is measured through httpcore's trace hook:
+        it ends when a new connection starts opening or the request starts
+        going out on a reused one; from then on the request counts as in use.
+        """
+        started = time.perf_counter()
+        waiting = True
+        self._waiting += 1
+        self._requests += 1
+
+        def got_connection() -> None:
+            nonlocal waiting
+            if waiting:
+                waiting = False
+                self._waiting -= 1
+                self._in_use += 1
+                self._record_wait(time.perf_counter() - started)
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            if event == "connection.connect_tcp.started":
+                self._connections_opened += 1
+                got_connection()
+            elif event.endswith("send_request_headers.started"):
+                got_connection()
+
+        try:
+            return await self.client.post(
+                url,
+                content=content,
+                headers=headers,
+                timeout=timeout or self.timeout,
+                extensions={"trace": trace},
+            )
+        finally:
+            if waiting:
+                # Never reached a connection (pool timeout, cancelled, or a
+                # transport without tracing such as the test mock).
+                self._waiting -= 1
+            else:
+                self._in_use -= 1
+
+    def _record_wait(self, wait: float) -> None:
+        self._wait_samples += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        self._recent_waits.append(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        recent = sorted(self._recent_waits)
+        p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+        avg = self._total_wait / self._wait_samples if self._wait_samples else 0.0
+        # httpx does not expose its pool, so idle is estimated: keep-alive
+        # connections opened so far and not held by a request. Connections
+        # closed after keepalive_expiry still count until reused.
+        keepalive = min(self._connections_opened, self.limits.max_keepalive_connections or 0)
+
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "in_use": self._in_use,
+            "idle": max(keepalive - self._in_use, 0),
+            "waiting": self._waiting,
+            "requests": self._requests,
+            "connections_opened": self._connections_opened,
+            "wait_ms_avg": round(avg * 1000, 2),
+            "wait_ms_p95": round(p95 * 1000, 2),
+            "wait_ms_max": round(self._max_wait * 1000, 2),
+        }
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("SICETAC connection pool closed")
+        self._client = None
+
+
+# Global transport instance
+sicetac_transport: Optional[SicetacTransport] = None
+
+
+def get_transport(settings: Settings | None = None) -> SicetacTransport:
+    """Return the shared transport, creating it if the lifespan did not."""
+    global sicetac_transport
+
+    if sicetac_transport is None:
+        sicetac_transport = SicetacTransport(settings or get_settings())
+    return sicetac_transport
+
+
+async def initialize_transport(settings: Settings | None = None) -> SicetacTransport:
+    """Initialize the shared SICETAC transport."""
+    transport = get_transport(settings)
+    transport.client  # open the pool eagerly
+    return transport
+
+
+async def shutdown_transport() -> None:
+    """Close the shared SICETAC transport."""
+    global sicetac_transport
+
+    if sicetac_transport is not None:
+        await sicetac_transport.close()
+        sicetac_transport = None
@@ -0,0 +1,256 @@
+"""
+History-driven warming of the tariff cache.
+
+The hottest lanes are mined from the quotation history in QuotationDB, and
+the current period is loaded for them with bounded parallelism. Lanes with
+a fresh cache entry are skipped. Upstream loads go through SicetacClient at
+background priority. After each run the warmer records coverage: the share
+of last week's quotations that would be cache hits if they were replayed
+now.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from app.models.quotes import QuoteRequest
+from app.services.concurrency import BACKGROUND
+from app.utils.periods import current_period
+
+logger = logging.getLogger(__name__)
+
+# (configuration, origin, destination)
+Lane = Tuple[str, str, str]
+LaneSource = Callable[[int, int], List[Lane]]
+
+# Coverage is measured against this much quotation history.
+COVERAGE_DAYS = 7
+
+
+def lane_traffic(days: int, limit: Optional[int] = None, session_factory=None) -> List[Tuple[Lane, int]]:
+    """(lane, quotations) over the last ``days`` days, most quoted first."""
+    from sqlalchemy import func, select
+
+    from app.models.database import QuotationDB
+
+    if session_factory is None:
+        from app.models.database import SessionLocal as session_factory
+
+    since = datetime.utcnow() - timedelta(days=days)
+    lane = (QuotationDB.configuration, QuotationDB.origin_code, QuotationDB.destination_code)
+    quotations = func.count()
+    query = (
+        select(*lane, quotations)
+        .where(QuotationDB.created_at >= since, QuotationDB.status != "deleted")
+        .group_by(*lane)
+        .order_by(quotations.desc(), *lane)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    with session_factory() as session:
+        return [(tuple(row[:3]), row[3]) for row in session.execute(query).all()]
+
+
+def top_lanes_from_history(limit: int, days: int, session_factory=None) -> List[Lane]:
+    """Most quoted lanes in the last ``days`` days, most frequent first."""
+    return [lane for lane, _ in lane_traffic(days, limit, session_factory)]
+
+
+def _lane_request(period: str, lane: Lane) -> QuoteRequest:
+    configuration, origin, destination = lane
+    return QuoteRequest(period=period, configuration=configuration, origin=origin, destination=destination)
+
+
+@dataclass
+class WarmProgress:
+    period: Optional[str] = None
+    state: str = "idle"  # idle, running, done, failed, skipped
+    total: int = 0
+    completed: int = 0
+    fresh: int = 0
+    fetched: int = 0
+    no_tariff: int = 0
+    failed: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+async def warm_lanes(
+    client, period: str, lanes: Sequence[Lane], concurrency: int, progress: WarmProgress
+) -> WarmProgress:
+    """Load ``period`` for each lane that is not fresh in the cache, ``concurrency`` at a time.
+
+    Freshness of every lane is checked with one bulk cache read up front.
+    """
+    progress.total = len(lanes)
+    requests: List[Tuple[Lane, QuoteRequest]] = []
+    for lane in lanes:
+        try:
+            requests.append((lane, _lane_request(period, lane)))
+        except ValueError as exc:
+            # History row that is not a valid lane; the rest of the run goes on.
+            logger.debug(f"Skipping lane {lane}: {exc}")
+            progress.failed += 1
+            progress.completed += 1
+
+    queue: asyncio.Queue = asyncio.Queue()
+    cached = await client.tariff_cache.peek_many([request for _, request in requests])
+    for (lane, request), entry in zip(requests, cached):
+        if entry is not None:
+            progress.fresh += 1
+            progress.completed += 1
+        else:
+            queue.put_nowait((lane, request))
+
+    async def worker() -> None:
+        while not queue.empty():
+            lane, request = queue.get_nowait()
+            try:
+                await client.fetch_lane(request, priority=BACKGROUND)
+                progress.fetched += 1
+            except HTTPException as exc:
+                if exc.status_code == 404:
+                    progress.no_tariff += 1
+                else:
+                    progress.failed += 1
+            except Exception as exc:
+                # Upstream errors; the rest of the run goes on.
+                logger.debug(f"Warming lane {lane} for {period} failed: {exc!r}")
+                progress.failed += 1
+            progress.completed += 1
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, queue.qsize()))))
+    return progress
+
+
+class CacheWarmer:
+    """Periodically warm the hottest lanes and report cache coverage."""
+
+    def __init__(
+        self,
+        client,
+        lane_source: LaneSource = top_lanes_from_history,
+        top_lanes: int = 200,
+        history_days: int = 7,
+        concurrency: int = 4,
+        interval: float = 1800.0,
+        traffic_source: Callable[[int], List[Tuple[Lane, int]]] = lane_traffic,
+    ):
+        self.client = client
+        self.lane_source = lane_source
+        self.top_lanes = top_lanes
+        self.history_days = history_days
+        self.concurrency = concurrency
+        self.interval = interval
+        self.traffic_source = traffic_source
+        self.progress = WarmProgress()
+        self.coverage: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls, client, settings) -> "CacheWarmer":
+        return cls(
+            client,
+            top_lanes=settings.cache_warm_top_lanes,
+            history_days=settings.cache_warm_history_days,
+            concurrency=settings.cache_warm_concurrency,
+            interval=settings.cache_warm_interval_seconds,
+        )
+
+    async def warm(self, period: Optional[str] = None, lanes: Optional[Sequence[Lane]] = None) -> WarmProgress:
+        """Warm ``lanes`` (default: the hottest ones) for ``period`` (default: current)."""
+        period = period or current_period()
+        progress = self.progress = WarmProgress(period=period, state="running", started_at=time.time())
+        try:
+            if lanes is None:
+                lanes = await asyncio.to_thread(self.lane_source, self.top_lanes, self.history_days)
+            await warm_lanes(self.client, period, lanes, self.concurrency, progress)
+            progress.state = "done"
+        except Exception as exc:
+            progress.state = "failed"
+            progress.error = repr(exc)
+            raise
+        finally:
+            progress.finished_at = time.time()
+        logger.info(
+            f"Warmed {progress.fetched} lanes for {period} "
+            f"({progress.fresh} already fresh, {progress.failed} failed)"
+        )
+        return progress
+
+    async def measure_coverage(self, period: Optional[str] = None) -> Optional[float]:
+        """Percentage of last week's quotations that would hit the cache now."""
+        from app.services.monitoring import metrics_collector
+
+        period = period or current_period()
+        traffic = await asyncio.to_thread(self.traffic_source, COVERAGE_DAYS)
+        total = sum(count for _, count in traffic)
+        if not total:
+            return None
+        requests, counts = [], []
+        for lane, count in traffic:
+            try:
+                requests.append(_lane_request(period, lane))
+            except ValueError:
+                continue  # history row that is not a valid lane
+            counts.append(count)
+        cached = await self.client.tariff_cache.peek_many(requests)
+        hits = sum(count for count, entry in zip(counts, cached) if entry is not None)
+        self.coverage = round(hits / total * 100, 2)
+        metrics_collector.record_gauge("cache.warm_coverage", self.coverage)
+        return self.coverage
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.warm()
+                await self.measure_coverage()
+            except Exception as exc:
+                logger.error(f"Cache warming failed: {exc!r}")
+            await asyncio.sleep(self.interval)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {**asdict(self.progress), "coverage_percent": self.coverage}
+
+
+# One warmer per process
+_warmer: Optional[CacheWarmer] = None
+
+
+def get_warmer() -> Optional[CacheWarmer]:
+    return _warmer
+
+
+def start_warmer(client, settings) -> Optional[CacheWarmer]:
+    """Start periodic warming unless CACHE_WARM_ENABLED is off."""
+    global _warmer
+
+    if not settings.cache_warm_enabled:
+        return None
+    if _warmer is None:
+        _warmer = CacheWarmer.from_settings(client, settings)
+    _warmer.start()
+    return _warmer
+
+
+async def stop_warmer() -> None:
+    if _warmer is not None:
+        await _warmer.stop()
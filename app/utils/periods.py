@@ -0,0 +1,36 @@
+"""
+Helpers for SICETAC monthly periods (yyyymm).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Colombia does not observe daylight saving time.
+BOGOTA_TZ = timezone(timedelta(hours=-5), name="America/Bogota")
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    """Return the SICETAC period in force, using Bogotá local time."""
+    now = now or datetime.now(BOGOTA_TZ)
+    if now.tzinfo is not None:
+        now = now.astimezone(BOGOTA_TZ)
+    return now.strftime("%Y%m")
+
+
+def is_closed_period(period: str, now: Optional[datetime] = None) -> bool:
+    """A period is closed once the month is over; its tariffs never change again."""
+    return period < current_period(now)
+
+
+def seconds_until_next_period(now: Optional[datetime] = None) -> float:
+    """Seconds until the next period starts (midnight of the 1st, Bogotá time)."""
+    now = now or datetime.now(BOGOTA_TZ)
+    if now.tzinfo is not None:
+        now = now.astimezone(BOGOTA_TZ)
+    if now.month == 12:
+        start = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    else:
+        start = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    return (start - now).total_seconds()
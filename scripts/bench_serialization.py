@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: cache value encoding, plain json vs. app.services.serialization.
+
+Encodes a tariff cache entry (a lane's SICETAC documents) with each codec
+and compression available here, and reports stored bytes and the time to
+encode and decode it.
+
+    python scripts/bench_serialization.py [--documents 40] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services import serialization  # noqa: E402
+from app.services.serialization import Serializer  # noqa: E402
+
+UNITS = ["ESTACAS", "TERMOKING", "FURGON", "TANQUE", "PLANCHON", "PORTACONTENEDOR"]
+
+
+def tariff_entry(documents: int) -> dict:
+    return {
+        "documents": [
+            {
+                "ruta": "106",
+                "nombreunidadtransporte": UNITS[i % len(UNITS)],
+                "nombretipocarga": "General",
+                "nombreruta": "BOGOTA _ MEDELLIN",
+                "valor": 2478949.67 + i * 1013.5,
+                "valortonelada": 72910.28 + i,
+                "valorhora": 37926.89,
+                "distancia": 416,
+            }
+            for i in range(documents)
+        ],
+        "fetched_at": 1700000000.5,
+        "fresh_until": 1700043200.5,
+        "revalidate_until": 1700086400.5,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    entry = tariff_entry(args.documents)
+    number = 2000
+    codecs = ["json"] + [name for name, module in (("orjson", serialization.orjson), ("msgpack", serialization.msgpack)) if module]
+    compressions = ["none", "zlib"] + [
+        name for name, module in (("zstd", serialization.zstandard), ("lz4", serialization.lz4_frame)) if module
+    ]
+
+    def report(name: str, dumps, loads) -> None:
+        data = dumps(entry)
+        assert loads(data) == entry
+        encode = min(timeit.repeat(lambda: dumps(entry), number=number, repeat=args.repeat)) / number
+        decode = min(timeit.repeat(lambda: loads(data), number=number, repeat=args.repeat)) / number
+        print(f"{name:<22} {len(data):>7} B   dumps {encode * 1e6:7.1f} us   loads {decode * 1e6:7.1f} us")
+
+    report("legacy json.dumps", lambda value: json.dumps(value), json.loads)
+    for codec in codecs:
+        for compression in compressions:
+            serializer = Serializer(codec=codec, compression=compression)
+            report(f"{codec}+{compression}", serializer.dumps, serializer.loads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: single-pass SOAP parser vs. the previous two-tree parser.
+
+Runs both parsers over the stub's SAMPLE_XML and over large synthetic
+responses, checks they return the same documents, and prints timings.
+
+    python scripts/bench_soap_parser.py [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from defusedxml import ElementTree as ET  # noqa: E402
+from fastapi import HTTPException, status  # noqa: E402
+
+from app.services.pricing import NUMERIC_FIELDS, TEXT_FIELDS, TariffDocument  # noqa: E402
+from app.services.soap_parser import parse_documents  # noqa: E402
+from scripts.local_sicetac_stub import SAMPLE_XML  # noqa: E402
+
+logger = logging.getLogger("bench_soap_parser")
+
+UNITS = ["TERMOKING", "ESTACAS", "FURGON", "PLANCHON", "TANQUE"]
+CARGOS = ["Carga Refrigerada", "General", "Granel Solido", "Granel Liquido", "Contenedor"]
+
+
+def _to_float(value: str | None) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def legacy_parse_documents(response_text: str) -> List[TariffDocument]:  # noqa: C901
+    """SicetacClient._parse_documents before the single-pass parser (kept verbatim)."""
+    logger.debug("Parsing SICETAC SOAP response")
+    try:
+        # First parse the SOAP envelope
+        soap_root = ET.fromstring(response_text)
+        logger.debug(f"SOAP root tag: {soap_root.tag}")
+
+        # Find the Body element (handling namespaces)
+        body = None
+        for elem in soap_root:
+            if 'Body' in elem.tag:
+                body = elem
+                break
+
+        if body is None:
+            logger.error("No SOAP Body found in response")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Invalid SOAP response from SICETAC",
+            )
+
+        # Find the response element
+        response_elem = None
+        for elem in body:
+            if 'AtenderMensajeRNDCResponse' in elem.tag:
+                response_elem = elem
+                break
+
+        if response_elem is None:
+            logger.error("No AtenderMensajeRNDCResponse found in SOAP Body")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Invalid SICETAC response structure",
+            )
+
+        # Get the actual XML content from the response
+        # Try different methods to find the return element
+        return_elem = None
+        for elem in response_elem.iter():
+            if 'return' in elem.tag.lower():
+                return_elem = elem
+                break
+
+        if return_elem is None:
+            # Try direct search without namespace
+            return_elem = response_elem.find('.//return')
+
+        if return_elem is None or return_elem.text is None:
+            logger.error("No return element found in SOAP response")
+            logger.debug(f"Response element structure: {[child.tag for child in response_elem]}")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Empty response from SICETAC",
+            )
+
+        # The inner XML is escaped, so we need to parse it again
+        inner_xml = return_elem.text
+        logger.debug(f"Inner XML (first 500 chars): {inner_xml[:500]}")
+
+        # Parse the actual SICETAC response
+        root = ET.fromstring(inner_xml)
+        logger.debug(f"SICETAC response root tag: {root.tag}")
+    except ET.ParseError as exc:
+        logger.error(f"Failed to parse XML response: {str(exc)}")
+        logger.error(f"Response text was: {response_text[:1000]}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to parse response from Sicetac",
+        ) from exc
+
+    error_node = root.find("ErrorMSG")
+    if error_node is not None and error_node.text:
+        error_msg = error_node.text.strip()
+        logger.warning(f"SICETAC returned error: {error_msg}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error_msg)
+
+    documents = root.findall("documento")
+    logger.info(f"Found {len(documents)} documents in SICETAC response")
+    if not documents:
+        logger.warning("No documents found in SICETAC response")
+        logger.debug(f"Full response XML: {response_text}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sicetac response did not include any quotes",
+        )
+
+    results: List[TariffDocument] = []
+    for idx, document in enumerate(documents):
+        values = {child.tag.lower(): (child.text or "").strip() for child in document}
+        logger.debug(f"Document {idx + 1} fields: {list(values.keys())}")
+
+        mobilization_text = values.get("valor")
+        if mobilization_text in (None, ""):
+            logger.debug(f"Document {idx + 1}: No 'valor' field, skipping")
+            continue
+        mobilization = _to_float(mobilization_text)
+        if mobilization is None:
+            logger.debug(f"Document {idx + 1}: Invalid mobilization value '{mobilization_text}', skipping")
+            continue
+        logger.debug(f"Document {idx + 1}: Mobilization value = {mobilization}")
+        raw_document: TariffDocument = {name: values.get(name) for name in TEXT_FIELDS}
+        raw_document.update({name: _to_float(values.get(name)) for name in NUMERIC_FIELDS})
+        results.append(raw_document)
+        logger.debug(f"Added document {idx + 1}: Route={raw_document['ruta']}, Valor={mobilization}")
+
+    if not results:
+        logger.error("No valid quotes extracted from SICETAC response")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sicetac did not return monetary values for the requested parameters",
+        )
+
+    logger.info(f"Successfully parsed {len(results)} documents")
+    return results
+
+
+def envelope(inner_xml: str) -> str:
+    """Wrap inner XML the way SICETAC's RPC-style SOAP service does."""
+    escaped = inner_xml.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return (
+        '<?xml version="1.0" encoding="ISO-8859-1"?>\n'
+        '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/" '
+        'xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        '<SOAP-ENV:Body SOAP-ENV:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/">'
+        '<NS1:AtenderMensajeRNDCResponse xmlns:NS1="urn:BPMServicesIntf-IBPMServices">'
+        f'<return xsi:type="xsd:string">{escaped}</return>'
+        "</NS1:AtenderMensajeRNDCResponse>"
+        "</SOAP-ENV:Body>"
+        "</SOAP-ENV:Envelope>"
+    )
+
+
+def synthetic_inner(documents: int) -> str:
+    rows = []
+    for index in range(documents):
+        rows.append(
+            "  <documento>\n"
+            f"    <ruta>{100 + index % 900}</ruta>\n"
+            f"    <nombreunidadtransporte>{UNITS[index % len(UNITS)]}</nombreunidadtransporte>\n"
+            f"    <nombretipocarga>{CARGOS[index % len(CARGOS)]}</nombretipocarga>\n"
+            "    <nombreruta>BOGOTA _ MEDELLIN</nombreruta>\n"
+            f"    <valor>{2000000 + index * 137.25:.2f}</valor>\n"
+            f"    <valortonelada>{70000 + index * 3.5:.2f}</valortonelada>\n"
+            f"    <valorhora>{30000 + index:.2f}</valorhora>\n"
+            "    <distancia>416</distancia>\n"
+            "  </documento>"
+        )
+    return "<?xml version='1.0' encoding='ISO-8859-1' ?>\n<root>\n" + "\n".join(rows) + "\n</root>"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per case (best is reported)")
+    args = parser.parse_args()
+
+    cases = [("stub SAMPLE_XML (2 docs)", envelope(SAMPLE_XML))]
+    cases += [(f"synthetic ({n} docs)", envelope(synthetic_inner(n))) for n in (50, 500, 5000)]
+
+    print(f"{'case':<28}{'legacy us':>14}{'single-pass us':>18}{'speedup':>10}")
+    for name, response in cases:
+        assert parse_documents(response) == legacy_parse_documents(response), name
+        number = max(1, 20000 // (len(response) // 100 + 1))
+        legacy = min(timeit.repeat(lambda: legacy_parse_documents(response), number=number, repeat=args.repeat))
+        fast = min(timeit.repeat(lambda: parse_documents(response), number=number, repeat=args.repeat))
+        print(
+            f"{name:<28}{legacy / number * 1e6:>14.1f}{fast / number * 1e6:>18.1f}"
+            f"{legacy / fast:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
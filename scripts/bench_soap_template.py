@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: precompiled SOAP payload template vs. the previous f-string builder.
+
+Checks that both produce the same bytes for validated requests, then times
+them on the default variables and on a custom variables list.
+
+    python scripts/bench_soap_template.py [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models.quotes import QuoteRequest  # noqa: E402
+from app.services.soap_template import SoapPayloadTemplate  # noqa: E402
+
+DEFAULT_VARIABLES = [
+    "RUTA",
+    "NOMBREUNIDADTRANSPORTE",
+    "NOMBRETIPOCARGA",
+    "NOMBRERUTA",
+    "VALOR",
+    "VALORTONELADA",
+    "VALORHORA",
+    "DISTANCIA",
+]
+USERNAME = "bench-user"
+PASSWORD = "bench-password"
+
+
+def legacy_build_payload(quote_request: QuoteRequest) -> bytes:
+    """SicetacClient._build_payload plus the encode in _post_to_endpoint, before the template."""
+    variables = quote_request.variables or DEFAULT_VARIABLES
+    variable_string = ", ".join(variables)
+    document_lines = [
+        f"<PERIODO>'{quote_request.period}'</PERIODO>",
+        f"<CONFIGURACION>'{quote_request.configuration}'</CONFIGURACION>",
+        f"<ORIGEN>'{quote_request.origin}'</ORIGEN>",
+        f"<DESTINO>'{quote_request.destination}'</DESTINO>",
+    ]
+    document_section = "\n    ".join(document_lines)
+    inner_xml = f"""<?xml version='1.0' encoding='ISO-8859-1' ?>
+<root>
+  <acceso>
+    <username>{USERNAME}</username>
+    <password>{PASSWORD}</password>
+  </acceso>
+  <solicitud>
+    <tipo>2</tipo>
+    <procesoid>26</procesoid>
+  </solicitud>
+  <variables>
+    {variable_string}
+  </variables>
+  <documento>
+    {document_section}
+  </documento>
+</root>"""
+    escaped_xml = inner_xml.replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+    payload = f"""<?xml version="1.0" encoding="ISO-8859-1"?>
+<SOAP-ENV:Envelope
+    xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/"
+    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+  <SOAP-ENV:Body SOAP-ENV:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/">
+    <NS1:AtenderMensajeRNDC xmlns:NS1="urn:BPMServicesIntf-IBPMServices">
+      <Request xsi:type="xsd:string">{escaped_xml}</Request>
+    </NS1:AtenderMensajeRNDC>
+  </SOAP-ENV:Body>
+</SOAP-ENV:Envelope>"""
+    return payload.encode("iso-8859-1")
+
+
+def render(template: SoapPayloadTemplate, quote_request: QuoteRequest) -> bytes:
+    return template.render(
+        quote_request.period,
+        quote_request.configuration,
+        quote_request.origin,
+        quote_request.destination,
+        quote_request.variables,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per case (best is reported)")
+    args = parser.parse_args()
+
+    template = SoapPayloadTemplate(USERNAME, PASSWORD, DEFAULT_VARIABLES)
+    base = {"period": "202401", "configuration": "3S3", "origin": "11001000", "destination": "05001000"}
+    cases = [
+        ("default variables", QuoteRequest(**base)),
+        ("custom variables", QuoteRequest(**base, variables=["VALOR", "DISTANCIA"])),
+    ]
+
+    number = 20000
+    print(f"{'case':<22}{'legacy us':>12}{'template us':>14}{'speedup':>10}")
+    for name, quote_request in cases:
+        assert render(template, quote_request) == legacy_build_payload(quote_request), name
+        legacy = min(timeit.repeat(lambda: legacy_build_payload(quote_request), number=number, repeat=args.repeat))
+        fast = min(timeit.repeat(lambda: render(template, quote_request), number=number, repeat=args.repeat))
+        print(f"{name:<22}{legacy / number * 1e6:>12.2f}{fast / number * 1e6:>14.2f}{legacy / fast:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
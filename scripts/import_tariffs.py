@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Import a SiceTac master export (Excel or CSV from the RNDC portal) into the
+local tariff store.
+
+    python scripts/import_tariffs.py sicetac_202401.xlsx [--period 202401]
+    python scripts/import_tariffs.py sicetac_202401.csv --encoding latin-1
+
+Re-importing a period replaces its rows, so the command can be re-run safely.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import get_settings  # noqa: E402
+from app.services.tariff_import import import_tariffs  # noqa: E402
+from app.services.tariff_store import TariffStore  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", type=Path, help="export file (.xlsx or .csv)")
+    parser.add_argument("--period", help="yyyymm for exports without a PERIODO column")
+    parser.add_argument("--format", choices=("csv", "xlsx"), help="override detection by extension")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV encoding (default: utf-8-sig)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per executemany")
+    parser.add_argument("--database-url", help="tariff store URL (default: TARIFF_STORE_URL)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    store = TariffStore(args.database_url or get_settings().tariff_store_url)
+    try:
+        report = import_tariffs(
+            store,
+            args.path,
+            period=args.period,
+            file_format=args.format,
+            encoding=args.encoding,
+            batch_size=args.batch_size,
+        )
+    except (OSError, RuntimeError, ValueError) as exc:
+        print(f"Import failed: {exc}", file=sys.stderr)
+        return 1
+    print(json.dumps(asdict(report), indent=2, ensure_ascii=False))
+    return 0 if report.rows_imported else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import pytest
+
+from tests.sicetac_fakes import make_client
+
+
+@pytest.fixture
+async def sicetac_client():
+    """Factory for fake-upstream SicetacClients, closed after the test."""
+    clients = []
+
+    def factory(handler, **settings_overrides):
+        client = make_client(handler, **settings_overrides)
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        await client.transport.close()
@@ -0,0 +1,100 @@
+"""In-memory stand-in for the redis.asyncio client, counting round trips."""
+
+import asyncio
+import fnmatch
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value):
+        self.commands.append((key, None, value))
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        for key, ttl, value in self.commands:
+            self.redis.data[key] = value
+            self.redis.ttls[key] = ttl
+        return [True] * len(self.commands)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        for queues in self.redis.subscribers.values():
+            if self.queue in queues:
+                queues.remove(self.queue)
+
+
+class FakeRedis:
+    """One server; several clients (workers) may share it through ``data`` and channels."""
+
+    def __init__(self, data=None, subscribers=None, ttls=None):
+        self.data = {} if data is None else data
+        self.subscribers = {} if subscribers is None else subscribers
+        self.ttls = {} if ttls is None else ttls
+        self.round_trips = 0
+
+    def connection(self):
+        """Another client of the same server."""
+        return FakeRedis(self.data, self.subscribers, self.ttls)
+
+    async def publish(self, channel, message):
+        self.round_trips += 1
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(self.subscribers.get(channel, []))
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def aclose(self):
+        pass
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def set(self, key, value):
+        self.round_trips += 1
+        self.data[key] = value
+        self.ttls[key] = None
+
+    async def setex(self, key, ttl, value):
+        self.round_trips += 1
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, *keys):
+        self.round_trips += 1
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def unlink(self, *keys):
+        return await self.delete(*keys)
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
@@ -0,0 +1,82 @@
+"""Fake SICETAC responses and client factories shared by the tests."""
+
+import httpx
+
+from app.core.config import Settings
+from app.models.quotes import QuoteRequest
+from app.services.cache import CacheService, TariffCache
+from app.services.sicetac import SicetacClient
+from app.services.transport import SicetacTransport
+
+INNER_XML = """<?xml version='1.0' encoding='ISO-8859-1' ?>
+<root>
+  <documento>
+    <ruta>106</ruta>
+    <nombreunidadtransporte>TERMOKING</nombreunidadtransporte>
+    <nombretipocarga>Carga Refrigerada</nombretipocarga>
+    <nombreruta>BOGOTA _ MEDELLIN</nombreruta>
+    <valor>2693308.96</valor>
+    <valortonelada>79214.97</valortonelada>
+    <valorhora>55118</valorhora>
+    <distancia>416</distancia>
+  </documento>
+  <documento>
+    <ruta>106</ruta>
+    <nombreunidadtransporte>ESTACAS</nombreunidadtransporte>
+    <nombretipocarga>General</nombretipocarga>
+    <nombreruta>BOGOTA _ MEDELLIN</nombreruta>
+    <valor>2478949.67</valor>
+    <valortonelada>72910.28</valortonelada>
+    <valorhora>37926.89</valorhora>
+    <distancia>416</distancia>
+  </documento>
+</root>"""
+
+
+def soap_envelope(inner_xml: str = INNER_XML) -> str:
+    escaped = inner_xml.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return (
+        '<?xml version="1.0" encoding="ISO-8859-1"?>'
+        '<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/">'
+        "<SOAP-ENV:Body>"
+        '<NS1:AtenderMensajeRNDCResponse xmlns:NS1="urn:BPMServicesIntf-IBPMServices">'
+        f"<return>{escaped}</return>"
+        "</NS1:AtenderMensajeRNDCResponse>"
+        "</SOAP-ENV:Body>"
+        "</SOAP-ENV:Envelope>"
+    )
+
+
+def recording_handler(calls: list, inner_xml: str = INNER_XML):
+    """Upstream handler that records each request and answers with ``inner_xml``."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, text=soap_envelope(inner_xml))
+
+    return handler
+
+
+def make_request(**overrides) -> QuoteRequest:
+    fields = {
+        "period": "202401",
+        "configuration": "3S3",
+        "origin": "11001000",
+        "destination": "05001000",
+        "logistics_hours": 2,
+    }
+    fields.update(overrides)
+    return QuoteRequest(**fields)
+
+
+def make_client(handler, tariff_store=None, **settings_overrides) -> SicetacClient:
+    # Tests never touch the default on-disk store; pass one explicitly to use it.
+    settings_overrides.setdefault("TARIFF_STORE_ENABLED", False)
+    settings = Settings(**settings_overrides)
+    transport = SicetacTransport(settings, transport=httpx.MockTransport(handler))
+    return SicetacClient(
+        settings=settings,
+        transport=transport,
+        tariff_cache=TariffCache.from_settings(CacheService(), settings),
+        tariff_store=tariff_store,
+    )
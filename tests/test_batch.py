@@ -0,0 +1,138 @@
+import asyncio
+import csv
+import io
+
+import httpx
+
+from app.core.config import Settings
+from app.models.quotes import MatrixQuoteRequest
+from app.services.batch import get_matrix_rate_limiter, iter_batch
+from app.services.matrix import collect_columns, expand_matrix, iter_csv
+from tests.redis_fakes import FakeRedis
+from tests.sicetac_fakes import make_request, recording_handler, soap_envelope
+
+
+async def test_batch_dedupes_lanes_and_reports_errors_per_item(sicetac_client):
+    destinations = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = request.content.decode("iso-8859-1")
+        destinations.append(body)
+        if "76001000" in body:
+            return httpx.Response(200, text=soap_envelope("<root><ErrorMSG>Ruta no existe</ErrorMSG></root>"))
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler)
+    await client.fetch_quotes(make_request(destination="50001000"))
+    requests = [
+        make_request(),
+        make_request(unit_type="Estacas", logistics_hours=3),
+        make_request(destination="76001000"),
+        make_request(destination="50001000"),
+        make_request(unit_type="Trayler"),
+    ]
+
+    items = [item async for item in iter_batch(client, requests, concurrency=2)]
+
+    assert len(destinations) == 3  # warm-up lane + one call per missing lane
+    assert items[0].index == 3  # cache hit served before the misses
+    by_index = {item.index: item for item in items}
+    assert len(by_index[0].quotes) == 2
+    assert by_index[1].quotes[0].minimum_payable == 2478949.67 + 37926.89 * 3
+    assert by_index[2].error.status_code == 404
+    assert by_index[4].error.status_code == 404
+
+
+async def test_streaming_batch_pauses_upstream_for_slow_consumers(sicetac_client):
+    calls = []
+    client = sicetac_client(recording_handler(calls))
+    requests = [make_request(destination=f"{code}000") for code in range(10001, 10011)]
+    items = iter_batch(client, requests, concurrency=1, buffer_size=1)
+
+    first = await items.__anext__()
+    await asyncio.sleep(0.05)
+    assert first.quotes
+    assert len(calls) <= 3  # one consumed, one buffered, one blocked on put
+
+    remaining = [item async for item in items]
+    assert len(remaining) == 9
+    assert len(calls) == 10
+
+
+async def test_matrix_expands_cells_and_returns_columns(sicetac_client):
+    calls = []
+    client = sicetac_client(recording_handler(calls))
+    matrix = MatrixQuoteRequest(
+        period="202401",
+        origins=["11001000", "05001000"],
+        destinations=["05001000"],
+        configurations=["3s3", "2"],
+        unit_type="Estacas",
+    )
+    cells = expand_matrix(matrix)
+    assert [(cell.origin, cell.configuration) for cell in cells] == [("11001000", "3S3"), ("11001000", "2")]
+
+    columns, errors = await collect_columns(iter_batch(client, cells, concurrency=4))
+    assert len(calls) == 2
+    assert errors == []
+    assert sorted(columns["configuration"]) == ["2", "3S3"]
+    assert columns["unit_type"] == ["ESTACAS", "ESTACAS"]
+    assert all(len(values) == 2 for values in columns.values())
+
+
+async def test_batch_reports_upstream_timeouts_as_504(sicetac_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("upstream too slow", request=request)
+
+    client = sicetac_client(handler)
+    items = [item async for item in iter_batch(client, [make_request()], concurrency=1)]
+
+    assert items[0].error.status_code == 504
+    assert items[0].error.detail == "Sicetac request timed out"
+
+
+async def test_matrix_csv_keeps_failed_cells_as_error_rows(sicetac_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "76001000" in request.content.decode("iso-8859-1"):
+            return httpx.Response(200, text=soap_envelope("<root><ErrorMSG>Ruta no existe</ErrorMSG></root>"))
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler)
+    matrix = MatrixQuoteRequest(
+        period="202401",
+        origins=["11001000"],
+        destinations=["05001000", "76001000"],
+        configurations=["3S3"],
+        unit_type="Estacas",
+    )
+    chunks = [chunk async for chunk in iter_csv(iter_batch(client, expand_matrix(matrix), concurrency=2))]
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+    assert rows[0][-2:] == ["error_status", "error_detail"]
+    by_destination = {row[1]: row for row in rows[1:]}
+    assert by_destination["05001000"][5] == "ESTACAS"
+    assert by_destination["05001000"][-2:] == ["", ""]
+    assert by_destination["76001000"][-2:] == ["404", "Ruta no existe"]
+
+
+async def test_cached_lanes_of_a_batch_are_read_in_one_redis_round_trip(sicetac_client):
+    calls = []
+    client = sicetac_client(recording_handler(calls))
+    redis = client.tariff_cache.cache.redis_client = FakeRedis()
+    requests = [make_request(destination=f"{code}000") for code in range(10001, 10021)]
+    _ = [item async for item in iter_batch(client, requests, concurrency=4)]
+    assert len(calls) == 20
+
+    redis.round_trips = 0
+    items = [item async for item in iter_batch(client, requests + requests, concurrency=4)]
+    assert len(items) == 40 and all(item.quotes for item in items)
+    assert len(calls) == 20
+    assert redis.round_trips == 1
+
+
+def test_matrix_calls_share_one_rate_limiter_per_process():
+    settings = Settings(MATRIX_UPSTREAM_RATE_PER_SECOND=2)
+    limiter = get_matrix_rate_limiter(settings)
+    assert get_matrix_rate_limiter(settings) is limiter
+    assert limiter.rate == 2
+    assert get_matrix_rate_limiter(Settings()) is not limiter
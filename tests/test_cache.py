@@ -0,0 +1,74 @@
+import asyncio
+
+from app.services.cache import CacheService, QuoteCache, TariffCache
+from tests.redis_fakes import FakeRedis
+from tests.sicetac_fakes import make_request
+
+
+async def test_bulk_operations_use_one_redis_round_trip_per_chunk():
+    redis = FakeRedis()
+    cache = CacheService(redis)
+    await cache.set_many({f"lane:{i}": {"i": i} for i in range(600)}, ttl=60)
+    assert redis.round_trips == 2  # two pipelined chunks
+
+    redis.round_trips = 0
+    found = await cache.get_many([f"lane:{i}" for i in range(590, 610)])
+    assert found == {f"lane:{i}": {"i": i} for i in range(590, 600)}
+    assert redis.round_trips == 1
+    assert cache.cache_stats["redis_hits"] == 10
+    assert cache.cache_stats["misses"] == 10
+
+    redis.round_trips = 0
+    assert await cache.delete_many([f"lane:{i}" for i in range(600)]) == 600
+    assert redis.round_trips == 2
+    assert redis.data == {}
+    assert await cache.get_many(["lane:1"]) == {}
+
+
+async def test_set_quote_writes_both_keys_in_one_pipeline():
+    redis = FakeRedis()
+    await QuoteCache(CacheService(redis)).set_quote("11001000", "05001000", "3S3", "202401", {"distance": 416})
+
+    assert redis.round_trips == 1
+    assert redis.ttls == {"quote:11001000:05001000:3S3:202401": 300, "route:11001000:05001000": 3600}
+
+
+async def test_get_many_falls_back_to_memory_without_redis():
+    cache = CacheService()
+    await cache.set_many({"a": 1, "b": "two"}, ttl=60)
+    assert await cache.get_many(["a", "b", "c", "a"]) == {"a": 1, "b": "two"}
+    assert cache.cache_stats["memory_hits"] == 2
+
+
+async def test_clear_runs_redis_in_a_background_job_with_glob_semantics():
+    redis = FakeRedis()
+    cache = CacheService(redis)
+    route = {f"quote:11001000:05001000:{config}:202401": {"c": config} for config in ("2", "3S3")}
+    others = {"quote:11001000:050010009:3S3:202401": 1, "route:11001000:05001000": 2}
+    await cache.set_many({**route, **others}, ttl=60)
+
+    job = await QuoteCache(cache).invalidate_route("11001000", "05001000")
+    assert job.memory_deleted == 2
+    assert job.state == "running"
+    while job.state == "running":
+        await asyncio.sleep(0)
+
+    assert cache.get_clear_job(job.id) is job
+    assert (job.state, job.matched, job.deleted) == ("done", 2, 2)
+    assert sorted(redis.data) == sorted(others)
+    assert await cache.get_many(list(others)) == others
+    assert await cache.clear_pattern("route:*") == 2  # Redis and memory copies
+
+
+async def test_invalidate_period_drops_cached_lanes_of_that_period_only():
+    redis = FakeRedis()
+    tariffs = TariffCache(CacheService(redis))
+    january = make_request(period="202401")
+    february = make_request(period="202402")
+    await tariffs.set(january, [{"valor": 1}])
+    await tariffs.set(february, [{"valor": 2}])
+
+    await tariffs.invalidate_period("202401")
+
+    assert await tariffs.peek(january) is None
+    assert (await tariffs.peek(february))["documents"] == [{"valor": 2}]
@@ -0,0 +1,108 @@
+import asyncio
+
+from app.services.concurrency import BACKGROUND, BATCH, INTERACTIVE, AdaptiveLimiter, Ticket
+
+
+async def test_interactive_calls_get_freed_slots_before_queued_batch_work():
+    limiter = AdaptiveLimiter(initial_limit=4, max_limit=4)
+    for _ in range(4):
+        await limiter.acquire(INTERACTIVE)
+
+    order = []
+
+    async def call(priority):
+        await limiter.acquire(priority)
+        order.append(priority)
+
+    waiting = [asyncio.create_task(call(lane)) for lane in (BACKGROUND, BATCH, INTERACTIVE)]
+    await asyncio.sleep(0)
+    assert limiter.get_stats()["queued"] == {INTERACTIVE: 1, BATCH: 1, BACKGROUND: 1}
+
+    limiter.release(INTERACTIVE)
+    await asyncio.sleep(0)
+    assert order == [INTERACTIVE]
+
+    # Batch (3 of 4 slots) and background (2 of 4) only start once enough
+    # slots are free to leave headroom for interactive traffic.
+    limiter.release(INTERACTIVE)
+    await asyncio.sleep(0)
+    assert order == [INTERACTIVE]
+    limiter.release(INTERACTIVE)
+    await asyncio.sleep(0)
+    assert order == [INTERACTIVE, BATCH]
+    limiter.release(INTERACTIVE)
+    await asyncio.sleep(0)
+    assert order == [INTERACTIVE, BATCH]
+    limiter.release(BATCH)
+    await asyncio.wait_for(asyncio.gather(*waiting), timeout=1)
+    assert order == [INTERACTIVE, BATCH, BACKGROUND]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_limit_backs_off_on_timeouts_and_slow_responses_then_recovers():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=8, min_limit=1, max_limit=10, clock=clock)
+
+    await limiter.acquire()
+    limiter.release(INTERACTIVE, dropped=True)
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        await limiter.acquire()
+    for _ in range(4):
+        limiter.release(INTERACTIVE, latency=0.1)
+    assert limiter.limit > 4
+
+    for _ in range(20):
+        clock.now += 1
+        await limiter.acquire()
+        limiter.release(INTERACTIVE, latency=5.0)
+    assert limiter.limit < 4
+    assert limiter.get_stats()["decreases"] >= 2
+
+
+async def test_burst_of_timeouts_before_any_sample_cuts_once():
+    clock = FakeClock()
+    limiter = AdaptiveLimiter(initial_limit=16, max_limit=16, decrease_interval=5.0, clock=clock)
+    for _ in range(3):
+        await limiter.acquire()
+    for _ in range(3):
+        limiter.release(INTERACTIVE, dropped=True)
+    assert limiter.limit == 8
+
+    clock.now += 5
+    await limiter.acquire()
+    limiter.release(INTERACTIVE, dropped=True)
+    assert limiter.limit == 4
+
+
+async def test_promoted_ticket_moves_ahead_of_batch_work():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    batch_ticket = Ticket(BATCH)
+    granted = []
+
+    async def call(ticket):
+        granted.append(await limiter.acquire(ticket))
+
+    waiting = [asyncio.create_task(call(Ticket(BATCH))), asyncio.create_task(call(batch_ticket))]
+    await asyncio.sleep(0)
+    limiter.promote(batch_ticket, INTERACTIVE)
+    assert limiter.get_stats()["queued"] == {INTERACTIVE: 1, BATCH: 1, BACKGROUND: 0}
+
+    limiter.release(INTERACTIVE)
+    await asyncio.sleep(0)
+    assert granted == [INTERACTIVE]
+    assert batch_ticket.priority == INTERACTIVE
+    limiter.release(INTERACTIVE)
+    limiter.release(INTERACTIVE)
+    await asyncio.wait_for(asyncio.gather(*waiting), timeout=1)
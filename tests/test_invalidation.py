@@ -0,0 +1,49 @@
+import asyncio
+
+from app.services.cache import CacheService
+from app.services.invalidation import InvalidationBus
+from tests.redis_fakes import FakeRedis
+
+
+def make_worker(redis):
+    cache = CacheService(redis)
+    bus = InvalidationBus(redis)
+    cache.attach_invalidations(bus)
+    bus.start()
+    return cache
+
+
+async def test_deletes_reach_the_memory_tier_of_every_worker():
+    server = FakeRedis()
+    first, second = make_worker(server.connection()), make_worker(server.connection())
+    await asyncio.sleep(0)  # let both listeners subscribe
+
+    # The second worker wrote these, so its memory tier holds copies too.
+    await second.set("quote:11001000:05001000:3S3:202401", {"value": 1}, ttl=300)
+    await second.set("route:11001000:05001000", {"distance": 416}, ttl=300)
+
+    await first.clear_pattern("quote:11001000:05001000:*")
+    await first.delete("route:11001000:05001000")
+    await asyncio.sleep(0)
+
+    for worker in (first, second):
+        assert await worker.get("quote:11001000:05001000:3S3:202401") is None
+        assert await worker.get("route:11001000:05001000") is None
+    assert "quote:11001000:05001000:3S3:202401" not in second.memory_cache
+    assert second.invalidations.get_stats()["received"] == 2
+
+    await first.disconnect()
+    await second.disconnect()
+
+
+async def test_without_redis_the_bus_reaches_caches_in_the_same_process():
+    bus = InvalidationBus()
+    first, second = CacheService(), CacheService()
+    first.attach_invalidations(bus)
+    second.attach_invalidations(bus)
+    await first.set("lane", 1, ttl=60)
+    await second.set("lane", 1, ttl=60)
+
+    await first.delete_many(["lane"])
+    assert await second.get("lane") is None
+    assert bus.get_stats()["published"] == 1
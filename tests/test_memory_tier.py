@@ -0,0 +1,63 @@
+import time
+
+from app.services.memory_tier import MemoryTier
+
+
+def test_least_recently_used_entries_are_evicted_by_count_and_bytes():
+    tier = MemoryTier(max_entries=3, max_bytes=100)
+    for key in "abc":
+        tier.set(key, key.upper(), ttl=None, size=10)
+    assert tier.get("a") == "A"  # "b" is now the least recently used
+
+    tier.set("d", "D", ttl=None, size=10)
+    assert list(tier) == ["c", "a", "d"]
+
+    tier.set("big", "BIG", ttl=None, size=85)
+    assert list(tier) == ["d", "big"]
+    assert tier.bytes == 95
+    assert tier.stats["evictions"] == 3
+
+    tier.set("huge", "HUGE", ttl=None, size=101)
+    assert "huge" not in tier
+    assert tier.bytes == 95
+
+
+def test_expired_entries_are_dropped_on_read_and_swept_on_write(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    tier = MemoryTier(max_entries=100, max_bytes=10000, sweep_batch=2)
+    tier.set("short", 1, ttl=5, size=1)
+    tier.set("also-short", 2, ttl=5, size=1)
+    tier.set("forever", 3, ttl=None, size=1)
+
+    now[0] += 10
+    assert tier.get("short") is None
+    assert "also-short" in tier  # not read yet
+
+    tier.set("new", 4, ttl=60, size=1)
+    assert list(tier) == ["forever", "new"]
+    assert tier.stats["expirations"] == 2
+    assert tier.bytes == 2
+
+
+def test_glob_patterns_match_like_redis_using_the_prefix_index():
+    tier = MemoryTier()
+    keys = [
+        "quote:11001000:05001000:3S3:202401",
+        "quote:11001000:05001000:2:202402",
+        "quote:11001000:050010009:3S3:202401",
+        "route:11001000:05001000",
+        "tariff:202401:3S3:11001000:05001000",
+    ]
+    for key in keys:
+        tier.set(key, 1, ttl=None, size=1)
+
+    assert sorted(tier.keys_matching("quote:11001000:05001000:*")) == keys[:2][::-1]
+    assert tier.keys_matching("quote:11001000:05001000:?S3:*") == [keys[0]]
+    assert tier.keys_matching("route:11001000:05001000") == [keys[3]]
+    assert tier.keys_matching("QUOTE:*") == []
+    assert sorted(tier.keys_matching("*:05001000*")) == sorted(keys)
+
+    tier.delete(keys[0])
+    tier.set(keys[1], 2, ttl=None, size=1)
+    assert tier.keys_matching("quote:11001000:05001000:*") == [keys[1]]
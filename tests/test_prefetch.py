@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base, QuotationDB
+from app.services.prefetch import PeriodPrefetcher
+from app.services.warming import top_lanes_from_history
+from app.utils.periods import BOGOTA_TZ, seconds_until_next_period
+from tests.sicetac_fakes import recording_handler, soap_envelope
+
+LANES = [("3S3", "11001000", "05001000"), ("2", "11001000", "76001000"), ("2", "bad", "05001000")]
+
+
+async def test_prefetch_loads_lanes_and_resumes_without_refetching(sicetac_client):
+    calls = []
+    client = sicetac_client(recording_handler(calls))
+    prefetcher = PeriodPrefetcher(client, lambda limit, days: LANES[:limit], top_lanes=2, concurrency=2)
+
+    progress = await prefetcher.run("202402")
+    assert (progress.state, progress.total, progress.fetched) == ("done", 2, 2)
+    assert len(calls) == 2
+
+    # A restarted run only reaches SICETAC for lanes that are still missing.
+    prefetcher.top_lanes = 3
+    progress = await prefetcher.run("202402")
+    assert (progress.completed, progress.fresh, progress.fetched, progress.failed) == (3, 2, 0, 1)
+    assert len(calls) == 2
+    assert prefetcher.get_status()["period"] == "202402"
+
+
+async def test_prefetch_counts_lanes_without_tariffs(sicetac_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "76001000" in request.content.decode("iso-8859-1"):
+            return httpx.Response(200, text=soap_envelope("<root><ErrorMSG>Ruta no existe</ErrorMSG></root>"))
+        return httpx.Response(200, text=soap_envelope())
+
+    prefetcher = PeriodPrefetcher(sicetac_client(handler), lambda limit, days: LANES[:2])
+    progress = await prefetcher.run("202402")
+
+    assert (progress.fetched, progress.no_tariff, progress.failed) == (1, 1, 0)
+
+
+def test_top_lanes_rank_recent_history_by_frequency(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'quotations.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as session:
+        for origin, count, created_at in [
+            ("11001000", 1, datetime.utcnow()),
+            ("05001000", 3, datetime.utcnow()),
+            ("76001000", 5, datetime(2000, 1, 1)),
+        ]:
+            for _ in range(count):
+                session.add(QuotationDB(
+                    period="202401", configuration="3S3", origin_code=origin,
+                    destination_code="68001000", quotes_data={}, created_at=created_at,
+                ))
+        session.commit()
+
+    lanes = top_lanes_from_history(10, 90, session_factory=session_factory)
+
+    assert lanes == [("3S3", "05001000", "68001000"), ("3S3", "11001000", "68001000")]
+
+
+def test_seconds_until_next_period_crosses_year_end():
+    now = datetime(2024, 12, 31, 23, 0, tzinfo=BOGOTA_TZ)
+    assert seconds_until_next_period(now) == 3600
@@ -0,0 +1,53 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.pricing import minimum_payable, price_documents, select_documents
+from tests.sicetac_fakes import make_request
+
+DOCUMENTS = [
+    {
+        "ruta": "106",
+        "nombreruta": "BOGOTA _ MEDELLIN",
+        "nombreunidadtransporte": "TERMOKING",
+        "nombretipocarga": "Carga Refrigerada",
+        "valor": 2693308.96,
+        "valortonelada": 79214.97,
+        "valorhora": 55118.0,
+        "distancia": 416.0,
+    },
+    {
+        "ruta": "106",
+        "nombreruta": "BOGOTA _ MEDELLIN",
+        "nombreunidadtransporte": "Estacas",
+        "nombretipocarga": "General",
+        "valor": 2478949.67,
+        "valortonelada": 72910.28,
+        "valorhora": None,
+        "distancia": 416.0,
+    },
+]
+
+
+def test_minimum_payable_adds_logistics_hours():
+    assert minimum_payable(DOCUMENTS[0], 2) == 2693308.96 + 55118 * 2
+    assert minimum_payable(DOCUMENTS[0], 0) == 2693308.96
+
+
+def test_minimum_payable_without_hour_value():
+    assert minimum_payable(DOCUMENTS[1], 4) == 2478949.67
+
+
+def test_select_documents_without_filters_keeps_all():
+    assert select_documents(DOCUMENTS) == DOCUMENTS
+
+
+def test_select_documents_matches_case_insensitively():
+    assert select_documents(DOCUMENTS, unit_type="ESTACAS") == [DOCUMENTS[1]]
+    assert select_documents(DOCUMENTS, cargo_type="CARGA REFRIGERADA") == [DOCUMENTS[0]]
+    assert select_documents(DOCUMENTS, unit_type="ESTACAS", cargo_type="CARGA REFRIGERADA") == []
+
+
+def test_price_documents_without_match():
+    with pytest.raises(HTTPException) as exc_info:
+        price_documents(DOCUMENTS, make_request(unit_type="Trayler"))
+    assert exc_info.value.status_code == 404
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services.deadlines import Deadline, deadline_from_headers
+from app.services.retry import RetryBudget, is_retryable
+from tests.sicetac_fakes import make_request, soap_envelope
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_retry_budget_allows_a_fraction_of_recent_calls():
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.1, min_retries=0, window_seconds=10, clock=clock)
+    for _ in range(20):
+        budget.record_call()
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    clock.now += 11
+    budget.record_call()
+    assert not budget.try_spend()
+    assert budget.get_stats()["denied_retries"] == 2
+
+
+def test_only_transport_and_gateway_errors_are_retryable():
+    request = httpx.Request("POST", "http://sicetac.test")
+    assert is_retryable(httpx.ReadTimeout("slow", request=request))
+    assert is_retryable(httpx.ConnectError("refused", request=request))
+    assert not is_retryable(httpx.PoolTimeout("local pool", request=request))
+    bad_gateway = httpx.Response(502, request=request)
+    assert is_retryable(httpx.HTTPStatusError("502", request=request, response=bad_gateway))
+    bad_request = httpx.Response(400, request=request)
+    assert not is_retryable(httpx.HTTPStatusError("400", request=request, response=bad_request))
+    assert not is_retryable(HTTPException(status_code=404, detail="Ruta no existe"))
+
+
+def test_deadline_header_is_capped_and_falls_back_to_default():
+    assert 9 < deadline_from_headers({"X-Request-Timeout": "10"}, 25, 60).remaining() <= 10
+    assert 59 < deadline_from_headers({"X-Request-Timeout": "600"}, 25, 60).remaining() <= 60
+    assert 24 < deadline_from_headers({"X-Request-Timeout": "soon"}, 25, 60).remaining() <= 25
+    assert 24 < deadline_from_headers({}, 25, 60).remaining() <= 25
+
+
+async def test_gateway_errors_are_retried_but_business_errors_are_not(sicetac_client):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if "76001000" in request.content.decode("iso-8859-1"):
+            return httpx.Response(200, text=soap_envelope("<root><ErrorMSG>Ruta no existe</ErrorMSG></root>"))
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler, SICETAC_RETRY_BASE_DELAY_SECONDS=0.01)
+    quotes = await client.fetch_quotes(make_request())
+    assert quotes and len(calls) == 3
+    assert client.retry_budget.get_stats()["total_retries"] == 2
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.fetch_quotes(make_request(destination="76001000"))
+    assert exc_info.value.status_code == 404
+    assert len(calls) == 4
+
+
+async def test_deadline_bounds_the_whole_lookup(sicetac_client):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(5)
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler)
+    started = time.monotonic()
+    with pytest.raises(HTTPException) as exc_info:
+        await client.fetch_quotes(make_request(), deadline=Deadline.after(0.2))
+
+    assert exc_info.value.status_code == 504
+    assert time.monotonic() - started < 1
+    assert len(calls) == 1
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from app.models.quotes import QuoteResult
+from app.services.serialization import MAGIC, Serializer
+
+DOCUMENTS = [
+    {"ruta": "106", "nombreunidadtransporte": unit, "valor": 2478949.67 + i, "valorhora": 37926.89, "distancia": 416}
+    for i, unit in enumerate(["ESTACAS", "TERMOKING", "FURGON", "TANQUE"] * 10)
+]
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_tariff_entries_round_trip_smaller_than_json(compression):
+    serializer = Serializer(codec="msgpack", compression=compression, compress_min_bytes=256)
+    entry = {"documents": DOCUMENTS, "fetched_at": 1700000000.5, "fresh_until": None}
+
+    data = serializer.dumps(entry)
+    assert data.startswith(MAGIC)
+    assert data[5:6] == b"d"
+    assert serializer.loads(data) == entry
+    assert len(data) < len(json.dumps(entry)) * (0.6 if compression == "none" else 0.2)
+
+
+def test_json_codec_keeps_record_lists_as_they_are():
+    serializer = Serializer(codec="json", compression="none")
+    entry = {"documents": DOCUMENTS, "fetched_at": 1700000000.5}
+
+    data = serializer.dumps(entry)
+    assert data[5:6] == b"v"
+    assert serializer.loads(data) == entry
+
+
+def test_quote_results_use_the_schema_fast_path():
+    serializer = Serializer(codec="json", compression="none")
+    quotes = [
+        QuoteResult(unit_type="ESTACAS", mobilization_value=2478949.67, hour_value=37926.89, minimum_payable=2554803.45),
+        QuoteResult(unit_type="TERMOKING", mobilization_value=2693308.96, minimum_payable=2693308.96),
+    ]
+    data = serializer.dumps(quotes)
+    assert b"mobilization_value" not in data
+    assert serializer.loads(data) == quotes
+
+
+def test_small_values_stay_uncompressed_and_legacy_json_still_loads():
+    serializer = Serializer(codec="json", compression="zlib", compress_min_bytes=1024)
+    for value in ["plain text", {"a": [1, 2]}, [{"x": 1}], 42, None]:
+        data = serializer.dumps(value)
+        assert data[4:5] == b"-"
+        assert serializer.loads(data) == value
+
+    assert serializer.loads(b'{"distance": 416, "active": true}') == {"distance": 416, "active": True}
+    assert serializer.loads("not json") == "not json"
+
+
+def test_optional_codecs_read_each_others_entries():
+    zstandard = pytest.importorskip("zstandard")
+    assert zstandard
+    writer = Serializer(codec="json", compression="zstd", compress_min_bytes=0)
+    reader = Serializer(codec="json", compression="none")
+    assert reader.loads(writer.dumps({"documents": DOCUMENTS})) == {"documents": DOCUMENTS}
@@ -0,0 +1,87 @@
+import multiprocessing
+
+from app.services.cache import CacheService, TariffCache
+from app.services.invalidation import InvalidationBus
+from app.services.serialization import Serializer
+from app.services.shared_tariffs import SharedTariffFile
+from tests.sicetac_fakes import make_request
+
+DOCUMENTS = [{"ruta": "106", "valor": 2478949.67, "nombreunidadtransporte": unit} for unit in ("ESTACAS", "FURGON")]
+
+
+def _write_from_another_process(path: str) -> None:
+    SharedTariffFile(path, max_bytes=1 << 20).put("tariff:other", {"documents": DOCUMENTS}, ttl=None)
+
+
+def test_entries_written_by_one_process_are_read_by_another(tmp_path):
+    path = str(tmp_path / "tariffs.shm")
+    reader = SharedTariffFile(path, max_bytes=1 << 20)
+    assert reader.get("tariff:other") is None
+
+    process = multiprocessing.get_context("spawn").Process(target=_write_from_another_process, args=(path,))
+    process.start()
+    process.join(timeout=30)
+    assert process.exitcode == 0
+
+    assert reader.get("tariff:other") == {"documents": DOCUMENTS}
+
+
+def test_latest_record_wins_and_a_full_file_is_compacted(tmp_path):
+    path = str(tmp_path / "tariffs.shm")
+    serializer = Serializer(codec="json", compression="none")
+    writer = SharedTariffFile(path, max_bytes=1 << 20, serializer=serializer)
+    reader = SharedTariffFile(path, max_bytes=1 << 20, serializer=serializer)
+
+    value = {"documents": DOCUMENTS, "padding": "x" * 20000}
+    for version in range(80):
+        assert writer.put("tariff:lane", {**value, "version": version}, ttl=None)
+    writer.put("tariff:expired", value, ttl=-1)
+
+    assert writer.stats["compactions"] >= 1
+    assert reader.get("tariff:lane")["version"] == 79
+    assert reader.get("tariff:expired") is None
+    assert writer.get_stats()["used_bytes"] < 1 << 20
+
+    assert reader.delete_matching("tariff:*") == 1
+    assert writer.get("tariff:lane") is None
+
+
+async def test_tariff_cache_keeps_shared_entries_out_of_worker_memory(tmp_path):
+    shared = SharedTariffFile(str(tmp_path / "tariffs.shm"), max_bytes=1 << 20)
+    first = TariffCache(CacheService(), shared=shared)
+    second = TariffCache(CacheService(), shared=SharedTariffFile(shared.path, max_bytes=1 << 20))
+    request = make_request()
+
+    await first.set(request, DOCUMENTS, fetched_at=1700000000.0)
+    assert len(first.cache.memory_cache) == 0
+    entry = await second.get(request)
+    assert entry["documents"] == DOCUMENTS
+    assert second.get_stats()["shared"]["hits"] == 1
+
+
+def test_capacity_follows_the_mapped_file_when_max_bytes_grows(tmp_path):
+    path = str(tmp_path / "tariffs.shm")
+    SharedTariffFile(path, max_bytes=1 << 20).close()
+    grown = SharedTariffFile(path, max_bytes=4 << 20, serializer=Serializer(codec="json", compression="none"))
+
+    value = {"padding": "x" * 100000}
+    for version in range(20):
+        assert grown.put("tariff:lane", {**value, "version": version}, ttl=None)
+
+    assert grown.stats["compactions"] >= 1
+    assert grown.get("tariff:lane")["version"] == 19
+    assert grown.get_stats()["file_bytes"] == 4 << 20
+
+
+async def test_pattern_clears_from_other_hosts_reach_the_shared_file(tmp_path):
+    bus = InvalidationBus()
+    other_host, this_host = CacheService(), CacheService()
+    other_host.attach_invalidations(bus)
+    this_host.attach_invalidations(bus)
+    tariffs = TariffCache(this_host, shared=SharedTariffFile(str(tmp_path / "tariffs.shm"), max_bytes=1 << 20))
+    request = make_request()
+    await tariffs.set(request, DOCUMENTS)
+
+    await other_host.clear_pattern("tariff:202401:*")
+
+    assert tariffs.shared.get(tariffs._key(request)) is None
@@ -0,0 +1,262 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services.concurrency import BACKGROUND, BATCH, INTERACTIVE
+from app.utils.periods import current_period
+from tests.sicetac_fakes import make_request, soap_envelope
+
+
+async def test_fetch_quotes_reuses_shared_transport(sicetac_client):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler)
+    first = await client.fetch_quotes(make_request())
+    second = await client.fetch_quotes(make_request(destination="76001000", logistics_hours=0))
+
+    assert len(calls) == 2
+    assert first[0].minimum_payable == 2693308.96 + 55118 * 2
+    assert second[1].minimum_payable == 2478949.67
+
+    stats = client.transport.get_stats()
+    assert stats["requests"] == 2
+    assert stats["in_use"] == 0
+
+
+async def test_slow_primary_is_hedged_to_second_mirror(sicetac_client):
+    endpoints = "http://slow.test/ws/rndcService,http://fast.test/ws/rndcService"
+    hosts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        if request.url.host == "slow.test":
+            await asyncio.sleep(5)
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(
+        handler,
+        SICETAC_ENDPOINTS=endpoints,
+        SICETAC_HEDGE_DELAY_SECONDS=0.05,
+    )
+    quotes = await asyncio.wait_for(client.fetch_quotes(make_request()), timeout=1)
+
+    assert len(quotes) == 2
+    assert hosts == ["slow.test", "fast.test"]
+    stats = client.mirrors.get_stats()
+    assert stats["hedged_requests"] == 1
+    assert stats["mirrors"]["http://fast.test/ws/rndcService"]["hedge_wins"] == 1
+    assert client.mirrors.ordered()[0] == "http://fast.test/ws/rndcService"
+
+
+async def test_primary_that_turns_slow_is_demoted_after_losing_hedges(sicetac_client):
+    slow_host = "http://a.test/ws/rndcService"
+    fast_host = "http://b.test/ws/rndcService"
+    a_delay = 0.0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "a.test":
+            await asyncio.sleep(a_delay)
+        else:
+            await asyncio.sleep(0.01)
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(
+        handler,
+        SICETAC_ENDPOINTS=f"{slow_host},{fast_host}",
+        SICETAC_HEDGE_DELAY_SECONDS=0.03,
+    )
+    await client.fetch_quotes(make_request(destination="76001000"))
+    assert client.mirrors.ordered()[0] == slow_host
+
+    a_delay = 1.0
+    for destination in ("05001000", "08001000", "13001000"):
+        await asyncio.wait_for(client.fetch_quotes(make_request(destination=destination)), timeout=1)
+        await asyncio.sleep(0)
+
+    assert client.mirrors.ordered()[0] == fast_host
+
+
+async def test_identical_concurrent_queries_share_one_upstream_call(sicetac_client):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler)
+    results = await asyncio.gather(
+        *(client.fetch_quotes(make_request(logistics_hours=hours)) for hours in range(5))
+    )
+
+    assert len(calls) == 1
+    assert [quotes[0].minimum_payable for quotes in results] == [
+        2693308.96 + 55118 * hours for hours in range(5)
+    ]
+    assert client.coalescer.get_stats()["leader_calls"] == 1
+    assert client.coalescer.get_stats()["coalesced_calls"] == 4
+
+
+async def test_tariff_cache_serves_repeats_and_caches_missing_lanes(sicetac_client):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(200, text=soap_envelope())
+        return httpx.Response(200, text=soap_envelope("<root><ErrorMSG>Ruta no existe</ErrorMSG></root>"))
+
+    client = sicetac_client(handler)
+    first = await client.fetch_quotes(make_request())
+    again = await client.fetch_quotes(make_request())
+    assert again == first
+    assert len(calls) == 1
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await client.fetch_quotes(make_request(destination="76001000"))
+        assert exc_info.value.status_code == 404
+    assert len(calls) == 2
+
+    assert client.tariff_cache.ttl_for("202401") is None
+    assert client.tariff_cache.ttl_for("999912") == client.settings.tariff_cache_current_ttl_seconds
+
+
+async def test_one_unfiltered_call_serves_every_filter_and_hours_value(sicetac_client):
+    payloads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(request.content.decode("iso-8859-1"))
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler)
+    any_unit = await client.fetch_quotes(make_request())
+    estacas = await client.fetch_quotes(make_request(unit_type="Estacas", logistics_hours=4))
+    refrigerated = await client.fetch_quotes(make_request(cargo_type="Carga Refrigerada"))
+
+    assert len(payloads) == 1
+    assert "NOMBREUNIDADTRANSPORTE&gt;'" not in payloads[0]
+    assert len(any_unit) == 2
+    assert [quote.unit_type for quote in estacas] == ["ESTACAS"]
+    assert estacas[0].minimum_payable == 2478949.67 + 37926.89 * 4
+    assert [quote.unit_type for quote in refrigerated] == ["TERMOKING"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.fetch_quotes(make_request(unit_type="Trayler"))
+    assert exc_info.value.status_code == 404
+    assert len(payloads) == 1
+
+
+async def test_breaker_opens_on_upstream_failures_and_serves_last_known_tariffs(sicetac_client):
+    calls = []
+    healthy = True
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if healthy:
+            return httpx.Response(200, text=soap_envelope())
+        return httpx.Response(503)
+
+    client = sicetac_client(
+        handler,
+        SICETAC_BREAKER_MIN_CALLS=3,
+        SICETAC_BREAKER_OPEN_SECONDS=0.2,
+        SICETAC_RETRY_BASE_DELAY_SECONDS=0.01,
+        TARIFF_CACHE_CURRENT_TTL_SECONDS=1,
+        TARIFF_CACHE_REVALIDATE_SECONDS=0,
+    )
+    known = make_request(period=current_period())
+    await client.fetch_quotes(known)
+    await asyncio.sleep(1.05)  # past its TTL, still kept as last known data
+
+    healthy = False
+    response = await client.quote(known)
+    assert response.stale is True
+    assert response.data_as_of is not None
+    assert len(response.quotes) == 2
+    assert len(calls) == 3  # success + two failures: error rate over the threshold
+    assert client.breaker.get_stats()["state"] == "open"
+
+    unknown = make_request(period=current_period(), destination="76001000")
+    with pytest.raises(HTTPException) as exc_info:
+        await client.fetch_quotes(unknown)
+    assert exc_info.value.status_code == 503
+    assert "Retry-After" in exc_info.value.headers
+    assert len(calls) == 3
+
+    # Half-open: a failing probe reopens the circuit...
+    await asyncio.sleep(0.25)
+    with pytest.raises(HTTPException):
+        await client.fetch_quotes(unknown)
+    assert len(calls) == 4
+    assert client.breaker.get_stats()["state"] == "open"
+
+    # ...and a successful one closes it.
+    await asyncio.sleep(0.25)
+    healthy = True
+    assert await client.fetch_quotes(unknown)
+    assert len(calls) == 5
+    assert client.breaker.get_stats()["state"] == "closed"
+
+
+async def test_local_pool_timeouts_do_not_trip_the_breaker(sicetac_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.PoolTimeout("no free connection", request=request)
+
+    client = sicetac_client(handler, SICETAC_BREAKER_MIN_CALLS=1)
+    with pytest.raises(httpx.PoolTimeout):
+        await client.fetch_quotes(make_request())
+
+    assert client.breaker.get_stats()["state"] == "closed"
+    assert client.limiter.get_stats()["decreases"] == 0
+
+
+async def test_interactive_caller_promotes_coalesced_batch_lookup(sicetac_client):
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200, text=soap_envelope())
+
+    client = sicetac_client(handler, SICETAC_LIMIT_INITIAL=1, SICETAC_LIMIT_MAX=1)
+    running = asyncio.create_task(client.fetch_quotes(make_request(destination="76001000")))
+    await asyncio.sleep(0.01)
+    batch = asyncio.create_task(client.fetch_quotes(make_request(), priority=BATCH))
+    await asyncio.sleep(0.01)
+    assert client.limiter.get_stats()["queued"][BATCH] == 1
+
+    interactive = asyncio.create_task(client.fetch_quotes(make_request(logistics_hours=0)))
+    await asyncio.sleep(0.01)
+    assert client.limiter.get_stats()["queued"] == {INTERACTIVE: 1, BATCH: 0, BACKGROUND: 0}
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(running, batch, interactive), timeout=1)
+    assert client.limiter.get_stats()["granted"][BATCH] == 0
+
+
+async def test_expired_lane_is_served_while_one_background_call_refreshes_it(sicetac_client):
+    calls = []
+    client = sicetac_client(lambda request: calls.append(request) or httpx.Response(200, text=soap_envelope()))
+    request = make_request(period=current_period())
+    ttl = client.tariff_cache.current_ttl
+    await client.tariff_cache.set(
+        client._lane_request(request), [{"valor": "1", "valorhora": "0"}], fetched_at=time.time() - ttl - 60
+    )
+
+    first, second = await asyncio.gather(client.fetch_lane(request), client.fetch_lane(request))
+    assert first.documents == second.documents == [{"valor": "1", "valorhora": "0"}]
+
+    while client.coalescer.in_flight:
+        await asyncio.sleep(0)
+    assert len(calls) == 1
+    assert client.tariff_cache.stats["revalidations"] == 2
+    refreshed = await client.fetch_lane(request)
+    assert len(refreshed.documents) == 2
+    assert len(calls) == 1
@@ -0,0 +1,45 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.soap_parser import parse_documents
+from tests.sicetac_fakes import INNER_XML, soap_envelope
+
+
+def test_parses_documents_from_escaped_return():
+    documents = parse_documents(soap_envelope())
+
+    assert [document["nombreunidadtransporte"] for document in documents] == ["TERMOKING", "ESTACAS"]
+    assert documents[1]["valor"] == 2478949.67
+    assert documents[1]["valorhora"] == 37926.89
+
+
+def test_parses_cdata_and_character_references():
+    cdata = soap_envelope().replace("<return>", "<return><![CDATA[").replace("</return>", "]]></return>")
+    cdata = cdata.replace("&lt;", "<").replace("&gt;", ">")
+    assert len(parse_documents(cdata)) == 2
+
+    referenced = soap_envelope(INNER_XML.replace("ESTACAS", "ESTACAS &#211;N"))
+    assert parse_documents(referenced)[1]["nombreunidadtransporte"] == "ESTACAS ÓN"
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        soap_envelope().replace("?>", '?><!DOCTYPE r [<!ENTITY a "aa">]>', 1),
+        soap_envelope('<!DOCTYPE root [<!ENTITY a "aaaa">]><root><documento><valor>&a;</valor></documento></root>'),
+    ],
+)
+def test_rejects_document_type_declarations(payload):
+    with pytest.raises(HTTPException) as exc_info:
+        parse_documents(payload)
+    assert exc_info.value.status_code == 502
+
+
+def test_maps_sicetac_errors_and_empty_returns():
+    with pytest.raises(HTTPException) as exc_info:
+        parse_documents(soap_envelope("<root><ErrorMSG>Ruta no existe</ErrorMSG></root>"))
+    assert (exc_info.value.status_code, exc_info.value.detail) == (404, "Ruta no existe")
+
+    with pytest.raises(HTTPException) as exc_info:
+        parse_documents(soap_envelope().replace("<return>", "<return/><x>").replace("</return>", "</x>"))
+    assert exc_info.value.status_code == 502
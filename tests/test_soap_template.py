@@ -0,0 +1,39 @@
+from xml.etree import ElementTree as ET
+
+from app.services.soap_template import SoapPayloadTemplate
+
+VARIABLES = ["RUTA", "VALOR"]
+
+
+def _inner_root(payload: bytes) -> ET.Element:
+    envelope = ET.fromstring(payload)
+    request = next(element for element in envelope.iter() if element.tag == "Request")
+    return ET.fromstring(request.text)
+
+
+def test_render_round_trips_values_that_need_escaping():
+    template = SoapPayloadTemplate('us&r "x"', "p<a>ss&amp;ñ€", VARIABLES)
+
+    payload = template.render("202401", "3S3", "11001000", "05001000")
+    assert isinstance(payload, bytes)
+    assert payload.startswith(b'<?xml version="1.0" encoding="ISO-8859-1"?>')
+
+    root = _inner_root(payload)
+    assert root.findtext("acceso/username") == 'us&r "x"'
+    assert root.findtext("acceso/password") == "p<a>ss&amp;ñ€"
+    assert root.findtext("variables").strip() == "RUTA, VALOR"
+    assert root.findtext("documento/PERIODO") == "'202401'"
+    assert root.findtext("documento/DESTINO") == "'05001000'"
+
+
+def test_render_uses_custom_variables_and_cached_values():
+    template = SoapPayloadTemplate("user", "secret", VARIABLES)
+
+    first = template.render("202401", "2", "11001000", "05001000", ["DISTANCIA"])
+    second = template.render("202401", "2", "11001000", "05001000", ["DISTANCIA"])
+
+    assert first == second
+    assert _inner_root(first).findtext("variables").strip() == "DISTANCIA"
+    assert _inner_root(template.render("202402", "2", "11001000", "05001000")).findtext(
+        "documento/PERIODO"
+    ) == "'202402'"
@@ -0,0 +1,61 @@
+import io
+
+import pytest
+
+from app.services.tariff_import import import_tariffs
+from app.services.tariff_store import TariffStore
+from tests.sicetac_fakes import make_request, recording_handler
+
+EXPORT = """Maestro SiceTac;;;;;;;;;;
+PERIODO;CONFIGURACIÓN;ORIGEN;DESTINO;RUTA;NOMBRE RUTA;UNIDAD TRANSPORTE;TIPO CARGA;VALOR;VALOR TONELADA;VALOR HORA;DISTANCIA
+'202401';3S3;11001000;5001000;106;BOGOTA _ MEDELLIN;ESTACAS;General;2.478.949,67;72910,28;37926,89;416
+'202401';3s3;11001000;5001000;106;BOGOTA _ MEDELLIN;TERMOKING;Carga Refrigerada;2693308.96;79214.97;55118;416
+'202401';9X9;11001000;05001;106;BOGOTA _ MEDELLIN;ESTACAS;General;1;1;1;1
+'202401';2;11001;05001;107;BOGOTA _ MEDELLIN;ESTACAS;General;;1;1;1
+"""
+
+
+def _store(tmp_path) -> TariffStore:
+    return TariffStore(f"sqlite:///{tmp_path / 'tariffs.db'}")
+
+
+def test_import_normalizes_rows_and_is_idempotent(tmp_path):
+    store = _store(tmp_path)
+
+    report = import_tariffs(store, io.BytesIO(EXPORT.encode("utf-8")), batch_size=1)
+    again = import_tariffs(store, io.BytesIO(EXPORT.encode("utf-8")))
+
+    assert (report.rows_read, report.rows_imported, report.rows_skipped) == (4, 2, 2)
+    assert report.periods == ["202401"]
+    assert report.errors[0].startswith("row 5: Configuration '9X9'")
+    assert again.rows_imported == 2
+    lane = store.get_lane("202401", "3S3", "11001000", "05001000")
+    assert lane.imported
+    assert [document["valor"] for document in lane.documents] == [2478949.67, 2693308.96]
+    assert lane.documents[0]["valorhora"] == 37926.89
+
+
+async def test_imported_period_is_answered_without_soap_traffic(sicetac_client, tmp_path):
+    store = _store(tmp_path)
+    import_tariffs(store, io.BytesIO(EXPORT.encode("utf-8")))
+    calls = []
+    client = sicetac_client(recording_handler(calls), tariff_store=store)
+
+    response = await client.quote(make_request(unit_type="Termoking", logistics_hours=1))
+
+    assert calls == []
+    assert response.quotes[0].minimum_payable == 2693308.96 + 55118
+
+
+def test_import_reads_xlsx_exports(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["PERIODO", "CONFIGURACION", "ORIGEN", "DESTINO", "VALOR", "VALORHORA"])
+    sheet.append([202401, "2", 11001000, 5001000, 1500000.5, 1000])
+    path = tmp_path / "sicetac.xlsx"
+    workbook.save(path)
+
+    report = import_tariffs(_store(tmp_path), path)
+
+    assert report.rows_imported == 1
@@ -0,0 +1,61 @@
+import time
+
+import httpx
+
+from app.services.tariff_store import TariffStore
+from tests.sicetac_fakes import make_request, recording_handler
+
+
+def _store(tmp_path) -> TariffStore:
+    return TariffStore(f"sqlite:///{tmp_path / 'tariffs.db'}")
+
+
+async def test_restarted_client_reads_lane_from_store(sicetac_client, tmp_path):
+    calls = []
+    store = _store(tmp_path)
+    first = sicetac_client(recording_handler(calls), tariff_store=store)
+    await first.fetch_quotes(make_request())
+    await store.flush()
+
+    # A new process: empty memory cache, new store handle on the same file.
+    restarted = sicetac_client(recording_handler(calls), tariff_store=_store(tmp_path))
+    response = await restarted.quote(make_request(unit_type="Estacas"))
+
+    assert len(calls) == 1
+    assert response.quotes[0].mobilization_value == 2478949.67
+    assert response.data_as_of is not None
+    assert await restarted.tariff_cache.get(make_request()) is not None
+
+
+async def test_expired_stored_lane_is_refreshed_or_served_stale(sicetac_client, tmp_path):
+    store = _store(tmp_path)
+    request = make_request(period="209901")
+    fetched_at = time.time() - 10 * 86400
+    store.put_lane("209901", "3S3", "11001000", "05001000", [{"valor": 1.0, "nombreunidadtransporte": "X"}], fetched_at)
+
+    calls = []
+    client = sicetac_client(recording_handler(calls), tariff_store=store)
+    assert len((await client.fetch_lane(request)).documents) == 2
+    assert len(calls) == 1
+    await store.flush()
+
+    def failing(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    store.put_lane("209901", "3S3", "11001000", "05001000", [{"valor": 1.0, "nombreunidadtransporte": "X"}], fetched_at)
+    down = sicetac_client(failing, tariff_store=store, SICETAC_MAX_ATTEMPTS=1)
+    lane = await down.fetch_lane(request)
+    assert lane.stale
+    assert lane.documents[0]["valor"] == 1.0
+
+
+def test_put_lane_replaces_previous_documents(tmp_path):
+    store = _store(tmp_path)
+    store.put_lane("202401", "2", "11001000", "05001000", [{"valor": 1.0}, {"valor": 2.0}], 100.0)
+    store.put_lane("202401", "2", "11001000", "05001000", [{"valor": 3.0, "ruta": "106"}], 200.0)
+
+    lane = store.get_lane("202401", "2", "11001000", "05001000")
+    assert [document["valor"] for document in lane.documents] == [3.0]
+    assert lane.documents[0]["ruta"] == "106"
+    assert lane.fetched_at == 200.0
+    assert store.get_lane("202401", "3", "11001000", "05001000") is None
@@ -0,0 +1,39 @@
+import asyncio
+
+from app.core.config import Settings
+from app.services.transport import SicetacTransport
+
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+
+
+async def test_pool_stats_count_requests_holding_a_connection():
+    release = asyncio.Event()
+    served = []
+
+    async def serve(reader, writer):
+        while await reader.readuntil(b"\r\n\r\n"):
+            await reader.readexactly(len(b"<payload/>"))
+            served.append(transport.get_stats())
+            await release.wait()
+            writer.write(RESPONSE)
+            await writer.drain()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+    settings = Settings(SICETAC_POOL_MAX_CONNECTIONS=1, SICETAC_LIMIT_MAX=1, SICETAC_POOL_MAX_KEEPALIVE=5)
+    transport = SicetacTransport(settings)
+    try:
+        posts = [asyncio.create_task(transport.post(url, b"<payload/>", {})) for _ in range(2)]
+        while not served:
+            await asyncio.sleep(0.01)
+        release.set()
+        assert [(await post).text for post in posts] == ["ok", "ok"]
+
+        # The second request waited for the only connection without holding it.
+        assert [(stats["in_use"], stats["waiting"]) for stats in served] == [(1, 1), (1, 0)]
+        stats = transport.get_stats()
+        assert (stats["in_use"], stats["waiting"], stats["requests"]) == (0, 0, 2)
+        assert (stats["connections_opened"], stats["idle"]) == (1, 1)
+    finally:
+        await transport.close()
+        server.close()
@@ -0,0 +1,59 @@
+from app.services import warming
+from app.services.cache import CacheService, QuoteCache
+from app.services.warming import CacheWarmer
+from app.utils.periods import current_period
+from tests.sicetac_fakes import make_request, recording_handler
+
+HOT = ("3S3", "11001000", "05001000")
+WARM = ("2", "11001000", "05001000")
+COLD = ("2", "05001000", "76001000")
+
+
+async def test_warmer_skips_fresh_lanes_and_bounds_parallelism(sicetac_client):
+    calls = []
+    client = sicetac_client(recording_handler(calls))
+    await client.fetch_lane(make_request(period=current_period(), configuration="2"))
+
+    in_flight = peak = 0
+    fetch_lane = client.fetch_lane
+
+    async def tracking_fetch_lane(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await fetch_lane(*args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    client.fetch_lane = tracking_fetch_lane
+    lanes = [HOT, WARM, COLD, ("3", "05001000", "76001000")]
+    warmer = CacheWarmer(client, lambda limit, days: lanes[:limit], top_lanes=4, concurrency=2)
+
+    progress = await warmer.warm()
+
+    assert (progress.state, progress.fresh, progress.fetched) == ("done", 1, 3)
+    assert len(calls) == 4
+    assert peak <= 2
+
+
+async def test_coverage_weights_last_week_traffic_by_lane(sicetac_client):
+    client = sicetac_client(recording_handler([]))
+    traffic = [(HOT, 6), (WARM, 3), (COLD, 1)]
+    warmer = CacheWarmer(client, traffic_source=lambda days: traffic)
+
+    await warmer.warm(lanes=[HOT])
+    assert await warmer.measure_coverage() == 60.0
+    assert warmer.get_status()["coverage_percent"] == 60.0
+
+
+async def test_quote_cache_warms_the_period_each_route_names(sicetac_client, monkeypatch):
+    calls = []
+    client = sicetac_client(recording_handler(calls))
+    monkeypatch.setattr(warming, "_warmer", CacheWarmer(client))
+    route = dict(zip(("configuration", "origin", "destination"), HOT))
+
+    progress = await QuoteCache(CacheService()).warm_cache([{**route, "period": "202401"}, route])
+
+    assert [(item.period, item.fetched) for item in progress] == [("202401", 1), (current_period(), 1)]
+    assert await client.tariff_cache.peek(make_request(period="202401")) is not None